@@ -1,53 +1,2062 @@
-!pip install folium
-!pip install tkinter
-!pip install tkintermapview
-
 import folium
+from folium.plugins import FastMarkerCluster, HeatMap
 import webbrowser
 import os
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import ttk, messagebox, scrolledtext, filedialog
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import pandas as pd
+import numpy as np
+import sys
 import json
+import hashlib
+import html
 from tkintermapview import TkinterMapView
 import tempfile
 from PIL import Image, ImageTk
 import io
 import base64
+import threading
+import time
+import atexit
+import urllib.parse
+import urllib.request
+import bisect
+import itertools
+import re
+import contextlib
+import argparse
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections.abc import MutableMapping, ItemsView, ValuesView
+
+class ColumnarTable(MutableMapping):
+    """Compact column store with a dict-like facade, keyed by name
+    
+    Numeric fields live in NumPy arrays and string fields are stored as
+    integer codes into a list of interned categories. Records are handed
+    out as fresh dicts, so screens can keep treating the table as a dict
+    of dicts while charts read whole columns through column().
+    """
+    
+    def __init__(self, schema):
+        # schema: sequence of (field, kind) with kind 'int', 'float' or 'category';
+        # float fields are optional and stored as NaN when a record has none
+        self.schema = tuple(schema)
+        self.fields = tuple(field for field, _ in self.schema)
+        self.required = sum(kind != 'float' for _, kind in self.schema)
+        self.names = []
+        self.index = {}
+        self.size = 0
+        self.arrays = {}
+        self.categories = {}
+        self.category_codes = {}
+        dtypes = {'int': np.int64, 'float': np.float64, 'category': np.int32}
+        for field, kind in self.schema:
+            self.arrays[field] = np.zeros(16, dtype=dtypes[kind])
+            if kind == 'category':
+                self.categories[field] = []
+                self.category_codes[field] = {}
+        # Fields outside the schema, kept per record so nothing is lost on save
+        self.extras = {}
+    
+    @classmethod
+    def from_records(cls, schema, records):
+        table = cls(schema)
+        for name, record in records.items():
+            table[name] = record
+        return table
+    
+    def encode(self, field, value):
+        codes = self.category_codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.categories[field])
+            self.categories[field].append(sys.intern(value))
+        return code
+    
+    def grow(self):
+        for field, array in self.arrays.items():
+            grown = np.zeros(len(array) * 2, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self.arrays[field] = grown
+    
+    def __getitem__(self, name):
+        return self.record_at(self.index[name])
+    
+    def record_at(self, row):
+        record = {}
+        for field, kind in self.schema:
+            value = self.arrays[field][row]
+            if kind == 'float':
+                if not np.isnan(value):
+                    record[field] = float(value)
+            else:
+                record[field] = int(value) if kind == 'int' else self.categories[field][value]
+        extra = self.extras.get(self.names[row])
+        if extra:
+            record.update(extra)
+        return record
+    
+    def __setitem__(self, name, record):
+        # Convert every value first, so a bad one leaves the table untouched
+        values = []
+        for field, kind in self.schema:
+            if kind == 'float':
+                value = record.get(field)
+                values.append(np.nan if value is None else float(value))
+            elif kind == 'int':
+                values.append(int(record[field]))
+            else:
+                values.append(self.encode(field, record[field]))
+        
+        row = self.index.get(name)
+        if row is None:
+            if self.size == len(self.arrays[self.fields[0]]):
+                self.grow()
+            row = self.size
+            self.index[name] = row
+            self.names.append(name)
+            self.size += 1
+        for field, value in zip(self.fields, values):
+            self.arrays[field][row] = value
+        extra = None
+        if len(record) > self.required:
+            extra = {field: value for field, value in record.items() if field not in self.fields}
+        if extra:
+            self.extras[name] = extra
+        else:
+            self.extras.pop(name, None)
+    
+    def __delitem__(self, name):
+        row = self.index.pop(name)
+        # Shift the tail down so the table keeps insertion order like a dict
+        for array in self.arrays.values():
+            array[row:self.size - 1] = array[row + 1:self.size]
+        del self.names[row]
+        self.size -= 1
+        for moved in range(row, self.size):
+            self.index[self.names[moved]] = moved
+        self.extras.pop(name, None)
+    
+    def insert_at(self, row, name, record):
+        """Insert a new record at a given row, shifting later rows down"""
+        self[name] = record
+        last = self.size - 1
+        if row >= last:
+            return
+        for array in self.arrays.values():
+            value = array[last]
+            array[row + 1:last + 1] = array[row:last]
+            array[row] = value
+        self.names.insert(row, self.names.pop())
+        for moved in range(row, self.size):
+            self.index[self.names[moved]] = moved
+    
+    def get(self, name, default=None):
+        # Mapping.get would raise and catch a KeyError for every new name
+        row = self.index.get(name)
+        return default if row is None else self.record_at(row)
+    
+    def __contains__(self, name):
+        return name in self.index
+    
+    def __iter__(self):
+        return iter(list(self.names))
+    
+    def __len__(self):
+        return self.size
+    
+    def iter_items(self):
+        for row in range(self.size):
+            yield self.names[row], self.record_at(row)
+    
+    def items(self):
+        return RecordItemsView(self)
+    
+    def values(self):
+        return RecordValuesView(self)
+    
+    def column(self, field):
+        """Return a column as a NumPy array; numeric columns are zero-copy views"""
+        array = self.arrays[field][:self.size]
+        if field in self.categories:
+            return np.asarray(self.categories[field], dtype=object)[array]
+        return array
+    
+    def field_values(self, keys, field):
+        """Values of one field for keys, in the order given, read from the whole column"""
+        if field == 'name':
+            return np.asarray(keys, dtype=object)
+        rows = np.fromiter((self.index[key] for key in keys), dtype=np.int64, count=len(keys))
+        array = self.arrays[field][rows]
+        if field in self.categories:
+            return np.asarray(self.categories[field], dtype=object)[array]
+        return array
+    
+    def sort_order(self, keys, field):
+        """Positions of keys sorted by one field"""
+        return np.argsort(self.field_values(keys, field), kind='stable')
+    
+    def copy(self):
+        table = ColumnarTable(self.schema)
+        table.names = list(self.names)
+        table.index = dict(self.index)
+        table.size = self.size
+        table.arrays = {field: array.copy() for field, array in self.arrays.items()}
+        table.categories = {field: list(values) for field, values in self.categories.items()}
+        table.category_codes = {field: dict(codes) for field, codes in self.category_codes.items()}
+        table.extras = dict(self.extras)
+        return table
+
+
+class PersistenceWorker:
+    """Background thread that coalesces dirty notifications into batched writes
+    
+    notify() marks state dirty; the worker waits out a short debounce window
+    so a burst of edits results in a single call to write(). A write that
+    raises is kept in failure and retried after retry_delay; write() is
+    expected to queue again whatever it could not write.
+    """
+    
+    def __init__(self, write, delay=0.25, retry_delay=5.0):
+        self.write = write
+        self.delay = delay
+        self.retry_delay = retry_delay
+        self.condition = threading.Condition()
+        self.dirty = False
+        self.busy = False
+        self.flushing = False
+        # Bumped by notify(); written is the generation the last successful write covered
+        self.generation = 0
+        self.written = 0
+        self.running = True
+        # Exception of the last write if it failed, and how many writes have failed
+        self.failure = None
+        self.failures = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+    
+    def notify(self):
+        with self.condition:
+            self.dirty = True
+            self.generation += 1
+            self.condition.notify_all()
+    
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.dirty and self.running:
+                    self.condition.wait()
+                # Stopping gives up on writes that keep failing
+                if not self.dirty or not self.running and self.failure is not None:
+                    return
+                # Debounce: keep absorbing notifications until the window closes
+                deadline = time.monotonic() + (self.retry_delay if self.failure else self.delay)
+                while self.running and not self.flushing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                self.dirty = False
+                self.busy = True
+                generation = self.generation
+            try:
+                self.write()
+                failure = None
+            except Exception as e:
+                failure = e
+            with self.condition:
+                self.failure = failure
+                if failure is not None:
+                    self.failures += 1
+                    self.dirty = True
+                else:
+                    self.written = generation
+                self.busy = False
+                self.condition.notify_all()
+    
+    def flush(self):
+        """Block until every change pending now has been written or a write fails
+        
+        Changes notified while waiting are left to later writes, so a steady
+        stream of them (e.g. an import) cannot hold up the caller.
+        Returns the exception of the failed write, or None.
+        """
+        with self.condition:
+            self.flushing = True
+            self.condition.notify_all()
+            failures = self.failures
+            target = self.generation
+            while self.written < target and self.failures == failures and self.thread.is_alive():
+                self.condition.wait(0.5)
+            self.flushing = False
+            return self.failure if self.failures != failures else None
+    
+    def stop(self):
+        self.flush()
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join(self.retry_delay)
+
+
+class JsonStorage:
+    """Sectioned JSON snapshots plus append-only journals for DataManager
+    
+    Each section (MineralData, CountryProfiles, Users) has its own snapshot
+    and journal file so it can be loaded without parsing the others. Writes
+    are queued and performed by a PersistenceWorker off the UI thread.
+    """
+    
+    # Uncommitted changes live only in memory, so DataManager undoes them itself
+    transactional = False
+    
+    def __init__(self, manager, data_file="mineral_app_data.json"):
+        self.manager = manager
+        self.data_file = data_file
+        self.base_name = os.path.splitext(data_file)[0]
+        # Number of journal records after which a section's log is folded into its snapshot
+        self.compact_threshold = 500
+        self.journal_records = {}
+        # Guarded by manager.lock; drained by the worker
+        self.pending_lines = {}
+        self.snapshot_requests = set()
+        self.worker = PersistenceWorker(self.write_pending)
+    
+    def section_file(self, section):
+        return f"{self.base_name}.{section}.json"
+    
+    def journal_file(self, section):
+        return f"{self.base_name}.{section}.journal"
+    
+    def has_sections(self):
+        return any(os.path.exists(self.section_file(section)) for section in DataManager.SECTIONS)
+    
+    def has_data(self):
+        return os.path.exists(self.data_file) or self.has_sections()
+    
+    def load(self):
+        """Prepare the sectioned layout; sections themselves load on first use"""
+        if os.path.exists(self.data_file) and not self.has_sections():
+            self.migrate_single_file()
+    
+    def migrate_single_file(self):
+        """Split a single-file snapshot (and its journal) into per-section files"""
+        with open(self.data_file, 'r') as f:
+            data = json.load(f)
+        for section in DataManager.SECTIONS:
+            data.setdefault(section, self.manager.get_default_section(section))
+        
+        legacy_journal = self.base_name + ".journal"
+        for path in (legacy_journal + ".old", legacy_journal):
+            for record in self.read_journal(path):
+                self.apply_record(data[record['section']], record)
+        
+        for section in DataManager.SECTIONS:
+            self.write_snapshot(section, data[section])
+        for path in (legacy_journal + ".old", legacy_journal, self.data_file):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def load_section(self, section):
+        """Load one section from its snapshot, then replay its journal"""
+        journal_file = self.journal_file(section)
+        try:
+            with open(self.section_file(section), 'r') as f:
+                records = json.load(f)
+        except FileNotFoundError:
+            # Create default data if file doesn't exist
+            records = self.manager.get_default_section(section)
+            if not os.path.exists(journal_file):
+                self.request_snapshot(section)
+        
+        count = 0
+        for record in self.read_journal(journal_file):
+            self.apply_record(records, record)
+            count += 1
+        self.journal_records[section] = count
+        
+        schema = DataManager.COLUMNAR_SCHEMAS.get(section)
+        if schema is not None:
+            return ColumnarTable.from_records(schema, records)
+        return records
+    
+    def read_journal(self, path):
+        """Yield journal records from path, stopping at a torn final write"""
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # Torn write at the end of the log from a crash
+                        break
+        except FileNotFoundError:
+            pass
+    
+    def apply_record(self, records, record):
+        if record['value'] is None:
+            records.pop(record['key'], None)
+        else:
+            records[record['key']] = record['value']
+    
+    def request_snapshot(self, section):
+        with self.manager.lock:
+            self.snapshot_requests.add(section)
+            self.journal_records[section] = 0
+        self.worker.notify()
+    
+    def save(self):
+        """Schedule a fresh snapshot of every loaded section"""
+        for section in list(self.manager.sections):
+            self.request_snapshot(section)
+    
+    @property
+    def failure(self):
+        return self.worker.failure
+    
+    def flush(self):
+        return self.worker.flush()
+    
+    def record_many(self, changes):
+        """Queue a committed batch of (section, key, value) changes with one notification"""
+        counts = {}
+        for section, _, _ in changes:
+            counts[section] = counts.get(section, 0) + 1
+        with self.manager.lock:
+            for section, count in counts.items():
+                if self.journal_records.get(section, 0) + count >= self.compact_threshold:
+                    # Large batches go straight to a snapshot instead of the journal
+                    self.snapshot_requests.add(section)
+                    self.journal_records[section] = 0
+            for section, key, value in changes:
+                if section not in self.snapshot_requests:
+                    line = json.dumps({"key": key, "value": value}, separators=(',', ':'))
+                    self.pending_lines.setdefault(section, []).append(line)
+                    self.journal_records[section] += 1
+        self.worker.notify()
+    
+    def rollback(self):
+        """Nothing reaches the journal before commit, so there is nothing to undo"""
+    
+    def record(self, section, key, value):
+        """Queue a single mutation for the section journal; value None marks a delete"""
+        line = json.dumps({"key": key, "value": value}, separators=(',', ':'))
+        with self.manager.lock:
+            self.pending_lines.setdefault(section, []).append(line)
+            self.journal_records[section] = self.journal_records.get(section, 0) + 1
+            if self.journal_records[section] >= self.compact_threshold:
+                # Fold the journal into a fresh snapshot on the next write
+                self.snapshot_requests.add(section)
+                self.journal_records[section] = 0
+        self.worker.notify()
+    
+    def write_pending(self):
+        """Worker side: append queued journal lines and write requested snapshots"""
+        with self.manager.lock:
+            lines, self.pending_lines = self.pending_lines, {}
+            requests, self.snapshot_requests = self.snapshot_requests, set()
+            snapshots = {}
+            for section in requests:
+                records = self.manager.sections.get(section)
+                if records is not None:
+                    # The copy already contains every queued change for this section
+                    snapshots[section] = records.copy()
+                    lines.pop(section, None)
+        
+        done = set()
+        try:
+            for section, section_lines in lines.items():
+                with open(self.journal_file(section), 'a') as f:
+                    f.write("\n".join(section_lines) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                done.add(section)
+            
+            for section, records in snapshots.items():
+                self.write_snapshot(section, records)
+                # Every journal line on disk predates the snapshot, so it can go
+                if os.path.exists(self.journal_file(section)):
+                    os.remove(self.journal_file(section))
+                done.add(section)
+        except Exception:
+            # A failed append may leave a torn line, so what was not written is
+            # retried as a full snapshot of the section
+            with self.manager.lock:
+                self.snapshot_requests.update(section for section in itertools.chain(lines, snapshots)
+                                              if section not in done)
+            raise
+    
+    def write_snapshot(self, section, records):
+        """Write a section snapshot to a temp file, fsync it and swap it in"""
+        section_file = self.section_file(section)
+        temp_file = section_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(dict(records.items()), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, section_file)
+    
+    def close(self):
+        """Write everything still pending and stop the worker"""
+        self.worker.stop()
+
+
+class SQLiteTable(MutableMapping):
+    """Dict-like view of one SQLite table, keyed by name"""
+    
+    def __init__(self, connection, table, fields, optional=(), derived=None, lock=None):
+        self.connection = connection
+        # Held around every statement; DataManager passes its own lock, so a
+        # read never sees rows another thread has written but not committed yet
+        self.lock = lock or threading.RLock()
+        self.table = table
+        self.fields = fields
+        # Numeric fields a record may leave out; stored as NULL, read back as NaN columns
+        self.optional = optional
+        # Filters on values computed from fields: name -> indexed SQL expression
+        self.derived = derived or {}
+        self.columns = ", ".join(f'"{field}"' for field in fields)
+    
+    def query(self, sql, params=()):
+        """Run a read under the lock and fetch all of its rows"""
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+    
+    def scan(self, columns, batch_size=5000):
+        """Yield rows of columns in table order, reading one batch at a time under the lock"""
+        last = -1
+        while True:
+            rows = self.query(f'SELECT rowid, {columns} FROM {self.table} WHERE rowid > ? '
+                              f'ORDER BY rowid LIMIT ?', (last, batch_size))
+            for row in rows:
+                yield row[1:]
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+    
+    def row_to_record(self, row):
+        record = dict(zip(self.fields, row))
+        for field in self.optional:
+            if record[field] is None:
+                del record[field]
+        return record
+    
+    def __getitem__(self, name):
+        rows = self.query(f'SELECT {self.columns} FROM {self.table} WHERE name = ?', (name,))
+        if not rows:
+            raise KeyError(name)
+        return self.row_to_record(rows[0])
+    
+    def __setitem__(self, name, record):
+        values = [record.get(field) if field in self.optional else record[field] for field in self.fields]
+        updates = ", ".join(f'"{field}" = excluded."{field}"' for field in self.fields)
+        placeholders = ", ".join("?" for _ in self.fields)
+        with self.lock:
+            self.connection.execute(
+                f'INSERT INTO {self.table} (name, {self.columns}) VALUES (?, {placeholders}) '
+                f'ON CONFLICT(name) DO UPDATE SET {updates}', [name] + values)
+    
+    def __delitem__(self, name):
+        with self.lock:
+            cursor = self.connection.execute(f'DELETE FROM {self.table} WHERE name = ?', (name,))
+        if cursor.rowcount == 0:
+            raise KeyError(name)
+    
+    def get(self, name, default=None):
+        rows = self.query(f'SELECT {self.columns} FROM {self.table} WHERE name = ?', (name,))
+        return self.row_to_record(rows[0]) if rows else default
+    
+    def __contains__(self, name):
+        return bool(self.query(f'SELECT 1 FROM {self.table} WHERE name = ?', (name,)))
+    
+    def __iter__(self):
+        for (name,) in self.scan("name"):
+            yield name
+    
+    def __len__(self):
+        return self.query(f'SELECT COUNT(*) FROM {self.table}')[0][0]
+    
+    def iter_items(self):
+        """Stream (name, record) pairs, a batch of rows per query"""
+        for row in self.scan(f'name, {self.columns}'):
+            yield row[0], self.row_to_record(row[1:])
+    
+    def items(self):
+        return RecordItemsView(self)
+    
+    def values(self):
+        return RecordValuesView(self)
+    
+    def column(self, field):
+        """Return a column as a NumPy array in table order"""
+        rows = self.query(f'SELECT "{self.check_field(field)}" FROM {self.table} ORDER BY rowid')
+        return np.array([row[0] for row in rows], dtype=float if field in self.optional else None)
+    
+    def select(self, equals=None, ranges=None, order_by=None, descending=False,
+               limit=None, offset=0):
+        """Return (name, record) pairs filtered and sorted by the table indexes
+        
+        equals maps field -> value, ranges maps field -> (low, high) with None
+        for an open end.
+        """
+        clauses, params = [], []
+        for field, value in (equals or {}).items():
+            column = self.derived.get(field) or f'"{self.check_field(field)}"'
+            clauses.append(f'{column} = ?')
+            params.append(value)
+        for field, (low, high) in (ranges or {}).items():
+            self.check_field(field)
+            if low is not None:
+                clauses.append(f'"{field}" >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'"{field}" <= ?')
+                params.append(high)
+        
+        sql = f'SELECT name, {self.columns} FROM {self.table}'
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by is not None:
+            column = "name" if order_by == "name" else f'"{self.check_field(order_by)}"'
+            sql += f" ORDER BY {column} {'DESC' if descending else 'ASC'}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+        return [(row[0], self.row_to_record(row[1:])) for row in self.query(sql, params)]
+    
+    # Most names bound in one "name IN (...)" query, well under SQLite's variable limit
+    batch_size = 500
+    
+    def field_values(self, keys, field):
+        """Values of one field for keys, in the order given
+        
+        Only the requested rows are read, a batch of names per query; keys
+        covering most of the table read the whole column in one query instead.
+        """
+        if field == 'name':
+            return np.asarray(keys, dtype=object)
+        column = self.check_field(field)
+        if len(keys) * 4 >= len(self):
+            values = dict(self.query(f'SELECT name, "{column}" FROM {self.table}'))
+        else:
+            values = {}
+            for start in range(0, len(keys), self.batch_size):
+                batch = list(keys[start:start + self.batch_size])
+                values.update(self.query(f'SELECT name, "{column}" FROM {self.table} '
+                                         f'WHERE name IN ({", ".join("?" for _ in batch)})', batch))
+        return np.asarray([values[key] for key in keys], dtype=object)
+    
+    def sort_order(self, keys, field):
+        """Positions of keys sorted by one field, like a stable argsort of field_values
+        
+        When keys are the whole table in table order, SQL sorts the rowids
+        through the field's index and they are mapped back to positions.
+        """
+        with self.lock:
+            # Names are the keys themselves, so they are sorted without a query
+            if field != 'name' and len(keys) == len(self):
+                column = self.check_field(field)
+                rows = self.query(f'SELECT rowid, name FROM {self.table} ORDER BY rowid')
+                if all(name == key for (_, name), key in zip(rows, keys)):
+                    rowids = np.fromiter((rowid for rowid, _ in rows), dtype=np.int64, count=len(rows))
+                    ordered = self.query(f'SELECT rowid FROM {self.table} ORDER BY "{column}", rowid')
+                    return np.searchsorted(rowids, np.fromiter((rowid for (rowid,) in ordered),
+                                                               dtype=np.int64, count=len(ordered)))
+        return np.argsort(self.field_values(keys, field), kind='stable')
+    
+    def distinct(self, field):
+        column = self.derived.get(field) or f'"{self.check_field(field)}"'
+        return [row[0] for row in self.query(f'SELECT DISTINCT {column} FROM {self.table}')]
+    
+    def check_field(self, field):
+        if field not in self.fields:
+            raise ValueError(f"Unknown field '{field}' for {self.table}")
+        return field
+
+
+class RecordItemsView(ItemsView):
+    """Items view that streams records from the mapping's iter_items()"""
+    
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class RecordValuesView(ValuesView):
+    def __iter__(self):
+        for _, record in self._mapping.iter_items():
+            yield record
+
+
+class SQLiteStorage:
+    """On-disk SQLite storage for DataManager with indexed lookups"""
+    
+    # The database connection can roll back uncommitted changes itself
+    transactional = True
+    # Writes happen in the caller, so failures are raised there
+    failure = None
+    
+    # section -> (table, fields)
+    SCHEMA = {
+        'MineralData': ('minerals', ('Location', 'Production', 'Color', 'Latitude', 'Longitude')),
+        'CountryProfiles': ('countries', ('Production', 'GDP', 'Projects', 'Color')),
+        'Users': ('users', ('password', 'role')),
+    }
+    
+    TYPES = {'Production': 'INTEGER', 'GDP': 'INTEGER', 'Projects': 'INTEGER',
+             'Latitude': 'REAL', 'Longitude': 'REAL'}
+    # Fields records may leave out
+    OPTIONAL = ('Latitude', 'Longitude')
+    # table -> derived filter -> SQL expression, each with an index in create_schema
+    DERIVED = {'minerals': {'Country': 'location_country("Location")'}}
+    
+    def __init__(self, manager, db_file="mineral_app_data.db", json_file="mineral_app_data.json"):
+        self.manager = manager
+        self.db_file = db_file
+        self.json_file = json_file
+        self.connection = None
+    
+    def load(self):
+        """Open the database, creating and populating it on first use"""
+        is_new = not os.path.exists(self.db_file)
+        # Imports commit from a worker thread; DataManager.lock serializes every statement
+        self.connection = sqlite3.connect(self.db_file, check_same_thread=False)
+        # Backs the index on the country part of Location
+        self.connection.create_function("location_country", 1, location_country, deterministic=True)
+        self.create_schema()
+        
+        if is_new:
+            if JsonStorage(self.manager, self.json_file).has_data():
+                self.migrate_from_json()
+            else:
+                self.populate(self.manager.get_default_minerals(),
+                              self.manager.get_default_countries(),
+                              self.manager.get_default_users())
+    
+    def load_section(self, section):
+        """Tables are queried on demand, so loading a section is just a view"""
+        table, fields = self.SCHEMA[section]
+        return SQLiteTable(self.connection, table, fields,
+                           tuple(field for field in fields if field in self.OPTIONAL),
+                           self.DERIVED.get(table), self.manager.lock)
+    
+    def create_schema(self):
+        for table, fields in self.SCHEMA.values():
+            columns = ", ".join(f'"{field}" {self.TYPES.get(field, "TEXT")}' for field in fields)
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} (name TEXT PRIMARY KEY, {columns})')
+            # Databases from before a field was added get the missing column
+            existing = {row[1] for row in self.connection.execute(f'PRAGMA table_info({table})')}
+            for field in fields:
+                if field not in existing:
+                    self.connection.execute(
+                        f'ALTER TABLE {table} ADD COLUMN "{field}" {self.TYPES.get(field, "TEXT")}')
+        self.connection.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_minerals_location ON minerals ("Location");
+            CREATE INDEX IF NOT EXISTS idx_minerals_country ON minerals (location_country("Location"));
+            CREATE INDEX IF NOT EXISTS idx_minerals_production ON minerals ("Production");
+            CREATE INDEX IF NOT EXISTS idx_countries_production ON countries ("Production");
+            CREATE INDEX IF NOT EXISTS idx_countries_gdp ON countries ("GDP");
+            CREATE INDEX IF NOT EXISTS idx_countries_projects ON countries ("Projects");
+        """)
+        self.connection.commit()
+    
+    def migrate_from_json(self):
+        """One-shot import of the JSON snapshot and journal into the database"""
+        source = DataManager(backend="json", data_file=self.json_file)
+        self.populate(source.MineralData, source.CountryProfiles, source.Users)
+        source.close()
+    
+    def populate(self, minerals, countries, users):
+        with self.connection:
+            for section, records in (('MineralData', minerals),
+                                     ('CountryProfiles', countries),
+                                     ('Users', users)):
+                table = self.manager.section(section)
+                for name, record in records.items():
+                    table[name] = record
+    
+    def save(self):
+        with self.manager.lock:
+            self.connection.commit()
+    
+    def flush(self):
+        # Waits for a transaction another thread has open, rather than committing half of it
+        with self.manager.lock:
+            self.connection.commit()
+    
+    def record(self, section, key, value):
+        """Commit the change already written through the table view"""
+        self.connection.commit()
+    
+    def record_many(self, changes):
+        """Commit a batch of changes already written through the table views"""
+        self.connection.commit()
+    
+    def rollback(self):
+        """Discard every change written since the last commit"""
+        self.connection.rollback()
+    
+    def close(self):
+        with self.manager.lock:
+            if self.connection is not None:
+                self.connection.commit()
+                self.connection.close()
+                self.connection = None
+
+
+def location_country(location):
+    """Country part of a Location string such as 'Africa, Zimbabwe'"""
+    return location.rsplit(',', 1)[-1].strip()
+
+
+# Approximate (latitude, longitude) of countries, used to place minerals that
+# have no coordinates of their own on the map
+COUNTRY_COORDINATES = {
+    'DRC': (-4.0, 15.0), 'Zimbabwe': (-20.0, 30.0), 'S.A': (-30.0, 25.0),
+    'South Africa': (-30.0, 25.0), 'Mozambique': (-18.0, 35.0), 'Zambia': (-14.0, 27.5),
+    'Namibia': (-22.0, 17.0), 'Botswana': (-22.0, 24.0), 'Lesotho': (-29.5, 28.5),
+    'Swaziland': (-26.5, 31.5), 'Eswatini': (-26.5, 31.5), 'Angola': (-12.5, 18.5),
+    'Tanzania': (-6.0, 35.0), 'Madagascar': (-19.0, 46.7), 'Ghana': (8.0, -1.0),
+    'Mali': (17.0, -4.0),
+}
+
+
+def mercator_pixels(latitudes, longitudes):
+    """Web Mercator pixel coordinates at zoom 0 (a 256 pixel world) of arrays of degrees"""
+    latitudes = np.radians(np.clip(latitudes, -85.05112878, 85.05112878))
+    x = (np.asarray(longitudes) + 180.0) / 360.0 * 256
+    y = (1 - np.log(np.tan(latitudes) + 1 / np.cos(latitudes)) / np.pi) / 2 * 256
+    return x, y
+
+
+def mercator_degrees(x, y):
+    """Latitudes and longitudes of Web Mercator pixel coordinates at zoom 0"""
+    longitudes = np.asarray(x) / 256 * 360.0 - 180.0
+    latitudes = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(y) / 256))))
+    return latitudes, longitudes
+
+
+class HashIndex:
+    """Equality index: value -> set of record keys"""
+    
+    def __init__(self, field, derive=None):
+        self.field = field
+        self.derive = derive
+        self.keys = {}
+    
+    def value(self, record):
+        value = record[self.field]
+        return self.derive(value) if self.derive else value
+    
+    def add(self, key, record):
+        self.keys.setdefault(self.value(record), set()).add(key)
+    
+    def remove(self, key, record):
+        value = self.value(record)
+        keys = self.keys.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.keys[value]
+    
+    def lookup(self, value):
+        return self.keys.get(value, set())
+    
+    def update_many(self, changes):
+        for key, old, new in changes:
+            if old is not None:
+                self.remove(key, old)
+            if new is not None:
+                self.add(key, new)
+
+
+class SortedIndex:
+    """Ordered index over a numeric field supporting ranges and top-k"""
+    
+    # Batches this large are merged in one pass instead of one insert per change
+    merge_threshold = 64
+    
+    def __init__(self, field):
+        self.field = field
+        # Parallel lists sorted by (value, key); values alone is used for range bisects
+        self.entries = []
+        self.values = []
+    
+    def build(self, keys, values):
+        self.entries = sorted(zip(values, keys))
+        self.values = [value for value, _ in self.entries]
+    
+    def add(self, key, record):
+        entry = (record[self.field], key)
+        position = bisect.bisect_left(self.entries, entry)
+        self.entries.insert(position, entry)
+        self.values.insert(position, entry[0])
+    
+    def remove(self, key, record):
+        entry = (record[self.field], key)
+        position = bisect.bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+            del self.values[position]
+    
+    def update_many(self, changes):
+        """Apply (key, old record, new record) changes with at most one per key"""
+        if len(changes) < self.merge_threshold:
+            for key, old, new in changes:
+                if old is not None:
+                    self.remove(key, old)
+                if new is not None:
+                    self.add(key, new)
+            return
+        removed = [(old[self.field], key) for key, old, _ in changes if old is not None]
+        added = [(new[self.field], key) for key, _, new in changes if new is not None]
+        self.entries = merge_sorted(self.entries, added, removed)
+        # Equal values are interchangeable, so values can be merged on their own
+        self.values = merge_sorted(self.values, [value for value, _ in added],
+                                   [value for value, _ in removed])
+    
+    def range(self, low=None, high=None):
+        """Keys with low <= value <= high, in ascending value order"""
+        start = 0 if low is None else bisect.bisect_left(self.values, low)
+        end = len(self.values) if high is None else bisect.bisect_right(self.values, high)
+        return [key for _, key in self.entries[start:end]]
+    
+    def ordered(self, descending=False):
+        entries = reversed(self.entries) if descending else self.entries
+        return (key for _, key in entries)
+
+
+def merge_sorted(entries, added, removed=()):
+    """Sorted list of entries without removed and with added
+    
+    Positions are found with bisect and the runs between them copied as
+    slices, so a batch costs a C-level copy of the list plus a bisect per
+    change rather than a comparison per entry.
+    """
+    if removed:
+        kept, start = [], 0
+        for entry in sorted(removed):
+            position = bisect.bisect_left(entries, entry, start)
+            if position < len(entries) and entries[position] == entry:
+                kept += entries[start:position]
+                start = position + 1
+        kept += entries[start:]
+        entries = kept
+    merged, start = [], 0
+    for entry in sorted(added):
+        position = bisect.bisect_left(entries, entry, start)
+        merged += entries[start:position]
+        merged.append(entry)
+        start = position
+    merged += entries[start:]
+    return merged
+
+
+def net_changes(changes):
+    """Collapse (key, old, new) changes to one per key: its first old and last new record"""
+    net = {}
+    for key, old, new in changes:
+        net[key] = (net[key][0], new) if key in net else (old, new)
+    return [(key, old, new) for key, (old, new) in net.items() if old is not None or new is not None]
+
+
+class SectionIndex:
+    """Secondary indexes over an in-memory section, kept current on every mutation
+    
+    select() mirrors SQLiteTable.select() so DataManager can query either backend
+    the same way.
+    """
+    
+    def __init__(self, records, hash_fields, sorted_fields):
+        self.records = records
+        self.hash_indexes = {name: HashIndex(field, derive)
+                             for name, (field, derive) in hash_fields.items()}
+        self.sorted_indexes = {field: SortedIndex(field) for field in sorted_fields}
+        
+        names = list(records)
+        for field, index in self.sorted_indexes.items():
+            index.build(names, records.column(field).tolist())
+        for index in self.hash_indexes.values():
+            for name, value in zip(names, records.column(index.field).tolist()):
+                index.add(name, {index.field: value})
+    
+    def update_many(self, changes):
+        """Apply (key, old record, new record) changes with at most one per key"""
+        for index in list(self.hash_indexes.values()) + list(self.sorted_indexes.values()):
+            index.update_many(changes)
+    
+    def select(self, equals=None, ranges=None, order_by=None, descending=False,
+               limit=None, offset=0):
+        """Return (name, record) pairs filtered and sorted using the indexes"""
+        candidates = None
+        for name, value in (equals or {}).items():
+            keys = self.hash_indexes[name].lookup(value)
+            candidates = set(keys) if candidates is None else candidates & keys
+        for field, (low, high) in (ranges or {}).items():
+            keys = set(self.sorted_indexes[field].range(low, high))
+            candidates = keys if candidates is None else candidates & keys
+        
+        if order_by in self.sorted_indexes:
+            # Walk the sorted index so top-k stops after limit matches
+            ordered = self.sorted_indexes[order_by].ordered(descending)
+            if candidates is not None:
+                ordered = (key for key in ordered if key in candidates)
+        elif order_by == "name":
+            ordered = sorted(self.records if candidates is None else candidates,
+                             reverse=descending)
+        elif candidates is None:
+            ordered = iter(self.records)
+        else:
+            # Keep table order, like an unfiltered listing
+            ordered = sorted(candidates, key=self.records.index.__getitem__)
+        
+        stop = None if limit is None else offset + limit
+        keys = list(itertools.islice(ordered, offset, stop))
+        return [(key, self.records[key]) for key in keys]
+
+
+class SearchIndex:
+    """Incremental prefix search over the words of record names and text fields
+    
+    postings maps every distinct word to the set of keys having it, and
+    vocabulary keeps the distinct words sorted, so the words starting with a
+    prefix form a contiguous run found with bisect. Record changes only touch
+    the sorted vocabulary when a word first appears or last disappears.
+    key_words holds each key's words as one " word word" string, so a term
+    spanning too many words to intersect is checked with a substring test.
+    """
+    
+    WORD = re.compile(r'\w+')
+    # Sorts after every string that starts with a given prefix
+    END = chr(0x10ffff)
+    # Vocabulary changes this large are merged in one pass instead of one insort each
+    merge_threshold = 64
+    
+    def __init__(self, fields=()):
+        self.fields = fields
+        self.vocabulary = []
+        self.postings = {}
+        self.key_words = {}
+    
+    @classmethod
+    def words(cls, text):
+        text = str(text).lower()
+        if text.replace(' ', '').isalnum():
+            return text.split()
+        return cls.WORD.findall(text)
+    
+    def record_words(self, key, record):
+        words = set(self.words(key))
+        for field in self.fields:
+            words.update(self.words(record[field]))
+        return tuple(words)
+    
+    def build(self, keys, columns):
+        """Index keys with one sequence of field values per field, aligned with keys"""
+        # Locations repeat across many records, so split each distinct one once
+        split = {}
+        postings = {}
+        for position, key in enumerate(keys):
+            words = set(self.words(key))
+            for values in columns:
+                text = values[position]
+                if text not in split:
+                    split[text] = self.words(text)
+                words.update(split[text])
+            self.key_words[key] = " " + " ".join(words)
+            for word in words:
+                if word in postings:
+                    postings[word].add(key)
+                else:
+                    postings[word] = {key}
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+    
+    def update_many(self, changes):
+        """Apply (key, old record, new record) changes with at most one per key"""
+        postings = self.postings
+        touched = set()
+        for key, _, new in changes:
+            old_words = set(self.key_words.pop(key, "").split())
+            new_words = set()
+            if new is not None:
+                new_words.update(self.record_words(key, new))
+                self.key_words[key] = " " + " ".join(new_words)
+            for word in old_words - new_words:
+                postings[word].discard(key)
+                if not postings[word]:
+                    del postings[word]
+                    touched.add(word)
+            for word in new_words - old_words:
+                if word in postings:
+                    postings[word].add(key)
+                else:
+                    postings[word] = {key}
+                    touched.add(word)
+        
+        vocabulary = self.vocabulary
+        added, removed = [], set()
+        for word in touched:
+            position = bisect.bisect_left(vocabulary, word)
+            listed = position < len(vocabulary) and vocabulary[position] == word
+            if word in postings and not listed:
+                added.append(word)
+            elif word not in postings and listed:
+                removed.add(word)
+        if len(added) + len(removed) < self.merge_threshold:
+            for word in removed:
+                del vocabulary[bisect.bisect_left(vocabulary, word)]
+            for word in added:
+                bisect.insort(vocabulary, word)
+            return
+        self.vocabulary = merge_sorted(vocabulary, added, removed)
+    
+    def prefix_words(self, prefix):
+        """Indexed words starting with prefix, in order"""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        return self.vocabulary[start:bisect.bisect_left(self.vocabulary, prefix + self.END, start)]
+    
+    def match_count(self, words):
+        """Number of (word, key) postings of words, estimated from a sample of at most 64 words"""
+        sample = words[::max(len(words) // 64, 1)]
+        if not sample:
+            return 0
+        return len(words) * sum(len(self.postings[word]) for word in sample) // len(sample)
+    
+    @staticmethod
+    def chunks(keys, limit):
+        """A driver posting set in doubling chunks, so a limited search can stop early"""
+        if limit is None or len(keys) <= 4 * limit:
+            yield keys
+            return
+        keys = iter(keys)
+        size = 4 * limit
+        while True:
+            chunk = set(itertools.islice(keys, size))
+            if not chunk:
+                return
+            yield chunk
+            size *= 2
+    
+    def search(self, text, limit=None):
+        """Keys having a word starting with each word of text; None for an empty query"""
+        terms = list(dict.fromkeys(self.words(text)))
+        if not terms:
+            return None
+        matched = {term: self.prefix_words(term) for term in terms}
+        # Walk the term with the fewest postings
+        counts = {term: self.match_count(matched[term]) for term in terms}
+        driver = min(terms, key=counts.get)
+        # Other terms are intersected as posting sets in C, unless they span so
+        # many words that checking each candidate's own words is cheaper
+        joins, checks = [], []
+        for term in sorted(terms, key=counts.get):
+            if term == driver:
+                continue
+            if len(matched[term]) <= max(counts[driver], 1):
+                joins.append([self.postings[word] for word in matched[term]])
+            else:
+                checks.append(" " + term)
+        
+        results = []
+        seen = set() if len(matched[driver]) > 1 else None
+        for word in matched[driver]:
+            for candidates in self.chunks(self.postings[word], limit):
+                for sets in joins:
+                    if len(sets) == 1:
+                        candidates = candidates & sets[0]
+                    else:
+                        candidates = set().union(*[candidates & keys for keys in sets])
+                    if not candidates:
+                        break
+                for term in checks:
+                    candidates = [key for key in candidates if term in self.key_words[key]]
+                for key in candidates:
+                    if seen is not None:
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    results.append(key)
+                    if limit is not None and len(results) >= limit:
+                        return results
+        return results
+
+
+class ProductionSeriesStore:
+    """Append-only production time series per mineral/country with rollups
+    
+    Raw readings are appended to a flat binary file per entity. Daily, weekly
+    and monthly rollups (sum/count/min/max per bucket) are kept next to it and
+    updated on every append, so range queries only read the level they need.
+    """
+    
+    POINT = np.dtype([('t', '<i8'), ('v', '<f8')])
+    ROLLUP = np.dtype([('t', '<i8'), ('sum', '<f8'), ('count', '<i8'),
+                       ('min', '<f8'), ('max', '<f8')])
+    LEVELS = ('day', 'week', 'month')
+    # Approximate bucket width in seconds, used to pick a resolution
+    LEVEL_SECONDS = {'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400}
+    
+    def __init__(self, directory="mineral_app_timeseries"):
+        self.directory = directory
+        self.lock = threading.Lock()
+        # Bumped on every append, so cached history charts know they are stale
+        self.version = 0
+    
+    def path(self, entity, name, level=None):
+        # Dots are escaped too, since they separate the rollup level from the name
+        file_name = urllib.parse.quote(name, safe='').replace('.', '%2E')
+        suffix = ".bin" if level is None else f".{level}.bin"
+        return os.path.join(self.directory, entity, file_name + suffix)
+    
+    @staticmethod
+    def bucket_start(level, timestamps):
+        """Start of the day/week/month bucket for each timestamp (UTC seconds)"""
+        if level == 'day':
+            return timestamps - timestamps % 86400
+        if level == 'week':
+            days = timestamps // 86400
+            # 1970-01-01 was a Thursday; weeks start on Monday
+            return (days - (days + 3) % 7) * 86400
+        months = timestamps.astype('datetime64[s]').astype('datetime64[M]')
+        return months.astype('datetime64[s]').astype(np.int64)
+    
+    def append(self, entity, name, value, timestamp=None):
+        """Append a single reading"""
+        if timestamp is None:
+            timestamp = int(time.time())
+        self.append_many(entity, name, [timestamp], [value])
+    
+    def append_many(self, entity, name, timestamps, values):
+        """Append a batch of readings and update every rollup level"""
+        if len(timestamps) == 0:
+            return
+        points = np.empty(len(timestamps), dtype=self.POINT)
+        points['t'] = timestamps
+        points['v'] = values
+        points.sort(order='t')
+        
+        with self.lock:
+            path = self.path(entity, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            last = (np.fromfile(path, dtype=self.POINT, count=1,
+                                offset=size - self.POINT.itemsize)['t'][0] if size else None)
+            if last is None or points['t'][0] >= last:
+                with open(path, 'ab') as f:
+                    points.tofile(f)
+            else:
+                # Late readings: keep the raw file sorted so range queries can bisect
+                merged = np.concatenate([np.fromfile(path, dtype=self.POINT), points])
+                merged.sort(order='t', kind='stable')
+                merged.tofile(path)
+            for level in self.LEVELS:
+                self.merge_rollup(self.path(entity, name, level), level, points)
+            self.version += 1
+    
+    def merge_rollup(self, path, level, points):
+        """Fold sorted points into a rollup file, rewriting only the changed tail"""
+        buckets = self.bucket_start(level, points['t'])
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        new = np.empty(len(starts), dtype=self.ROLLUP)
+        new['t'] = buckets[starts]
+        new['sum'] = np.add.reduceat(points['v'], starts)
+        new['count'] = np.diff(np.r_[starts, len(points)])
+        new['min'] = np.minimum.reduceat(points['v'], starts)
+        new['max'] = np.maximum.reduceat(points['v'], starts)
+        
+        existing = np.fromfile(path, dtype=self.ROLLUP) if os.path.exists(path) else new[:0]
+        # Rows before the first touched bucket are unchanged on disk
+        keep = int(np.searchsorted(existing['t'], new['t'][0]))
+        tail = np.concatenate([existing[keep:], new])
+        tail.sort(order='t', kind='stable')
+        starts = np.flatnonzero(np.r_[True, tail['t'][1:] != tail['t'][:-1]])
+        merged = np.empty(len(starts), dtype=self.ROLLUP)
+        merged['t'] = tail['t'][starts]
+        merged['sum'] = np.add.reduceat(tail['sum'], starts)
+        merged['count'] = np.add.reduceat(tail['count'], starts)
+        merged['min'] = np.minimum.reduceat(tail['min'], starts)
+        merged['max'] = np.maximum.reduceat(tail['max'], starts)
+        
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            f.seek(keep * self.ROLLUP.itemsize)
+            merged.tofile(f)
+            f.truncate()
+    
+    def pick_resolution(self, start, end, max_points):
+        """Finest level whose bucket count over [start, end] fits in max_points"""
+        span = max(end - start, 1)
+        for level in self.LEVELS:
+            if span / self.LEVEL_SECONDS[level] <= max_points:
+                return level
+        return self.LEVELS[-1]
+    
+    def query(self, entity, name, start=None, end=None, resolution=None, max_points=500):
+        """Return (timestamps, values, resolution) for a time range
+        
+        resolution is 'raw', 'day', 'week' or 'month'; by default the coarsest
+        detail that still fits max_points is chosen. Rollups return the mean
+        production per bucket.
+        """
+        end = int(time.time()) if end is None else end
+        start = 0 if start is None else start
+        if resolution is None:
+            resolution = self.pick_resolution(start, end, max_points)
+        
+        with self.lock:
+            path = self.path(entity, name, None if resolution == 'raw' else resolution)
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0), resolution
+            dtype = self.POINT if resolution == 'raw' else self.ROLLUP
+            rows = np.memmap(path, dtype=dtype, mode='r')
+            low, high = np.searchsorted(rows['t'], [start, end + 1])
+            rows = np.array(rows[low:high])
+        
+        if resolution == 'raw':
+            return rows['t'], rows['v'], resolution
+        return rows['t'], rows['sum'] / rows['count'], resolution
+    
+    def names(self, entity):
+        """Names of every entity of a type that has recorded history"""
+        directory = os.path.join(self.directory, entity)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(urllib.parse.unquote(file_name[:-4])
+                      for file_name in os.listdir(directory)
+                      if file_name.endswith(".bin") and file_name.count('.') == 1)
+
+
+class ProductionRecorder:
+    """Writes live production readings to a ProductionSeriesStore off the UI thread
+    
+    add() only queues; a PersistenceWorker appends the queue in batches. Only
+    the latest reading per name and second is kept, so a fast feed does not
+    grow the raw history by thousands of points a second.
+    """
+    
+    ENTITIES = ('mineral', 'country')
+    
+    def __init__(self, store, delay=1.0):
+        self.store = store
+        self.lock = threading.Lock()
+        # (entity, name) -> {timestamp: value}
+        self.pending = {}
+        self.worker = PersistenceWorker(self.write_pending, delay=delay)
+    
+    def add(self, readings, timestamp=None):
+        """Queue (entity, name, value) readings taken at timestamp (now by default)"""
+        timestamp = int(time.time()) if timestamp is None else timestamp
+        with self.lock:
+            for entity, name, value in readings:
+                if entity in self.ENTITIES and name:
+                    self.pending.setdefault((entity, name), {})[timestamp] = value
+        self.worker.notify()
+    
+    def write_pending(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        series = list(pending.items())
+        for position, ((entity, name), readings) in enumerate(series):
+            try:
+                self.store.append_many(entity, name, list(readings), list(readings.values()))
+            except Exception:
+                # Queue this series and the rest again, behind anything added meanwhile
+                with self.lock:
+                    for key, old in series[position:]:
+                        self.pending[key] = dict(old, **self.pending.get(key, {}))
+                raise
+    
+    def stop(self):
+        """Write whatever is still queued and stop the worker"""
+        self.worker.stop()
+
+
+class RecordImporter:
+    """Stream a CSV or Excel file of minerals or countries through DataManager validation
+    
+    Parsing and validation run chunk by chunk on a background thread. Once
+    the UI has confirmed, start_commit() writes the valid rows on another
+    one, each chunk in a short transaction of its own so the UI thread can
+    take DataManager.lock in between. A cancelled or failed commit puts back
+    the records the committed chunks replaced. Change events are held in
+    events for the UI thread to publish.
+    """
+    
+    # entity -> columns in validator order
+    COLUMNS = {
+        'mineral': ('Name', 'Location', 'Production', 'Color', 'Latitude', 'Longitude'),
+        'country': ('Name', 'Production', 'GDP', 'Projects', 'Color'),
+    }
+    # Columns the file may leave out
+    OPTIONAL = ('Color', 'Latitude', 'Longitude')
+    
+    # Only the first errors are kept for the report; error_count has the total
+    max_errors = 1000
+    
+    def __init__(self, manager, entity, path, chunk_size=50000, commit_chunk_size=2000):
+        self.manager = manager
+        self.entity = entity
+        self.path = path
+        self.chunk_size = chunk_size
+        self.commit_chunk_size = commit_chunk_size
+        self.committing = False
+        self.committed = 0
+        # Set once a cancelled or failed commit has undone the chunks already written
+        self.rolled_back = False
+        self.events = []
+        self.rows = []
+        # File row number of each valid row, for errors found at commit time
+        self.row_numbers = []
+        # (row number, message) of rows dropped at commit time
+        self.conflicts = []
+        self.errors = []
+        self.error_count = 0
+        self.row_count = 0
+        self.progress = 0.0
+        self.done = False
+        self.failure = None
+        self.cancelled = threading.Event()
+        # Existing mineral names are snapshotted up front so validation never
+        # reads the section while the UI may be changing it; run_commit checks
+        # them again for minerals added since
+        if entity == 'mineral':
+            existing = set(manager.MineralData)
+            self.check = lambda rows, seen, start: manager.check_minerals(rows, seen, start, existing)
+        else:
+            self.check = manager.check_countries
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def cancel(self):
+        self.cancelled.set()
+    
+    def run(self):
+        try:
+            seen = set()
+            for chunk, progress in self.read_chunks():
+                if self.cancelled.is_set():
+                    return
+                rows = self.select_columns(chunk).itertuples(index=False, name=None)
+                start = self.row_count + 1
+                valid, errors = self.check(rows, seen, start=start)
+                failed = {number for number, _ in errors}
+                self.rows.extend(valid)
+                self.row_numbers.extend(number for number in range(start, start + len(chunk))
+                                        if number not in failed)
+                self.errors.extend(errors[:self.max_errors - len(self.errors)])
+                self.error_count += len(errors)
+                self.row_count += len(chunk)
+                self.progress = progress
+        except Exception as e:
+            self.failure = e
+        finally:
+            self.done = True
+    
+    def read_chunks(self):
+        """Yield (DataFrame of strings, fraction done) for each chunk of the file"""
+        if self.path.lower().endswith(('.xlsx', '.xls')):
+            # Excel files cannot be read incrementally, so slice the loaded sheet
+            frame = pd.read_excel(self.path, dtype=str, keep_default_na=False)
+            total = max(len(frame), 1)
+            for start in range(0, len(frame), self.chunk_size):
+                yield frame.iloc[start:start + self.chunk_size], min(start + self.chunk_size, total) / total
+            return
+        total = max(os.path.getsize(self.path), 1)
+        with open(self.path, 'rb') as f:
+            for chunk in pd.read_csv(f, dtype=str, keep_default_na=False, chunksize=self.chunk_size):
+                yield chunk, min(f.tell() / total, 1.0)
+    
+    def select_columns(self, chunk):
+        """Match headers case-insensitively and order them for the validator"""
+        headers = {str(column).strip().lower(): column for column in chunk.columns}
+        columns = self.COLUMNS[self.entity]
+        missing = [column for column in columns
+                   if column.lower() not in headers and column not in self.OPTIONAL]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+        for column in columns:
+            if column.lower() not in headers:
+                chunk = chunk.assign(**{column: ""})
+                headers[column.lower()] = column
+        return chunk[[headers[column.lower()] for column in columns]]
+    
+    def start_commit(self):
+        """Write the valid rows on a worker thread; done is set again when it finishes"""
+        self.committing = True
+        self.done = False
+        self.progress = 0.0
+        self.thread = threading.Thread(target=self.run_commit, daemon=True)
+        self.thread.start()
+    
+    def run_commit(self):
+        store = self.manager.store_minerals if self.entity == 'mineral' else self.manager.store_countries
+        try:
+            for start in range(0, len(self.rows), self.commit_chunk_size):
+                if self.cancelled.is_set():
+                    raise ImportCancelled()
+                chunk = self.rows[start:start + self.commit_chunk_size]
+                with self.manager.transaction(self.events):
+                    if self.entity == 'mineral':
+                        chunk = self.drop_conflicts(chunk, self.row_numbers[start:start + len(chunk)])
+                    store(chunk)
+                self.committed += len(chunk)
+                self.progress = min(start + self.commit_chunk_size, len(self.rows)) / len(self.rows)
+        except Exception as e:
+            if not isinstance(e, ImportCancelled):
+                self.failure = e
+            try:
+                self.undo()
+            except Exception as undo_failure:
+                self.failure = self.failure or undo_failure
+        finally:
+            self.done = True
+    
+    def drop_conflicts(self, rows, numbers):
+        """Rows whose mineral was not added since validation; the others become conflicts"""
+        records = self.manager.MineralData
+        kept = []
+        for row, number in zip(rows, numbers):
+            if row[0] in records:
+                # Storing it would overwrite the mineral added in the meantime
+                self.conflicts.append((number, "Mineral already exists"))
+            else:
+                kept.append(row)
+        return kept
+    
+    def undo(self):
+        """Put back the records replaced by the chunks already committed, a chunk at a time"""
+        section = 'MineralData' if self.entity == 'mineral' else 'CountryProfiles'
+        records = self.manager.section(section)
+        written = [event for event in self.events if event.entity == self.entity]
+        written.reverse()
+        for start in range(0, len(written), self.commit_chunk_size):
+            with self.manager.transaction(self.events):
+                for event in written[start:start + self.commit_chunk_size]:
+                    # Records changed again since, e.g. edited in the UI, are left alone
+                    if records.get(event.key) == event.new:
+                        self.manager.set_record(section, event.key, event.old)
+            self.progress = 1 - min(start + self.commit_chunk_size, len(written)) / len(written)
+        self.committed = 0
+        self.rolled_back = True
+
+
+class ImportCancelled(Exception):
+    """Raised by RecordImporter.run_commit to stop and undo the commit"""
+
+
+class BulkValidationError(ValueError):
+    """Raised by DataManager bulk methods; errors is a list of (row number, message)"""
+    
+    def __init__(self, errors):
+        self.errors = errors
+        summary = "; ".join(f"row {number}: {message}" for number, message in errors[:5])
+        if len(errors) > 5:
+            summary += f"; and {len(errors) - 5} more"
+        super().__init__(summary)
+
+
+# Published by DataManager after every mutation; action is 'added', 'updated'
+# or 'deleted', entity is 'mineral', 'country' or 'user', old/new are records or None.
+# Large transactions publish a single 'reloaded' event with key, old and new None.
+ChangeEvent = namedtuple('ChangeEvent', ['action', 'entity', 'key', 'old', 'new'])
+
 
 class DataManager:
     """Class to handle all data persistence"""
     
-    def __init__(self):
-        self.data_file = "mineral_app_data.json"
+    SECTIONS = ('MineralData', 'CountryProfiles', 'Users')
+    
+    ENTITIES = {'MineralData': 'mineral', 'CountryProfiles': 'country', 'Users': 'user'}
+    
+    # Secondary indexes for the in-memory backend: hash name -> (field, derive), sorted fields
+    INDEXES = {
+        'MineralData': ({'Location': ('Location', None),
+                         'Country': ('Location', location_country)},
+                        ('Production',)),
+        'CountryProfiles': ({}, ('Production', 'GDP', 'Projects')),
+    }
+    
+    # Text fields searched by search() besides the record name
+    SEARCH_FIELDS = {'MineralData': ('Location',), 'CountryProfiles': ()}
+    
+    # Sections held in memory as ColumnarTable; Users stays a plain dict
+    COLUMNAR_SCHEMAS = {
+        'MineralData': (('Location', 'category'), ('Production', 'int'), ('Color', 'category'),
+                        ('Latitude', 'float'), ('Longitude', 'float')),
+        'CountryProfiles': (('Production', 'int'), ('GDP', 'int'), ('Projects', 'int'),
+                            ('Color', 'category')),
+    }
+    
+    # Transactions with more changes than this publish one 'reloaded' event per entity
+    event_batch_limit = 200
+    
+    def __init__(self, backend="json", **storage_options):
+        # Sections are loaded from storage the first time they are accessed
+        self.sections = {}
+        # Guards in-memory sections against the persistence worker
+        self.lock = threading.RLock()
+        # Bumped on every mutation so views and caches can tell when data changed
+        self.data_version = 0
+        self.subscribers = []
+        self.production_series = ProductionSeriesStore()
+        # Built on first query and then maintained by set_record
+        self.indexes = {}
+        self.search_indexes = {}
+        # section -> (build thread, changes made while it runs) for search indexes being built
+        self.search_builds = {}
+        # Set while a transaction() is open: (section, key, old, new, position) and events
+        self.pending_changes = None
+        self.pending_events = None
+        # During a transaction: section -> index changes not applied yet, and those applied early
+        self.index_backlog = None
+        self.index_applied = None
+        if backend == "sqlite":
+            self.storage = SQLiteStorage(self, **storage_options)
+        else:
+            self.storage = JsonStorage(self, **storage_options)
         self.load_data()
     
     def load_data(self):
-        """Load data from file or create default data"""
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.MineralData = data.get('MineralData', self.get_default_minerals())
-                self.CountryProfiles = data.get('CountryProfiles', self.get_default_countries())
-                self.Users = data.get('Users', self.get_default_users())
-        except FileNotFoundError:
-            # Create default data if file doesn't exist
-            self.MineralData = self.get_default_minerals()
-            self.CountryProfiles = self.get_default_countries()
-            self.Users = self.get_default_users()
-            self.save_data()
+        """Open the configured storage backend; sections load lazily"""
+        self.sections = {}
+        self.indexes = {}
+        self.search_indexes = {}
+        self.search_builds = {}
+        self.storage.load()
+    
+    def section(self, name):
+        """Return a data section, loading it on first access"""
+        records = self.sections.get(name)
+        if records is None:
+            with self.lock:
+                records = self.sections.get(name)
+                if records is None:
+                    records = self.sections[name] = self.storage.load_section(name)
+        return records
+    
+    @property
+    def MineralData(self):
+        return self.section('MineralData')
+    
+    @property
+    def CountryProfiles(self):
+        return self.section('CountryProfiles')
+    
+    @property
+    def Users(self):
+        return self.section('Users')
     
     def save_data(self):
-        """Save all data to file"""
-        data = {
-            'MineralData': self.MineralData,
-            'CountryProfiles': self.CountryProfiles,
-            'Users': self.Users
-        }
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        """Save all data through the configured storage backend"""
+        self.storage.save()
+    
+    def flush(self):
+        """Block until all pending changes are on disk
+        
+        Returns the exception if writing failed, else None.
+        """
+        return self.storage.flush()
+    
+    def write_failure(self):
+        """Exception of the last failed background write, or None once writes succeed"""
+        return self.storage.failure
+    
+    def close(self):
+        """Flush and release the storage backend"""
+        self.storage.close()
+    
+    def subscribe(self, callback, entity=None):
+        """Call callback(event) after every change, optionally for one entity type"""
+        self.subscribers.append((callback, entity))
+    
+    def unsubscribe(self, callback):
+        self.subscribers = [(cb, entity) for cb, entity in self.subscribers if cb != callback]
+    
+    def publish(self, event):
+        # Iterate over a copy so handlers may unsubscribe while being notified
+        for callback, entity in list(self.subscribers):
+            if entity is None or entity == event.entity:
+                callback(event)
+    
+    def set_record(self, section, key, value):
+        """Apply a single-record change, persist it and publish a change event"""
+        records = self.section(section)
+        with self.lock:
+            old = records.get(key)
+            position = None
+            if value is None:
+                if self.pending_changes is not None and not self.storage.transactional:
+                    # Remember where the record sat so a rollback can put it back
+                    position = list(records).index(key) if isinstance(records, dict) else records.index[key]
+                del records[key]
+            else:
+                records[key] = value
+            if self.index_backlog is not None:
+                # Indexes catch up once, at commit, rather than per record
+                self.index_backlog.setdefault(section, []).append((key, old, value))
+            else:
+                self.update_indexes(section, [(key, old, value)])
+            self.data_version += 1
+            
+            if value is None:
+                action = 'deleted'
+            elif old is None:
+                action = 'added'
+            else:
+                action = 'updated'
+            event = ChangeEvent(action, self.ENTITIES[section], key, old, value)
+            
+            if self.pending_changes is not None:
+                self.pending_changes.append((section, key, old, value, position))
+                self.pending_events.append(event)
+                return
+            self.storage.record(section, key, value)
+        self.publish(event)
+    
+    def update_indexes(self, section, changes):
+        """Apply (key, old, new) changes to a section's query and search indexes"""
+        changes = net_changes(changes)
+        if section in self.indexes:
+            self.indexes[section].update_many(changes)
+        if section in self.search_indexes:
+            self.search_indexes[section].update_many(changes)
+        elif section in self.search_builds:
+            self.search_builds[section][1].extend(changes)
+    
+    def apply_index_backlog(self, section):
+        """Bring a section's indexes up to date inside a transaction, before they are queried"""
+        changes = self.index_backlog.pop(section, None) if self.index_backlog else None
+        if changes:
+            self.update_indexes(section, changes)
+            self.index_applied.extend((section, key, old, new) for key, old, new in changes)
+    
+    @contextlib.contextmanager
+    def transaction(self, hold_events=None):
+        """Group mutations so they are persisted and published once, or not at all
+        
+        Changes are applied in memory as they are made. If the block raises,
+        they are undone in reverse order and nothing is written or published.
+        Given a list as hold_events, the change events are added to it instead
+        of being published, so a worker thread can leave publish_events() to
+        the UI thread.
+        """
+        with self.lock:
+            if self.pending_changes is not None:
+                # Nested transactions join the outermost one
+                yield
+                return
+            self.pending_changes, self.pending_events = [], []
+            self.index_backlog, self.index_applied = {}, []
+            try:
+                yield
+            except BaseException:
+                self.rollback_changes(self.pending_changes)
+                self.pending_changes = self.pending_events = None
+                self.index_backlog = self.index_applied = None
+                raise
+            changes, events = self.pending_changes, self.pending_events
+            backlog = self.index_backlog
+            self.pending_changes = self.pending_events = None
+            self.index_backlog = self.index_applied = None
+            for section, section_changes in backlog.items():
+                self.update_indexes(section, section_changes)
+            if changes:
+                self.storage.record_many([(section, key, new)
+                                          for section, key, _, new, _ in changes])
+        if hold_events is not None:
+            hold_events.extend(events)
+        else:
+            self.publish_events(events)
+    
+    def publish_events(self, events):
+        """Publish the events of a committed transaction"""
+        if len(events) > self.event_batch_limit:
+            # Screens rebuild once rather than patching thousands of rows
+            for entity in dict.fromkeys(event.entity for event in events):
+                self.publish(ChangeEvent('reloaded', entity, None, None, None))
+            return
+        for event in events:
+            self.publish(event)
+    
+    def rollback_changes(self, changes):
+        """Undo uncommitted changes, restoring records to their original positions"""
+        if self.storage.transactional:
+            self.storage.rollback()
+        else:
+            for section, key, old, new, position in reversed(changes):
+                records = self.sections[section]
+                if old is None:
+                    del records[key]
+                elif position is None:
+                    records[key] = old
+                elif isinstance(records, dict):
+                    items = list(records.items())
+                    items.insert(position, (key, old))
+                    records.clear()
+                    records.update(items)
+                else:
+                    records.insert_at(position, key, old)
+        # Only changes already applied to the indexes need undoing there
+        undo = {}
+        for section, key, old, new in reversed(self.index_applied):
+            undo.setdefault(section, []).append((key, new, old))
+        for section, section_changes in undo.items():
+            self.update_indexes(section, section_changes)
+        self.data_version += 1
+    
+    def validate_mineral(self, name, location, production, color, latitude=None, longitude=None,
+                         check_exists=True):
+        """Check and normalize mineral fields; raises ValueError with a user-facing message
+        
+        Coordinates are optional, but must be given together; missing ones come back as None.
+        """
+        name, location, production, color = (str(value).strip() for value in
+                                             (name, location, production, color))
+        latitude, longitude = ("" if value is None else str(value).strip() for value in (latitude, longitude))
+        if not all([name, location, production]):
+            raise ValueError("Please fill in all fields")
+        try:
+            production = int(production)
+        except ValueError:
+            raise ValueError("Production must be a number")
+        if latitude or longitude:
+            try:
+                latitude, longitude = float(latitude), float(longitude)
+            except ValueError:
+                raise ValueError("Latitude and Longitude must both be numbers")
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValueError("Latitude must be between -90 and 90, Longitude between -180 and 180")
+        else:
+            latitude = longitude = None
+        if check_exists and name in self.MineralData:
+            raise ValueError("Mineral already exists")
+        return name, location, production, color or "#1f77b4", latitude, longitude
+    
+    def validate_country(self, name, production, gdp, projects, color, check_exists=True):
+        """Check and normalize country fields; raises ValueError with a user-facing message"""
+        name, production, gdp, projects, color = (str(value).strip() for value in
+                                                  (name, production, gdp, projects, color))
+        if not all([name, production, gdp, projects]):
+            raise ValueError("Please fill in all fields")
+        try:
+            production, gdp, projects = int(production), int(gdp), int(projects)
+        except ValueError:
+            raise ValueError("Production, GDP, and Projects must be numbers")
+        if check_exists and name in self.CountryProfiles:
+            raise ValueError("Country already exists")
+        return name, production, gdp, projects, color or "#2ca02c"
+    
+    def check_rows(self, rows, validate, label, seen, start=1):
+        """Validate rows, returning (valid rows, [(row number, message)])
+        
+        seen holds names already accepted, so a file can be checked chunk by chunk.
+        """
+        valid, errors = [], []
+        for number, row in enumerate(rows, start=start):
+            try:
+                fields = validate(*row)
+                if fields[0] in seen:
+                    raise ValueError(f"Duplicate {label} '{fields[0]}' in batch")
+            except (ValueError, TypeError) as e:
+                errors.append((number, str(e)))
+                continue
+            seen.add(fields[0])
+            valid.append(fields)
+        return valid, errors
+    
+    def check_minerals(self, rows, seen, start=1, existing=None):
+        """Validate mineral rows; existing is a snapshot of names to use instead of the table"""
+        if existing is None:
+            return self.check_rows(rows, self.validate_mineral, "mineral", seen, start)
+        
+        def validate(*row):
+            fields = self.validate_mineral(*row, check_exists=False)
+            if fields[0] in existing:
+                raise ValueError("Mineral already exists")
+            return fields
+        
+        return self.check_rows(rows, validate, "mineral", seen, start)
+    
+    def check_countries(self, rows, seen, start=1):
+        # Countries are upserted, so existing names are allowed
+        def validate(*row):
+            return self.validate_country(*row, check_exists=False)
+        
+        return self.check_rows(rows, validate, "country", seen, start)
+    
+    def add_minerals_bulk(self, rows):
+        """Add many (name, location, production, color[, latitude, longitude]) rows all-or-nothing"""
+        minerals, errors = self.check_minerals(rows, set())
+        if errors:
+            raise BulkValidationError(errors)
+        return self.store_minerals(minerals)
+    
+    def upsert_countries_bulk(self, rows):
+        """Add or replace many (name, production, gdp, projects, color) rows all-or-nothing"""
+        countries, errors = self.check_countries(rows, set())
+        if errors:
+            raise BulkValidationError(errors)
+        return self.store_countries(countries)
+    
+    def store_minerals(self, minerals):
+        """Write already validated mineral rows in one transaction"""
+        with self.transaction():
+            for mineral in minerals:
+                self.add_mineral(*mineral)
+        return len(minerals)
+    
+    def store_countries(self, countries):
+        """Write already validated country rows in one transaction"""
+        with self.transaction():
+            for country in countries:
+                self.add_country(*country)
+        return len(countries)
+    
+    def query_section(self, section):
+        """Object serving select() for a section: the SQLite table or its indexes"""
+        records = self.section(section)
+        if hasattr(records, 'select'):
+            return records
+        with self.lock:
+            # Indexes built now start from the records with the open transaction's changes
+            self.apply_index_backlog(section)
+            index = self.indexes.get(section)
+            if index is None:
+                hash_fields, sorted_fields = self.INDEXES[section]
+                index = self.indexes[section] = SectionIndex(records, hash_fields, sorted_fields)
+        return index
+    
+    def prepare_search(self, section):
+        """Start building a section's search index on a background thread
+        
+        The records are read here, on the caller's thread; changes made while
+        the index is being built are queued and replayed before it is used.
+        """
+        fields = self.SEARCH_FIELDS[section]
+        records = self.section(section)
+        with self.lock:
+            self.apply_index_backlog(section)
+            if section in self.search_indexes or section in self.search_builds:
+                return
+            keys = list(records)
+            columns = [records.field_values(keys, field) for field in fields]
+            
+            def build():
+                index = SearchIndex(fields)
+                index.build(keys, columns)
+                with self.lock:
+                    index.update_many(net_changes(self.search_builds.pop(section)[1]))
+                    self.search_indexes[section] = index
+            
+            thread = threading.Thread(target=build, daemon=True)
+            self.search_builds[section] = (thread, [])
+        thread.start()
+    
+    def search(self, section, text, limit=None):
+        """Keys whose name or search fields have words starting with every word of text
+        
+        Returns None for an empty query, meaning no search is active.
+        """
+        if not SearchIndex.words(text):
+            return None
+        self.prepare_search(section)
+        build = self.search_builds.get(section)
+        if build is not None:
+            # Only the first query typed before the index is ready has to wait
+            build[0].join()
+        with self.lock:
+            self.apply_index_backlog(section)
+            return self.search_indexes[section].search(text, limit)
+    
+    def find_minerals(self, location=None, country=None, production_range=None,
+                      order_by=None, descending=False, limit=None, offset=0):
+        """Query minerals by exact Location, country part of Location and production range
+        
+        Returns a list of (name, record); order_by may be 'name' or 'Production'.
+        """
+        query = self.query_section('MineralData')
+        equals = {}
+        if location is not None:
+            equals['Location'] = location
+        ranges = {'Production': production_range} if production_range else {}
+        
+        if country is not None:
+            equals['Country'] = country
+        return query.select(equals, ranges, order_by, descending, limit, offset)
+    
+    def find_countries(self, production_range=None, gdp_range=None, projects_range=None,
+                       order_by=None, descending=False, limit=None, offset=0):
+        """Query country profiles by Production, GDP and Projects ranges
+        
+        Returns a list of (name, record); order_by may be 'name', 'Production',
+        'GDP' or 'Projects'.
+        """
+        ranges = {}
+        for field, value in (('Production', production_range), ('GDP', gdp_range),
+                             ('Projects', projects_range)):
+            if value:
+                ranges[field] = value
+        return self.query_section('CountryProfiles').select(
+            None, ranges, order_by, descending, limit, offset)
+    
+    def top_minerals(self, k, by='Production'):
+        return self.find_minerals(order_by=by, descending=True, limit=k)
+    
+    def top_countries(self, k, by='GDP'):
+        return self.find_countries(order_by=by, descending=True, limit=k)
+    
+    def mineral_sites(self):
+        """Return (names, latitudes, longitudes, production) arrays of minerals to plot on a map
+        
+        Minerals without coordinates are placed at their country from
+        COUNTRY_COORDINATES; those whose country is unknown are left out.
+        """
+        minerals = self.MineralData
+        names = np.asarray(list(minerals), dtype=object)
+        latitudes = np.array(minerals.column('Latitude'), dtype=float)
+        longitudes = np.array(minerals.column('Longitude'), dtype=float)
+        missing = np.isnan(latitudes)
+        if missing.any():
+            # Look each distinct location up once
+            codes, locations = pd.factorize(minerals.column('Location')[missing])
+            fallback = np.array([COUNTRY_COORDINATES.get(location_country(location), (np.nan, np.nan))
+                                 for location in locations], dtype=float).reshape(-1, 2)
+            latitudes[missing] = fallback[codes, 0]
+            longitudes[missing] = fallback[codes, 1]
+        placed = ~np.isnan(latitudes)
+        production = np.asarray(minerals.column('Production'), dtype=np.int64)
+        return names[placed], latitudes[placed], longitudes[placed], production[placed]
+    
+    def mineral_countries(self):
+        """Distinct countries referenced by mineral locations"""
+        query = self.query_section('MineralData')
+        if isinstance(query, SQLiteTable):
+            return sorted(query.distinct('Country'))
+        return sorted(query.hash_indexes['Country'].keys)
+    
+    def record_production(self, entity, name, value, timestamp=None):
+        """Append a production reading for a 'mineral' or 'country'"""
+        self.production_series.append(entity, name, value, timestamp)
+    
+    def production_history(self, entity, name, start=None, end=None, resolution=None,
+                           max_points=500):
+        """Return (timestamps, values, resolution) of recorded production"""
+        return self.production_series.query(entity, name, start, end, resolution, max_points)
+    
+    def get_default_section(self, section):
+        return {
+            'MineralData': self.get_default_minerals,
+            'CountryProfiles': self.get_default_countries,
+            'Users': self.get_default_users
+        }[section]()
     
     def get_default_minerals(self):
         return {
@@ -76,78 +2085,1237 @@ class DataManager:
             "abigail": {"password": "sekwati", "role": "Administrator"}
         }
     
-    def add_mineral(self, name, location, production, color):
-        self.MineralData[name] = {
-            "Location": location,
-            "Production": production,
-            "Color": color
-        }
-        self.save_data()
-    
-    def update_mineral(self, old_name, new_name, location, production, color):
-        if old_name != new_name and old_name in self.MineralData:
-            del self.MineralData[old_name]
-        self.MineralData[new_name] = {
+    def mineral_record(self, location, production, color, latitude=None, longitude=None):
+        record = {
             "Location": location,
             "Production": production,
             "Color": color
         }
-        self.save_data()
+        if latitude is not None:
+            record["Latitude"] = latitude
+            record["Longitude"] = longitude
+        return record
+    
+    def add_mineral(self, name, location, production, color, latitude=None, longitude=None):
+        self.set_record('MineralData', name,
+                        self.mineral_record(location, production, color, latitude, longitude))
+    
+    def update_mineral(self, old_name, new_name, location, production, color,
+                       latitude=None, longitude=None):
+        if old_name != new_name and old_name in self.MineralData:
+            self.set_record('MineralData', old_name, None)
+        self.set_record('MineralData', new_name,
+                        self.mineral_record(location, production, color, latitude, longitude))
     
     def delete_mineral(self, name):
         if name in self.MineralData:
-            del self.MineralData[name]
-            self.save_data()
+            self.set_record('MineralData', name, None)
             return True
         return False
     
     def add_country(self, name, production, gdp, projects, color):
-        self.CountryProfiles[name] = {
+        self.set_record('CountryProfiles', name, {
             "Production": production,
             "GDP": gdp,
             "Projects": projects,
             "Color": color
-        }
-        self.save_data()
+        })
     
     def update_country(self, old_name, new_name, production, gdp, projects, color):
         if old_name != new_name and old_name in self.CountryProfiles:
-            del self.CountryProfiles[old_name]
-        self.CountryProfiles[new_name] = {
+            self.set_record('CountryProfiles', old_name, None)
+        self.set_record('CountryProfiles', new_name, {
             "Production": production,
             "GDP": gdp,
             "Projects": projects,
             "Color": color
-        }
-        self.save_data()
+        })
     
     def delete_country(self, name):
         if name in self.CountryProfiles:
-            del self.CountryProfiles[name]
-            self.save_data()
+            self.set_record('CountryProfiles', name, None)
             return True
         return False
     
     def add_user(self, username, password, role):
-        self.Users[username] = {"password": password, "role": role}
-        self.save_data()
+        self.set_record('Users', username, {"password": password, "role": role})
     
     def delete_user(self, username):
         if username in self.Users:
-            del self.Users[username]
-            self.save_data()
+            self.set_record('Users', username, None)
             return True
         return False
 
+class VirtualCardList:
+    """Scrollable list of fixed-height cards that only builds the cards in view
+    
+    create_card(parent) builds an empty card and returns its widgets as a
+    dict with a 'frame'; fill_card(card, key, record) fills it in. Cards that
+    scroll out of view are refilled with the records scrolling in, so the
+    number of widgets depends on the window height, not the record count.
+    """
+    
+    def __init__(self, parent, row_height, create_card, fill_card, bg, overscan=2):
+        self.row_height = row_height
+        self.create_card = create_card
+        self.fill_card = fill_card
+        # Extra rows built above and below the viewport so scrolling stays smooth
+        self.overscan = overscan
+        self.keys = []
+        self.records = {}
+        self.cards = []
+        # Debug counters for checking that updates cost O(changes)
+        self.created = self.destroyed = self.filled = 0
+        
+        container = tk.Frame(parent, bg=bg)
+        container.pack(fill='both', expand=True)
+        self.canvas = tk.Canvas(container, bg=bg, highlightthickness=0,
+                                yscrollincrement=row_height // 4)
+        scrollbar = ttk.Scrollbar(container, orient="vertical", command=self.yview)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        self.canvas.pack(side="left", fill="both", expand=True, padx=20, pady=20)
+        scrollbar.pack(side="right", fill="y", padx=(0, 20), pady=20)
+        
+        self.canvas.bind("<Configure>", lambda e: self.render())
+        # Changes made while the screen was hidden are reconciled when it shows again
+        self.canvas.bind("<Map>", lambda e: self.render(refresh=True))
+        self.bind_wheel(self.canvas)
+    
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.yview("scroll", int(-1*(e.delta/120)), "units"))
+        for child in widget.winfo_children():
+            self.bind_wheel(child)
+    
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.render()
+    
+    def set_rows(self, records, keys=None):
+        """Show the given keys of records, or every key in table order"""
+        self.records = records
+        self.keys = list(records if keys is None else keys)
+        self.update_scrollregion()
+        self.render(refresh=True)
+    
+    def add(self, key):
+        self.keys.append(key)
+        self.update_scrollregion()
+        self.render()
+    
+    def remove(self, key):
+        if key in self.keys:
+            self.keys.remove(key)
+            self.update_scrollregion()
+            self.render()
+    
+    def update(self, key):
+        """Refill the card showing key, if it is in view"""
+        for card in self.cards:
+            if card['key'] == key:
+                self.fill(card, key, self.records[key])
+    
+    def update_scrollregion(self):
+        # Only the height matters; the list never scrolls sideways
+        self.canvas.configure(scrollregion=(0, 0, 1, len(self.keys) * self.row_height))
+    
+    def render(self, refresh=False):
+        """Reconcile cards with the visible rows by key
+        
+        Cards already showing a visible key stay put (and are refilled only on
+        refresh if their record changed), rows scrolling into view take over
+        cards that scrolled out, and cards beyond what the viewport needs are
+        destroyed.
+        """
+        if not self.canvas.winfo_ismapped():
+            return
+        width = self.canvas.winfo_width()
+        top = self.canvas.canvasy(0)
+        first = max(int(top // self.row_height) - self.overscan, 0)
+        last = min(int((top + self.canvas.winfo_height()) // self.row_height) + 1 + self.overscan,
+                   len(self.keys))
+        
+        by_key = {card['key']: card for card in self.cards}
+        placed, unplaced = [], []
+        for row in range(first, last):
+            key = self.keys[row]
+            card = by_key.pop(key, None)
+            if card is None:
+                unplaced.append(row)
+                continue
+            if refresh:
+                record = self.records[key]
+                if record != card['record']:
+                    self.fill(card, key, record)
+            placed.append((row, card))
+        
+        spare = list(by_key.values())
+        for row in unplaced:
+            if spare:
+                card = spare.pop()
+            else:
+                card = self.create_card(self.canvas)
+                card['window'] = self.canvas.create_window(0, 0, window=card['frame'], anchor='nw')
+                self.bind_wheel(card['frame'])
+                self.created += 1
+            key = self.keys[row]
+            self.fill(card, key, self.records[key])
+            placed.append((row, card))
+        
+        for card in spare:
+            self.canvas.delete(card['window'])
+            card['frame'].destroy()
+            self.destroyed += 1
+        
+        self.cards = []
+        for row, card in placed:
+            self.canvas.coords(card['window'], 0, row * self.row_height + 10)
+            self.canvas.itemconfigure(card['window'], width=max(width, 1),
+                                      height=self.row_height - 20)
+            self.cards.append(card)
+    
+    def fill(self, card, key, record):
+        card['key'] = key
+        card['record'] = record
+        self.fill_card(card, key, record)
+        self.filled += 1
+
+
+class PagedTable:
+    """Treeview that shows one page of a keyed record set at a time
+    
+    Only the keys of the matching records are held; the records for the
+    current page are fetched when it is shown and written into a fixed set
+    of Treeview items, so paging and sorting never re-insert the table.
+    Sorting asks records.sort_order for the order of the keys by one field,
+    and caches it until the rows change.
+    """
+    
+    def __init__(self, parent, tree, records, fields, row_values, page_size=100):
+        self.tree = tree
+        self.records = records
+        # Record field shown in each Treeview column; 'name' is the record key
+        self.fields = dict(zip(tree['columns'], fields))
+        self.row_values = row_values
+        self.page_size = page_size
+        self.keys = []
+        self.view = []
+        self.page = 0
+        self.page_keys = []
+        self.sort_column = None
+        self.descending = False
+        self.orders = {}
+        
+        for column in tree['columns']:
+            tree.heading(column, command=lambda c=column: self.sort(c))
+        
+        # Pager bar; packed before the tree so it keeps its place at the bottom
+        pager = tk.Frame(parent, bg='white')
+        pager.pack(side='bottom', fill='x', padx=10, pady=(0, 10))
+        ttk.Button(pager, text="◀ Prev", style='Secondary.TButton',
+                  command=lambda: self.show_page(self.page - 1)).pack(side='left')
+        self.page_label = tk.Label(pager, font=('Segoe UI', 9), bg='white')
+        self.page_label.pack(side='left', padx=10)
+        ttk.Button(pager, text="Next ▶", style='Secondary.TButton',
+                  command=lambda: self.show_page(self.page + 1)).pack(side='left')
+    
+    def set_keys(self, keys):
+        """Show a new set of record keys, keeping the current sort"""
+        self.keys = list(keys)
+        self.orders = {}
+        self.apply_sort()
+        self.show_page(0)
+    
+    def sort(self, column):
+        """Sort by a column, toggling the direction when it is already sorted by it"""
+        self.descending = column == self.sort_column and not self.descending
+        self.sort_column = column
+        for name in self.tree['columns']:
+            arrow = (" ▼" if self.descending else " ▲") if name == column else ""
+            self.tree.heading(name, text=name + arrow)
+        self.apply_sort()
+        self.show_page(0)
+    
+    def apply_sort(self):
+        if self.sort_column is None:
+            self.view = self.keys
+            return
+        order = self.orders.get(self.sort_column)
+        if order is None:
+            order = self.orders[self.sort_column] = self.records.sort_order(
+                self.keys, self.fields[self.sort_column])
+        if self.descending:
+            order = order[::-1]
+        keys = self.keys
+        self.view = [keys[i] for i in order.tolist()]
+    
+    def show_page(self, page):
+        """Fetch and show the records of one page, reusing the Treeview items"""
+        pages = max((len(self.view) - 1) // self.page_size + 1, 1)
+        self.page = min(max(page, 0), pages - 1)
+        start = self.page * self.page_size
+        keys = self.page_keys = self.view[start:start + self.page_size]
+        
+        items = self.tree.get_children()
+        for position, key in enumerate(keys):
+            values = self.row_values(key, self.records[key])
+            if position < len(items):
+                self.tree.item(items[position], values=values)
+            else:
+                self.tree.insert('', 'end', values=values)
+        if len(items) > len(keys):
+            self.tree.delete(*items[len(keys):])
+        self.page_label.config(text=f"Page {self.page + 1} of {pages} ({len(self.view):,} rows)")
+    
+    def patch(self, event, matches=None, reload=None):
+        """Apply a change event to the key set and redraw the current page"""
+        if event.action == 'reloaded':
+            if reload is not None:
+                reload()
+            return
+        keep = event.action != 'deleted' and (matches is None or matches(event.new))
+        present = event.key in self.keys
+        if keep != present:
+            for keys in ((self.keys,) if self.view is self.keys else (self.keys, self.view)):
+                if keep:
+                    keys.append(event.key)
+                else:
+                    keys.remove(event.key)
+        # Sort values may have changed; the order is rebuilt on the next sort
+        self.orders = {}
+        if keep != present or event.key in self.page_keys:
+            self.show_page(self.page)
+
+
+def draw_value_bars(ax, names, values, colors, label_format, offset, fontsize=None, **options):
+    """Draw a bar per name with its formatted value printed above it"""
+    bars = ax.bar(names, values, color=colors, alpha=0.8, **options)
+    labels = [ax.text(bar.get_x() + bar.get_width()/2., 0, '', ha='center', va='bottom',
+                      fontweight='bold', fontsize=fontsize) for bar in bars]
+    set_bar_values(bars, labels, values, colors, label_format, offset)
+    return bars, labels
+
+
+def set_bar_values(bars, labels, values, colors, label_format, offset):
+    """Move existing bars and their value labels to new values"""
+    for bar, label, value, color in zip(bars, labels, values, colors):
+        bar.set_height(value)
+        bar.set_facecolor(color)
+        height = bar.get_height()
+        label.set_y(height + offset)
+        label.set_text(label_format.format(height))
+
+
+def draw_pie(ax, names, values, colors, startangle=90):
+    """Draw a pie that can later be resized, or shows an empty state while every value is 0
+    
+    Returns (wedges, texts, autotexts, empty_label) for set_pie_values.
+    """
+    # ax.pie refuses an all-zero pie, so the wedges start out equal and are emptied below
+    wedges, texts, autotexts = ax.pie(np.ones(len(values)), labels=names, autopct='%1.1f%%',
+                                      colors=colors, startangle=startangle)
+    empty_label = ax.text(0, 0, 'No data to show', ha='center', va='center',
+                          fontsize=12, color='gray', visible=False)
+    set_pie_values(wedges, texts, autotexts, empty_label, values, colors, startangle)
+    return wedges, texts, autotexts, empty_label
+
+
+def set_pie_values(wedges, texts, autotexts, empty_label, values, colors, startangle=90):
+    """Resize existing pie wedges and move their labels, as ax.pie would place them"""
+    total = float(np.sum(values))
+    empty = total == 0
+    empty_label.set_visible(empty)
+    for artist in (*wedges, *texts, *autotexts):
+        artist.set_visible(not empty)
+    if empty:
+        return
+    theta1 = startangle
+    for wedge, text, autotext, value, color in zip(wedges, texts, autotexts, values, colors):
+        theta2 = theta1 + 360. * value / total
+        wedge.set_theta1(theta1)
+        wedge.set_theta2(theta2)
+        wedge.set_facecolor(color)
+        angle = np.deg2rad((theta1 + theta2) / 2)
+        x, y = np.cos(angle), np.sin(angle)
+        text.set_position((1.1 * x, 1.1 * y))
+        text.set_horizontalalignment('left' if x > 0 else 'right')
+        autotext.set_position((0.6 * x, 0.6 * y))
+        autotext.set_text('%1.1f%%' % (100. * value / total))
+        theta1 = theta2
+
+
+def rescale(fig, *axes):
+    for ax in axes:
+        ax.relim()
+        ax.autoscale_view()
+    fig.tight_layout()
+
+
+def bar_chart_figure(names, values, colors, title, ylabel, label_format='{:,}', offset=50,
+                     figsize=(10, 6), fontsize=None, width=0.8, rotation=45):
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
+    bars, labels = draw_value_bars(ax, names, values, colors, label_format, offset, fontsize,
+                                   edgecolor='black', width=width)
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    ax.set_ylabel(ylabel)
+    if rotation:
+        ax.tick_params(axis='x', rotation=rotation)
+    fig.tight_layout()
+    fig.chart_artists = (ax, bars, labels)
+    return fig
+
+
+def update_bar_chart(fig, values, colors, label_format='{:,}', offset=50, **layout):
+    ax, bars, labels = fig.chart_artists
+    set_bar_values(bars, labels, values, colors, label_format, offset)
+    rescale(fig, ax)
+
+
+def pie_chart_figure(names, values, colors, title):
+    fig = Figure(figsize=(8, 8))
+    ax = fig.add_subplot()
+    wedges, texts, autotexts, empty_label = draw_pie(ax, names, values, colors)
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    
+    # Style the autotexts
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    
+    fig.tight_layout()
+    fig.chart_artists = (wedges, texts, autotexts, empty_label)
+    return fig
+
+
+def update_pie_chart(fig, values, colors, **layout):
+    set_pie_values(*fig.chart_artists, values, colors)
+
+
+# Title, value label format and label offset of the overview's bar charts
+OVERVIEW_BARS = (('Production (tons)', '{:,}', 50),
+                 ('GDP (R Millions)', 'R{:,}M', 500),
+                 ('Projects Count', '{}', 0.1))
+
+
+def overview_figure(countries, production, gdp, projects, colors):
+    """2x2 overview of every country: production, GDP and projects bars plus a projects pie"""
+    fig = Figure(figsize=(15, 12))
+    (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
+    fig.suptitle('All Countries - Comprehensive Overview', fontsize=16, fontweight='bold', y=0.95)
+    
+    bar_artists = []
+    for ax, values, (title, label_format, offset) in zip((ax1, ax2, ax3), (production, gdp, projects),
+                                                         OVERVIEW_BARS):
+        bars, labels = draw_value_bars(ax, countries, values, colors, label_format, offset, fontsize=8)
+        ax.set_title(title, fontweight='bold')
+        ax.tick_params(axis='x', rotation=45)
+        bar_artists.append((ax, bars, labels))
+    
+    # Pie chart for projects distribution
+    pie = draw_pie(ax4, countries, projects, colors)
+    ax4.set_title('Projects Distribution', fontweight='bold')
+    
+    fig.tight_layout()
+    fig.chart_artists = (bar_artists, pie)
+    return fig
+
+
+def update_overview(fig, production, gdp, projects, colors, **layout):
+    bar_artists, pie = fig.chart_artists
+    for (ax, bars, labels), values, (_, label_format, offset) in zip(
+            bar_artists, (production, gdp, projects), OVERVIEW_BARS):
+        set_bar_values(bars, labels, values, colors, label_format, offset)
+    set_pie_values(*pie, projects, colors)
+    rescale(fig, *(ax for ax, _, _ in bar_artists))
+
+
+def history_figure(name, resolution, timestamps, values, color):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    dates = timestamps.astype('datetime64[s]')
+    line, = ax.plot(dates, values, color=color, linewidth=1.5)
+    fill = ax.fill_between(dates, values, alpha=0.2, color=color)
+    
+    title = ax.set_title(f'{name} Production History ({resolution})', fontsize=14, fontweight='bold', pad=20)
+    ax.set_ylabel('Production (tonnes/day)')
+    fig.autofmt_xdate()
+    
+    fig.tight_layout()
+    fig.chart_artists = [ax, line, fill, title]
+    return fig
+
+
+def update_history(fig, name, resolution, timestamps, values, color):
+    ax, line, fill, title = fig.chart_artists
+    dates = timestamps.astype('datetime64[s]')
+    line.set_data(dates, values)
+    # A filled area has no set_data, so swap it for a new one
+    fill.remove()
+    fig.chart_artists[2] = ax.fill_between(dates, values, alpha=0.2, color=color)
+    title.set_text(f'{name} Production History ({resolution})')
+    rescale(fig, ax)
+
+
+# builder -> (in-place updater, options it can change); every other option
+# must match for a figure to be reused rather than rebuilt
+FIGURE_UPDATERS = {
+    bar_chart_figure: (update_bar_chart, {'values', 'colors', 'offset'}),
+    pie_chart_figure: (update_pie_chart, {'values', 'colors'}),
+    overview_figure: (update_overview, {'production', 'gdp', 'projects', 'colors'}),
+    history_figure: (update_history, {'name', 'resolution', 'timestamps', 'values'}),
+}
+
+
+def can_update(build, old, new):
+    """True when a figure built from old options can be updated in place to new ones"""
+    if build not in FIGURE_UPDATERS:
+        return False
+    changing = FIGURE_UPDATERS[build][1]
+    if old.keys() != new.keys():
+        return False
+    # Lists compare by value; arrays are only ever among the changing options
+    return all(old[option] == new[option] for option in old if option not in changing)
+
+
+def encode_figure(fig, format='png', dpi=100):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=format, dpi=dpi)
+    return buffer.getvalue()
+
+
+def render_chart(build, options, format='png', dpi=100):
+    """Build a figure with build(**options) and return it encoded as image bytes
+    
+    Figures are plain matplotlib Figure objects drawn by the Agg canvas, so
+    this is safe off the Tk thread and leaves nothing registered with pyplot.
+    """
+    fig = build(**options)
+    FigureCanvasAgg(fig)
+    return encode_figure(fig, format, dpi)
+
+
+# chart type -> (entity, field, builder, builder options, display title) of the
+# charts plotting one field of every mineral or country
+SERIES_CHARTS = {
+    'mineral_production': ('mineral', 'Production', bar_chart_figure,
+                           dict(title='Mineral Production (tonnes/day)', ylabel='Production (tonnes/day)'),
+                           "Mineral Production Analysis"),
+    'country_gdp': ('country', 'GDP', bar_chart_figure,
+                    dict(title='Country GDP (R Millions)', ylabel='GDP (R Millions)',
+                         label_format='R{:,}M', offset=500),
+                    "Country GDP Analysis"),
+    'projects_pie': ('country', 'Projects', pie_chart_figure,
+                     dict(title='Mining Projects Distribution'),
+                     "Projects Distribution"),
+    'country_production': ('country', 'Production', bar_chart_figure,
+                           dict(title='Country Mineral Production (tons)', ylabel='Production (tons)'),
+                           "Country Production Analysis"),
+}
+
+
+def series_chart(chart_type, names, values, colors):
+    """(builder, options, title) request for one of the SERIES_CHARTS"""
+    _, _, build, options, title = SERIES_CHARTS[chart_type]
+    return build, dict(options, names=names, values=values, colors=colors), title
+
+
+def comparison_chart(country1, data1, country2, data2, metric):
+    values = [data1[metric], data2[metric]]
+    return (bar_chart_figure,
+            dict(names=[country1, country2], values=values, colors=[data1['Color'], data2['Color']],
+                 title=f'{country1} vs {country2} - {metric} Comparison', ylabel=metric,
+                 offset=max(values)*0.05, fontsize=12, width=0.6, rotation=0),
+            f"Head-to-Head: {country1} vs {country2}")
+
+
+def overview_chart(countries):
+    """Request for the 2x2 overview of a CountryProfiles table"""
+    return (overview_figure,
+            dict(countries=list(countries),
+                 production=np.array(countries.column('Production')),
+                 gdp=np.array(countries.column('GDP')),
+                 projects=np.array(countries.column('Projects')),
+                 colors=list(countries.column('Color'))),
+            "All Countries Comprehensive Overview")
+
+
+def metric_overview_chart(metric, names, values, colors):
+    return (bar_chart_figure,
+            dict(names=names, values=values, colors=colors,
+                 title=f'All Countries - {metric} Overview', ylabel=metric,
+                 offset=max(values, default=0)*0.01, figsize=(12, 8), fontsize=10),
+            f"All Countries - {metric}")
+
+
+def history_chart(name, resolution, timestamps, values, color='#3498db'):
+    return (history_figure,
+            dict(name=name, resolution=resolution, timestamps=timestamps, values=values, color=color),
+            f"Production History: {name}")
+
+
+class ChartRenderer:
+    """Worker thread rendering chart requests to PNG, newest request wins
+    
+    submit() replaces any request the worker has not started yet and returns
+    a generation number. result() only hands back the output of the current
+    generation, so a chart finishing after the user moved on is dropped.
+    
+    The last figure drawn for each chart type is kept; when a new request
+    only changes its data, the existing bars, wedges and labels are updated
+    in place and redrawn instead of building a new figure.
+    """
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.pending = None
+        self.finished = None
+        # chart type -> (builder, options, figure); only touched by the worker
+        self.figures = {}
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def submit(self, chart_type, build, options):
+        with self.condition:
+            self.generation += 1
+            self.pending = (self.generation, chart_type, build, options)
+            self.finished = None
+            self.condition.notify_all()
+            return self.generation
+    
+    def cancel(self):
+        """Drop the queued request and ignore the one being rendered"""
+        with self.condition:
+            self.generation += 1
+            self.pending = None
+            self.finished = None
+    
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                generation, chart_type, build, options = self.pending
+                self.pending = None
+            try:
+                outcome = (self.render(chart_type, build, options), None)
+            except Exception as e:
+                # The figure may be half updated, so build the next one afresh
+                self.figures.pop(chart_type, None)
+                outcome = (None, e)
+            with self.condition:
+                if generation == self.generation:
+                    self.finished = (generation,) + outcome
+    
+    def render(self, chart_type, build, options):
+        previous = self.figures.get(chart_type)
+        if previous is not None and previous[0] is build and can_update(build, previous[1], options):
+            fig = previous[2]
+            FIGURE_UPDATERS[build][0](fig, **options)
+        else:
+            fig = build(**options)
+            FigureCanvasAgg(fig)
+        self.figures[chart_type] = (build, options, fig)
+        return encode_figure(fig)
+    
+    def result(self, generation):
+        """(image bytes, error) once the request is rendered, else None"""
+        with self.condition:
+            if self.finished is not None and self.finished[0] == generation:
+                return self.finished[1:]
+        return None
+
+
+class ChartCache:
+    """Rendered chart images by key, evicting the least recently used
+    
+    Keys include the data version the chart was drawn from, so entries for
+    old data are never hit again and simply age out. Both the number of
+    entries and their total size in bytes are bounded.
+    """
+    
+    def __init__(self, max_bytes, max_entries=64):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = {}
+        self.size = 0
+    
+    def get(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            # Reinsert so dict order stays least recently used first
+            self.entries[key] = entry
+        return entry
+    
+    def put(self, key, image, title):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old[0])
+        if len(image) > self.max_bytes:
+            return
+        self.entries[key] = (image, title)
+        self.size += len(image)
+        while self.size > self.max_bytes or len(self.entries) > self.max_entries:
+            evicted = self.entries.pop(next(iter(self.entries)))
+            self.size -= len(evicted[0])
+    
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+class ReadingBuffer:
+    """Fixed-size ring buffer of live production readings
+    
+    Feeds append from their own threads; once full the oldest readings are
+    overwritten, so a feed faster than the UI can never grow memory. drain()
+    returns what arrived since the previous drain.
+    """
+    
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.entities = [None] * capacity
+        self.names = [None] * capacity
+        self.values = np.zeros(capacity)
+        self.written = 0
+        self.read = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+    
+    def append(self, entity, name, value):
+        with self.lock:
+            slot = self.written % self.capacity
+            self.entities[slot] = entity
+            self.names[slot] = name
+            self.values[slot] = value
+            self.written += 1
+    
+    def drain(self):
+        """Return [(entity, name, value), ...] appended since the last drain, oldest first"""
+        with self.lock:
+            start = max(self.read, self.written - self.capacity)
+            self.dropped += start - self.read
+            slots = [position % self.capacity for position in range(start, self.written)]
+            readings = [(self.entities[slot], self.names[slot], self.values[slot]) for slot in slots]
+            self.read = self.written
+        return readings
+
+
+class SimulatedFeed:
+    """Thread producing random-walk production readings at a fixed rate"""
+    
+    def __init__(self, buffer, entity, start_values, rate=1000):
+        # start_values: {name: first production value}
+        self.buffer = buffer
+        self.entity = entity
+        self.values = dict(start_values)
+        self.rate = rate
+        self.failure = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def stop(self):
+        self.stopped.set()
+    
+    def run(self):
+        names = list(self.values)
+        if not names:
+            return
+        rng = np.random.default_rng()
+        # Readings are produced in small batches; sleeping per reading is too coarse at 1 kHz
+        interval = 0.01
+        batch = max(1, round(self.rate * interval))
+        while not self.stopped.wait(interval):
+            for name, step in zip(rng.choice(names, batch), rng.normal(0, 0.01, batch)):
+                value = self.values[name] = max(0, self.values[name] * (1 + step))
+                self.buffer.append(self.entity, name, round(value))
+
+
+class FileTailFeed:
+    """Thread following a text file of "entity,name,value" lines as they are appended
+    
+    Like tail -f, reading starts at the current end of the file. Lines that
+    do not parse are skipped.
+    """
+    
+    def __init__(self, buffer, path, poll_interval=0.1):
+        self.buffer = buffer
+        self.path = path
+        self.poll_interval = poll_interval
+        self.failure = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def stop(self):
+        self.stopped.set()
+    
+    def run(self):
+        try:
+            self.follow()
+        except OSError as e:
+            self.failure = e
+    
+    def follow(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            f.seek(0, os.SEEK_END)
+            partial = ""
+            while not self.stopped.is_set():
+                line = f.readline()
+                if not line:
+                    self.stopped.wait(self.poll_interval)
+                    continue
+                if not line.endswith("\n"):
+                    # The writer is mid-line; keep the piece until the rest arrives
+                    partial += line
+                    continue
+                line, partial = partial + line, ""
+                try:
+                    entity, rest = line.split(",", 1)
+                    name, value = rest.rsplit(",", 1)
+                    self.buffer.append(entity.strip().lower(), name.strip(), float(value))
+                except ValueError:
+                    continue
+
+
+class MarkerClusters:
+    """Grid clustering of map sites, computed at most once per zoom level
+    
+    Sites are projected to Web Mercator pixels once. At a zoom level the map
+    is cut into cell_size pixel squares and the sites sharing a square become
+    one cluster at their mean position. The clusters of a level are sorted by
+    cell, which makes the level its own grid index for viewport queries.
+    """
+    
+    def __init__(self, names, latitudes, longitudes, production, cell_size=60):
+        self.names = names
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.production = production
+        self.cell_size = cell_size
+        self.x, self.y = mercator_pixels(latitudes, longitudes)
+        self.levels = {}
+    
+    def at_zoom(self, zoom):
+        """Return (latitudes, longitudes, counts, production, first site, cells) per cluster"""
+        level = self.levels.get(zoom)
+        if level is None:
+            level = self.levels[zoom] = self.compute(zoom)
+        return level
+    
+    def compute(self, zoom):
+        scale = 2 ** zoom / self.cell_size
+        cells = (np.floor(self.x * scale).astype(np.int64) << 32) | np.floor(self.y * scale).astype(np.int64)
+        cells, first, inverse, counts = np.unique(cells, return_index=True, return_inverse=True,
+                                                  return_counts=True)
+        return (np.bincount(inverse, self.latitudes) / counts,
+                np.bincount(inverse, self.longitudes) / counts,
+                counts,
+                np.bincount(inverse, self.production),
+                first,
+                cells)
+    
+    def cell_bounds(self, upper_left, lower_right, margin=1):
+        """Cell range (left, top, right, bottom) covering a viewport given in map tiles
+        
+        The margin adds cells around the viewport so small pans need no new markers.
+        """
+        size = self.cell_size / 256
+        return (int(upper_left[0] // size) - margin, int(upper_left[1] // size) - margin,
+                int(lower_right[0] // size) + margin, int(lower_right[1] // size) + margin)
+    
+    def visible(self, zoom, left, top, right, bottom, limit=None):
+        """Indexes of the clusters of a zoom level inside a cell range
+        
+        Each column of the range is one contiguous run of the sorted cells, so
+        the query is two searchsorted calls. Past limit clusters the ones with
+        the most sites are kept.
+        """
+        level = self.at_zoom(zoom)
+        counts, cells = level[2], level[5]
+        columns = np.arange(max(left, 0), min(right, 2 ** zoom * 256 // self.cell_size) + 1, dtype=np.int64)
+        starts = np.searchsorted(cells, (columns << 32) | max(top, 0))
+        ends = np.searchsorted(cells, (columns << 32) | max(bottom, 0), side='right')
+        lengths = ends - starts
+        # Concatenated ranges starts[i]:ends[i] without a Python loop
+        indexes = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        if limit is not None and len(indexes) > limit:
+            indexes = indexes[np.argpartition(counts[indexes], -limit)[-limit:]]
+        return indexes
+
+
+# Colour of each heat intensity from 0 to 255
+HEAT_COLORS = (colormaps['YlOrRd'](np.linspace(0, 1, 256)) * 255).astype(np.uint8)
+
+
+class ProductionHeatmap:
+    """Production of map sites summed into cell_size pixel bins at every zoom level
+    
+    The finest level is binned from the projected sites and each coarser one
+    by merging the bins of the level below, so the whole pyramid costs about
+    one pass over the sites. Levels keep only their non-empty bins, sorted by
+    cell like MarkerClusters, so a viewport is read with searchsorted.
+    """
+    
+    def __init__(self, x, y, production, cell_size=8, max_zoom=16):
+        self.x = x
+        self.y = y
+        self.production = production
+        self.cell_size = cell_size
+        self.max_zoom = max_zoom
+        self.levels = {}
+        self.ready = threading.Event()
+    
+    def build(self):
+        scale = 2 ** self.max_zoom / self.cell_size
+        cells = (np.floor(self.x * scale).astype(np.int64) << 32) | np.floor(self.y * scale).astype(np.int64)
+        weights = np.asarray(self.production, dtype=np.float64)
+        for zoom in range(self.max_zoom, -1, -1):
+            cells, inverse = np.unique(cells, return_inverse=True)
+            weights = np.bincount(inverse, weights)
+            self.levels[zoom] = (cells, weights)
+            # Two by two bins of this level make one bin of the next
+            cells = ((cells >> 33) << 32) | ((cells & 0xffffffff) >> 1)
+        self.ready.set()
+    
+    def bins(self, zoom, left, top, right, bottom):
+        """Indexes of the bins of a zoom level in an inclusive range of bin columns and rows"""
+        cells = self.levels[zoom][0]
+        columns = np.arange(max(left, 0), max(right + 1, 0), dtype=np.int64)
+        starts = np.searchsorted(cells, (columns << 32) | max(top, 0))
+        ends = np.searchsorted(cells, (columns << 32) | max(bottom, 0), side='right')
+        lengths = ends - starts
+        return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    
+    def render(self, zoom, upper_left, lower_right, margin=128):
+        """RGBA image of the heat over a viewport given in map tiles
+        
+        Returns (image, latitude, longitude of its centre), or None when no
+        site is in view or the zoom is past max_zoom. Intensity is the log of
+        production relative to the strongest bin in view, so a few large
+        mines do not wash out everything else.
+        """
+        if zoom > self.max_zoom:
+            return None
+        cells, weights = self.levels[zoom]
+        size = self.cell_size
+        left, top = (int((value * 256 - margin) // size) for value in upper_left)
+        right, bottom = (int((value * 256 + margin) // size) for value in lower_right)
+        # Bins one past each edge only feed the blur
+        indexes = self.bins(zoom, left - 1, top - 1, right + 1, bottom + 1)
+        grid = np.zeros((bottom - top + 3, right - left + 3))
+        found = cells[indexes]
+        grid[(found & 0xffffffff) - top + 1, (found >> 32) - left + 1] = weights[indexes]
+        # Spread each bin over its neighbours with a 3x3 box blur
+        padded = np.pad(grid, 1)
+        grid = sum(padded[row:row + grid.shape[0], column:column + grid.shape[1]]
+                   for row in range(3) for column in range(3))[1:-1, 1:-1]
+        peak = grid.max()
+        if peak <= 0:
+            return None
+        intensity = np.log1p(grid) / np.log1p(peak)
+        
+        rgba = HEAT_COLORS[(intensity * 255).astype(np.uint8)]
+        rgba[..., 3] = (np.sqrt(intensity) * 180).astype(np.uint8)
+        image = Image.fromarray(rgba, 'RGBA').resize((grid.shape[1] * size, grid.shape[0] * size),
+                                                      Image.BILINEAR)
+        scale = 2 ** zoom
+        latitude, longitude = mercator_degrees((left + right + 1) / 2 * size / scale,
+                                               (top + bottom + 1) / 2 * size / scale)
+        return image, float(latitude), float(longitude)
+    
+    def points(self, zoom):
+        """(latitudes, longitudes, intensity from 0 to 1) of the bin centres of a zoom level"""
+        cells, weights = self.levels[zoom]
+        scale = self.cell_size / 2 ** zoom
+        latitudes, longitudes = mercator_degrees(((cells >> 32) + 0.5) * scale,
+                                                 ((cells & 0xffffffff) + 0.5) * scale)
+        return latitudes, longitudes, np.log1p(weights) / np.log1p(max(weights.max(), 1))
+
+
+# Leaflet marker for one [latitude, longitude, name, production] row of site_map_file
+SITE_MARKER_CALLBACK = """
+function callback(row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindTooltip(row[2]);
+    marker.bindPopup(row[2] + '<br>Production: ' + row[3].toLocaleString() + ' tonnes/day');
+    return marker;
+}
+"""
+
+# Bump whenever the generated map page changes, so cached files are rewritten
+MAP_FORMAT = 2
+
+
+def site_map_file(names, latitudes, longitudes, production, directory="map_cache"):
+    """Path of an HTML map of mineral sites, written only when the sites change
+    
+    The sites are embedded as one compact array that the browser clusters
+    itself, instead of a folium object per marker. The file is named after
+    a hash of MAP_FORMAT and the sites, so unchanged data reuses the file
+    already written.
+    """
+    latitudes = np.round(latitudes, 5)
+    longitudes = np.round(longitudes, 5)
+    names = [html.escape(name) for name in names]
+    digest = hashlib.sha1(f"{MAP_FORMAT}\0".encode())
+    digest.update("\0".join(names).encode())
+    for values in (latitudes, longitudes, production):
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    path = os.path.join(directory, f"mineral_map_{digest.hexdigest()[:16]}.html")
+    if os.path.exists(path):
+        return path
+    
+    m = folium.Map(location=[-15, 25], zoom_start=4)
+    rows = [list(row) for row in zip(latitudes.tolist(), longitudes.tolist(), names,
+                                     np.asarray(production).tolist())]
+    FastMarkerCluster(rows, name="Mineral sites", callback=SITE_MARKER_CALLBACK).add_to(m)
+    
+    # Production density from the zoom 8 bins, far fewer points than sites
+    if len(rows):
+        heatmap = ProductionHeatmap(*mercator_pixels(latitudes, longitudes), production, max_zoom=8)
+        heatmap.build()
+        heat = np.column_stack(heatmap.points(8)).round(5).tolist()
+        HeatMap(heat, name="Production density", radius=15, min_opacity=0.2, show=False).add_to(m)
+    folium.LayerControl().add_to(m)
+    
+    # Saved under a temporary name first so a browser never opens a partial file
+    os.makedirs(directory, exist_ok=True)
+    m.save(path + ".tmp")
+    os.replace(path + ".tmp", path)
+    for name in os.listdir(directory):
+        if name.startswith("mineral_map_") and os.path.join(directory, name) != path:
+            os.remove(os.path.join(directory, name))
+    return path
+
+
+# Tile URL templates of the map views
+TILE_SERVERS = {
+    'satellite': "https://mt0.google.com/vt/lyrs=s&hl=en&x={x}&y={y}&z={z}&s=Ga",
+    'terrain': "https://mt0.google.com/vt/lyrs=p&hl=en&x={x}&y={y}&z={z}&s=Ga",
+    'roadmap': "https://a.tile.openstreetmap.org/{z}/{x}/{y}.png",
+}
+
+# (south, west, north, east) of the regions the tile cache can be seeded with
+TILE_REGIONS = {
+    'southern-africa': (-35.0, 10.0, -8.0, 41.0),
+    'africa': (-35.0, -18.0, 38.0, 52.0),
+}
+
+
+def tile_range(zoom, south, west, north, east):
+    """Inclusive (left, top, right, bottom) tile numbers covering a box of degrees"""
+    x, y = mercator_pixels(np.array([north, south]), np.array([west, east]))
+    last = 2 ** zoom - 1
+    left, right = np.clip((x * 2 ** zoom // 256).astype(int), 0, last).tolist()
+    top, bottom = np.clip((y * 2 ** zoom // 256).astype(int), 0, last).tolist()
+    return left, top, right, bottom
+
+
+class TileStore:
+    """Map tiles kept on disk in SQLite, dropping the least recently used past max_bytes
+    
+    One store is shared by the tile loading threads: the connection is
+    guarded by a lock and downloads happen outside it. Cache hits only note
+    the time in memory; write_used() saves those times in one batch.
+    """
+    
+    def __init__(self, path="map_tiles.db", max_bytes=256 * 1024 * 1024, timeout=10):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        # (server, zoom, x, y) -> last use not yet written to the database
+        self.used = {}
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS tiles (server TEXT, zoom INTEGER, x INTEGER, y INTEGER,
+                                              image BLOB, used REAL, PRIMARY KEY (server, zoom, x, y));
+            CREATE INDEX IF NOT EXISTS idx_tiles_used ON tiles (used);
+        """)
+        self.size = self.connection.execute("SELECT COALESCE(SUM(LENGTH(image)), 0) FROM tiles").fetchone()[0]
+    
+    def get(self, server, zoom, x, y):
+        """Cached image bytes of a tile, or None"""
+        key = (server, zoom, x, y)
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT image FROM tiles WHERE server=? AND zoom=? AND x=? AND y=?", key).fetchone()
+            if row is None:
+                return None
+            self.used[key] = time.time()
+        return row[0]
+    
+    def write_used(self):
+        """Save the last-use times noted by get() since the previous write"""
+        with self.lock:
+            self.save_used()
+            self.connection.commit()
+    
+    def save_used(self):
+        # Caller holds the lock and commits
+        if self.used:
+            self.connection.executemany(
+                "UPDATE tiles SET used=? WHERE server=? AND zoom=? AND x=? AND y=?",
+                [(used,) + key for key, used in self.used.items()])
+            self.used.clear()
+    
+    def contains(self, server, zoom, x, y):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT 1 FROM tiles WHERE server=? AND zoom=? AND x=? AND y=?",
+                (server, zoom, x, y)).fetchone() is not None
+    
+    def put(self, server, zoom, x, y, image):
+        with self.lock:
+            cursor = self.connection.execute("INSERT OR IGNORE INTO tiles VALUES (?, ?, ?, ?, ?, ?)",
+                                             (server, zoom, x, y, image, time.time()))
+            self.size += len(image) * cursor.rowcount
+            if self.size > self.max_bytes:
+                # Eviction goes by last use, so recent hits must be on disk first
+                self.save_used()
+                self.evict()
+            self.connection.commit()
+    
+    def evict(self):
+        """Drop least recently used tiles until the store is under 90% of max_bytes"""
+        target = self.max_bytes * 0.9
+        doomed = []
+        for rowid, length in self.connection.execute("SELECT rowid, LENGTH(image) FROM tiles ORDER BY used"):
+            if self.size <= target:
+                break
+            doomed.append((rowid,))
+            self.size -= length
+        self.connection.executemany("DELETE FROM tiles WHERE rowid=?", doomed)
+    
+    def download(self, server, zoom, x, y):
+        url = server.replace("{x}", str(x)).replace("{y}", str(y)).replace("{z}", str(zoom))
+        request = urllib.request.Request(url, headers={"User-Agent": "GeoMineral Hub"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+    
+    def fetch(self, server, zoom, x, y):
+        """Image bytes of a tile from the store, else downloaded and stored
+        
+        Raises OSError when the tile is not cached and cannot be downloaded.
+        """
+        image = self.get(server, zoom, x, y)
+        if image is None:
+            image = self.download(server, zoom, x, y)
+            self.put(server, zoom, x, y, image)
+        return image
+    
+    def close(self):
+        with self.lock:
+            self.save_used()
+            self.connection.commit()
+            self.connection.close()
+
+
+class CachedMapView(TkinterMapView):
+    """TkinterMapView reading its tiles through a TileStore
+    
+    Tiles come from the disk cache first, so areas seen before load without
+    the network. A background thread also caches the tiles around the
+    viewport and those one zoom level in and out, so panning and zooming
+    find them ready.
+    """
+    
+    def __init__(self, *args, tile_store=None, **kwargs):
+        # The base class starts loading tiles before it returns
+        self.tile_store = tile_store
+        super().__init__(*args, **kwargs)
+        self.prefetch_thread = threading.Thread(target=self.prefetch, daemon=True)
+        self.prefetch_thread.start()
+    
+    def request_image(self, zoom, x, y, db_cursor=None):
+        try:
+            image = Image.open(io.BytesIO(self.tile_store.fetch(self.tile_server, zoom, x, y)))
+            if not self.running:
+                return self.empty_tile_image
+            image_tk = ImageTk.PhotoImage(image)
+        except (urllib.error.HTTPError, Image.UnidentifiedImageError):
+            # The server has no such tile
+            image_tk = self.empty_tile_image
+        except Exception:
+            # Offline and not cached; tried again when the tile is next drawn
+            return self.empty_tile_image
+        self.tile_image_cache[f"{zoom}{x}{y}"] = image_tk
+        return image_tk
+    
+    def viewport(self):
+        return self.tile_server, round(self.zoom), self.upper_left_tile_pos, self.lower_right_tile_pos
+    
+    def nearby_tiles(self, zoom, upper_left, lower_right):
+        """(zoom, x, y) of the tiles around a viewport, then one zoom level out and in"""
+        tiles = []
+        for level, scale, margin in ((zoom, 1, 1), (zoom - 1, 0.5, 1), (zoom + 1, 2, 0)):
+            if not 0 <= level <= self.max_zoom:
+                continue
+            last = 2 ** level - 1
+            left, top = (max(int(value * scale) - margin, 0) for value in upper_left)
+            right, bottom = (min(int(value * scale) + margin, last) for value in lower_right)
+            tiles.extend((level, x, y) for x in range(left, right + 1) for y in range(top, bottom + 1))
+        return tiles
+    
+    def prefetch(self):
+        """Fill the tile store around the viewport whenever it settles somewhere new"""
+        done = None
+        while self.running:
+            view = self.viewport()
+            if view == done:
+                time.sleep(0.2)
+                continue
+            server = view[0]
+            for zoom, x, y in self.nearby_tiles(*view[1:]):
+                # Start over from the new viewport when the map moves
+                if not self.running or self.viewport() != view:
+                    break
+                try:
+                    if not self.tile_store.contains(server, zoom, x, y):
+                        self.tile_store.fetch(server, zoom, x, y)
+                except Exception:
+                    pass
+            else:
+                done = view
+                try:
+                    self.tile_store.write_used()
+                except sqlite3.Error:
+                    # The store was closed while the map shut down
+                    pass
+
+
 class ModernApp:
+    # Screens kept alive so navigating back to them is instant
+    max_screens = 4
+    # Most matches a search box shows, which keeps each keystroke cheap
+    search_limit = 1000
+    # Memory allowed for rendered charts kept for instant redisplay
+    chart_cache_bytes = 32 * 1024 * 1024
+    # Live feed: most chart redraws per second, and readings per second from the simulator
+    live_fps = 5
+    live_rate = 1000
+    # Most markers on the map at once; sites outside the viewport get none
+    max_map_markers = 300
+    # Disk space for map tiles kept for offline use
+    tile_cache_bytes = 256 * 1024 * 1024
+    
     def __init__(self, root):
         self.root = root
         self.root.title("GeoMineral Hub - Mineral Management System")
         self.root.geometry("1200x800")
         self.root.configure(bg='#f8f9fa')
         
-        # Initialize data manager
-        self.data_manager = DataManager()
+        # Initialize data manager (set MINERAL_APP_BACKEND=sqlite for the database backend)
+        self.data_manager = DataManager(backend=os.environ.get("MINERAL_APP_BACKEND", "json"))
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Modern color scheme
         self.colors = {
@@ -163,8 +3331,55 @@ class ModernApp:
         
         self.current_user_role = None
         self.current_user = None
+        # Built screens by name, least recently shown first; see show_screen
+        self.screens = {}
+        self.current_screen = None
+        # Frame, change handlers and card list of the screen being built or shown
+        self.screen = None
+        self.view_subscriptions = []
+        self.card_list = None
+        # RecordImporter started from the minerals or countries screen, if any
+        self.importer = None
+        # Charts render on a worker; chart_generation is the request being waited for
+        self.chart_renderer = ChartRenderer()
+        self.chart_generation = None
+        self.chart_cache = ChartCache(self.chart_cache_bytes)
+        # State of the running live feed, if any; see toggle_live_feed
+        self.live_feed = None
+        # Disk cache of map tiles, opened with the first map
+        self.tile_store = None
+        # Set MINERAL_APP_DEBUG=1 to show a live widget counter in the navigation bar
+        self.debug = bool(os.environ.get("MINERAL_APP_DEBUG"))
         self.setup_styles()
         self.build_login()
+        self.storage_failure = None
+        self.watch_storage()
+
+    def watch_storage(self):
+        """Report background save failures once; the changes stay queued and are retried"""
+        failure = self.data_manager.write_failure()
+        if failure is not None and self.storage_failure is None:
+            messagebox.showerror("Error", f"Could not save changes: {failure}\n\n"
+                                          "They are kept and saving will be retried.")
+        self.storage_failure = failure
+        self.root.after(1000, self.watch_storage)
+
+    def on_close(self):
+        """Flush pending data before the window closes"""
+        self.stop_live_feed()
+        if self.importer is not None:
+            # An unfinished import is undone rather than left half saved
+            self.importer.cancel()
+            self.importer.thread.join()
+            self.importer = None
+        failure = self.data_manager.flush()
+        if failure is not None and not messagebox.askyesno(
+                "Unsaved Changes", f"Could not save changes: {failure}\n\nClose anyway and lose them?"):
+            return
+        self.data_manager.close()
+        if self.tile_store is not None:
+            self.tile_store.close()
+        self.root.destroy()
 
     def setup_styles(self):
         """Configure modern ttk styles"""
@@ -197,10 +3412,66 @@ class ModernApp:
                        relief='raised',
                        borderwidth=1)
 
-    def clear_frame(self):
-        """Clear all widgets from root"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+    def show_screen(self, name, build, refresh=None, static=False):
+        """Show a cached screen, building it into its own frame on first use
+        
+        Screens that subscribe to change events stay current while hidden.
+        Other screens are refreshed (or rebuilt when there is no refresh hook)
+        if the data version moved on since they were last shown, unless they
+        are static. Only the max_screens most recently shown screens are kept.
+        """
+        if self.current_screen is not None:
+            self.current_screen['frame'].pack_forget()
+        
+        version = self.data_manager.data_version
+        screen = self.screens.pop(name, None)
+        stale = (screen is not None and not static and not screen['subscriptions']
+                 and screen['version'] != version)
+        if stale and refresh is None:
+            self.destroy_screen(screen)
+            screen = None
+        
+        if screen is None:
+            self.screen = tk.Frame(self.root, bg=self.colors['background'])
+            self.view_subscriptions = []
+            self.card_list = None
+            self.screen.pack(fill='both', expand=True)
+            build()
+            screen = {'frame': self.screen, 'version': version,
+                      'subscriptions': self.view_subscriptions, 'card_list': self.card_list}
+        else:
+            self.screen = screen['frame']
+            self.card_list = screen['card_list']
+            self.screen.pack(fill='both', expand=True)
+            if stale:
+                refresh()
+                screen['version'] = version
+        
+        self.current_screen = self.screens[name] = screen
+        while len(self.screens) > self.max_screens:
+            self.destroy_screen(self.screens.pop(next(iter(self.screens))))
+
+    def destroy_screen(self, screen):
+        """Unsubscribe a cached screen's change handlers and destroy its widgets"""
+        for callback in screen['subscriptions']:
+            self.data_manager.unsubscribe(callback)
+        screen['frame'].destroy()
+
+    def clear_screens(self):
+        """Destroy every cached screen, e.g. when the user changes"""
+        if self.importer is not None:
+            self.importer.cancel()
+            self.importer = None
+        self.stop_live_feed()
+        for screen in self.screens.values():
+            self.destroy_screen(screen)
+        self.screens = {}
+        self.current_screen = None
+
+    def subscribe_view(self, callback, entity):
+        """Subscribe the screen being built to data changes for as long as it is cached"""
+        self.data_manager.subscribe(callback, entity)
+        self.view_subscriptions.append(callback)
 
     def create_scrollable_frame(self, parent):
         """Create a scrollable frame and return the scrollable content frame"""
@@ -231,10 +3502,13 @@ class ModernApp:
         return scrollable_frame, canvas
 
     def build_login(self):
-        self.clear_frame()
-        
+        # A new session starts with no cached screens from the previous user
+        self.clear_screens()
+        self.show_screen('login', self.build_login_screen)
+
+    def build_login_screen(self):
         # Main container with gradient background
-        main_frame = tk.Frame(self.root, bg=self.colors['primary'])
+        main_frame = tk.Frame(self.screen, bg=self.colors['primary'])
         main_frame.pack(fill='both', expand=True)
         
         # Login card
@@ -366,16 +3640,19 @@ class ModernApp:
         if user and password == user['password']:
             self.current_user_role = user['role']
             self.current_user = username
+            # Drop the login screen so the typed password does not linger
+            self.clear_screens()
             self.build_dashboard()
         else:
             messagebox.showerror("Login Failed", 
                                "Invalid username or password. Please try again.")
 
     def build_dashboard(self):
-        self.clear_frame()
-        
+        self.show_screen('dashboard', self.build_dashboard_screen, static=True)
+
+    def build_dashboard_screen(self):
         # Main container
-        main_container = tk.Frame(self.root, bg=self.colors['background'])
+        main_container = tk.Frame(self.screen, bg=self.colors['background'])
         main_container.pack(fill='both', expand=True)
         
         # Header
@@ -494,22 +3771,19 @@ class ModernApp:
         return f"#{new_rgb[0]:02x}{new_rgb[1]:02x}{new_rgb[2]:02x}"
 
     def show_minerals(self):
-        self.clear_frame()
+        self.show_screen('minerals', self.build_minerals_screen)
+
+    def build_minerals_screen(self):
         self.create_navigation("Minerals Data")
         
-        # Create scrollable content
-        scrollable_frame, _ = self.create_scrollable_frame(self.root)
-        
         # Header with management buttons for admins
-        header_frame = tk.Frame(scrollable_frame, bg='white', relief='raised', bd=1)
-        header_frame.pack(fill='x', pady=(0, 20))
-        
-        total_minerals = len(self.data_manager.MineralData)
-        total_production = sum(data['Production'] for data in self.data_manager.MineralData.values())
+        header_frame = tk.Frame(self.screen, bg='white', relief='raised', bd=1)
+        header_frame.pack(fill='x', padx=20, pady=(20, 0))
         
-        stats_text = f"📈 Mineral Overview: {total_minerals} Minerals | Total Production: {total_production:,} tonnes/day"
-        tk.Label(header_frame, text=stats_text, font=('Segoe UI', 12, 'bold'),
-                bg='white', fg=self.colors['primary'], pady=15).pack()
+        self.minerals_stats_label = tk.Label(header_frame, font=('Segoe UI', 12, 'bold'),
+                                             bg='white', fg=self.colors['primary'], pady=15)
+        self.minerals_stats_label.pack()
+        self.update_minerals_stats()
         
         # Management buttons for administrators
         if self.current_user_role == "Administrator":
@@ -519,18 +3793,53 @@ class ModernApp:
             ttk.Button(manage_frame, text="➕ Add Mineral", 
                       style='Primary.TButton',
                       command=self.show_add_mineral_form).pack(side='left', padx=5)
-        
-        # Minerals cards
-        self.minerals_frame = tk.Frame(scrollable_frame, bg=self.colors['background'])
-        self.minerals_frame.pack(fill='both', expand=True)
-        
+            
+            ttk.Button(manage_frame, text="📥 Import File", 
+                      style='Secondary.TButton',
+                      command=lambda: self.import_records('mineral', header_frame)).pack(side='left', padx=5)
+        
+        search_frame = tk.Frame(header_frame, bg='white')
+        search_frame.pack(pady=(0, 10))
+        self.mineral_search, self.mineral_search_status = self.create_search_entry(
+            search_frame, "Search minerals or locations:", self.refresh_minerals_display)
+        self.data_manager.prepare_search('MineralData')
+        
+        # Inline add and edit forms
+        self.minerals_frame = tk.Frame(self.screen, bg=self.colors['background'])
+        self.minerals_frame.pack(fill='x', padx=20)
+        
+        # Minerals cards; only the ones in view are built
+        self.mineral_list = self.card_list = VirtualCardList(
+            self.screen, 150, self.create_mineral_card, self.update_mineral_card, self.colors['background'])
         self.refresh_minerals_display()
+        self.subscribe_view(self.on_mineral_change, 'mineral')
+
+    def update_minerals_stats(self):
+        """Update the minerals overview header"""
+        total_minerals = len(self.data_manager.MineralData)
+        total_production = int(self.data_manager.MineralData.column('Production').sum())
+        
+        stats_text = f"📈 Mineral Overview: {total_minerals} Minerals | Total Production: {total_production:,} tonnes/day"
+        self.minerals_stats_label.config(text=stats_text)
+
+    def on_mineral_change(self, event):
+        """Patch the single mineral card affected by a change"""
+        if event.action == 'reloaded' or self.mineral_search.get().strip():
+            # Search results are cheap to recompute and may gain or lose the record
+            self.refresh_minerals_display()
+        elif event.action == 'deleted':
+            self.mineral_list.remove(event.key)
+        elif event.action == 'added':
+            self.mineral_list.add(event.key)
+        else:
+            self.mineral_list.update(event.key)
+        self.update_minerals_stats()
 
     def show_add_mineral_form(self):
         """Show the add mineral form inline"""
         # Remove existing form if any
         if hasattr(self, 'add_mineral_frame'):
-            self.add_mineral_frame.pack_forget()
+            self.add_mineral_frame.destroy()
         
         self.add_mineral_frame = tk.Frame(self.minerals_frame, bg='white', relief='raised', bd=1)
         self.add_mineral_frame.pack(fill='x', padx=20, pady=10, ipadx=10, ipady=10)
@@ -568,6 +3877,17 @@ class ModernApp:
         self.mineral_color_entry.insert(0, "#1f77b4")
         self.mineral_color_entry.grid(row=1, column=3, sticky='w', pady=5, padx=(0, 20))
         
+        # Coordinates (optional), used to place the mineral on the map
+        tk.Label(form_fields, text="Latitude:", font=('Segoe UI', 10, 'bold'),
+                bg='white').grid(row=2, column=0, sticky='w', pady=5, padx=(0, 10))
+        self.mineral_latitude_entry = ttk.Entry(form_fields, font=('Segoe UI', 10), width=20)
+        self.mineral_latitude_entry.grid(row=2, column=1, sticky='w', pady=5, padx=(0, 20))
+        
+        tk.Label(form_fields, text="Longitude:", font=('Segoe UI', 10, 'bold'),
+                bg='white').grid(row=2, column=2, sticky='w', pady=5, padx=(0, 10))
+        self.mineral_longitude_entry = ttk.Entry(form_fields, font=('Segoe UI', 10), width=20)
+        self.mineral_longitude_entry.grid(row=2, column=3, sticky='w', pady=5, padx=(0, 20))
+        
         # Buttons
         button_frame = tk.Frame(self.add_mineral_frame, bg='white')
         button_frame.pack(fill='x', pady=(10, 0))
@@ -580,77 +3900,74 @@ class ModernApp:
 
     def save_mineral(self):
         """Save new mineral from inline form"""
-        name = self.mineral_name_entry.get().strip()
-        location = self.mineral_location_entry.get().strip()
-        production = self.mineral_production_entry.get().strip()
-        color = self.mineral_color_entry.get().strip()
-        
-        if not all([name, location, production]):
-            messagebox.showerror("Error", "Please fill in all fields")
-            return
-            
         try:
-            production_val = int(production)
-        except ValueError:
-            messagebox.showerror("Error", "Production must be a number")
-            return
-            
-        if name in self.data_manager.MineralData:
-            messagebox.showerror("Error", "Mineral already exists")
+            name, location, production, color, latitude, longitude = self.data_manager.validate_mineral(
+                self.mineral_name_entry.get(), self.mineral_location_entry.get(),
+                self.mineral_production_entry.get(), self.mineral_color_entry.get(),
+                self.mineral_latitude_entry.get(), self.mineral_longitude_entry.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
             
         # Use data manager to save mineral
-        self.data_manager.add_mineral(name, location, production_val, color)
+        self.data_manager.add_mineral(name, location, production, color, latitude, longitude)
         
         messagebox.showinfo("Success", f"Mineral '{name}' added successfully!")
         
-        # Clear form and refresh display
+        # Clear form; the new card is added by on_mineral_change
         self.cancel_add_mineral()
-        self.refresh_minerals_display()
 
     def cancel_add_mineral(self):
-        """Cancel adding mineral and hide form"""
+        """Cancel adding mineral and destroy the form"""
         if hasattr(self, 'add_mineral_frame'):
-            self.add_mineral_frame.pack_forget()
+            self.add_mineral_frame.destroy()
 
     def refresh_minerals_display(self):
-        """Refresh the minerals display"""
-        # Clear existing minerals display
-        for widget in self.minerals_frame.winfo_children():
-            widget.pack_forget()
-        
-        # Show minerals
-        for mineral, data in self.data_manager.MineralData.items():
-            card = tk.Frame(self.minerals_frame, bg='white', relief='raised', bd=1)
-            card.pack(fill='x', padx=20, pady=10, ipadx=10, ipady=10)
-            
-            # Header with mineral name and actions
-            header = tk.Frame(card, bg='white')
-            header.pack(fill='x', pady=(0, 10))
-            
-            tk.Label(header, text=f"🔨 {mineral}", font=('Segoe UI', 12, 'bold'),
-                    bg='white', fg=data['Color']).pack(side='left')
+        """Refresh the minerals display, showing only search matches while searching"""
+        keys = self.data_manager.search('MineralData', self.mineral_search.get(), self.search_limit)
+        self.mineral_list.set_rows(self.data_manager.MineralData, keys)
+        self.update_search_status(self.mineral_search_status, keys)
+
+    def create_mineral_card(self, parent):
+        """Create an empty mineral card and return its updatable widgets"""
+        card = tk.Frame(parent, bg='white', relief='raised', bd=1, padx=10, pady=10)
+        widgets = {'frame': card}
+        
+        # Header with mineral name and actions
+        header = tk.Frame(card, bg='white')
+        header.pack(fill='x', pady=(0, 10))
+        
+        title = tk.Label(header, font=('Segoe UI', 12, 'bold'), bg='white')
+        title.pack(side='left')
+        
+        # Action buttons for admins
+        if self.current_user_role == "Administrator":
+            action_frame = tk.Frame(header, bg='white')
+            action_frame.pack(side='right')
             
-            # Action buttons for admins
-            if self.current_user_role == "Administrator":
-                action_frame = tk.Frame(header, bg='white')
-                action_frame.pack(side='right')
-                
-                ttk.Button(action_frame, text="✏️ Edit", 
-                          command=lambda m=mineral: self.edit_mineral(m),
-                          style='Secondary.TButton').pack(side='left', padx=2)
-                
-                ttk.Button(action_frame, text="🗑️ Remove", 
-                          command=lambda m=mineral: self.remove_mineral(m),
-                          style='Secondary.TButton').pack(side='left', padx=2)
+            # Cards are reused for other records, so read the key at click time
+            ttk.Button(action_frame, text="✏️ Edit", 
+                      command=lambda: self.edit_mineral(widgets['key']),
+                      style='Secondary.TButton').pack(side='left', padx=2)
             
-            # Mineral info
-            info = f"""📍 Location: {data['Location']}
+            ttk.Button(action_frame, text="🗑️ Remove", 
+                      command=lambda: self.remove_mineral(widgets['key']),
+                      style='Secondary.TButton').pack(side='left', padx=2)
+        
+        # Mineral info
+        info = tk.Label(card, font=('Segoe UI', 10),
+                        bg='white', fg=self.colors['dark'], justify='left')
+        info.pack(anchor='w')
+        
+        widgets.update(title=title, info=info)
+        return widgets
+
+    def update_mineral_card(self, card, mineral, data):
+        """Update an existing mineral card's labels in place"""
+        card['title'].config(text=f"🔨 {mineral}", fg=data['Color'])
+        card['info'].config(text=f"""📍 Location: {data['Location']}
 ⚡ Production: {data['Production']:,} tonnes per day
-💎 Status: Active mining operations"""
-            
-            tk.Label(card, text=info, font=('Segoe UI', 10),
-                   bg='white', fg=self.colors['dark'], justify='left').pack(anchor='w')
+💎 Status: Active mining operations""")
 
     def edit_mineral(self, mineral_name):
         """Edit mineral inline"""
@@ -696,28 +4013,36 @@ class ModernApp:
         edit_color_entry.insert(0, mineral_data['Color'])
         edit_color_entry.grid(row=1, column=3, sticky='w', pady=5, padx=(0, 20))
         
+        # Coordinates (optional)
+        tk.Label(form_fields, text="Latitude:", font=('Segoe UI', 10, 'bold'),
+                bg='white').grid(row=2, column=0, sticky='w', pady=5, padx=(0, 10))
+        edit_latitude_entry = ttk.Entry(form_fields, font=('Segoe UI', 10), width=20)
+        edit_latitude_entry.insert(0, str(mineral_data.get('Latitude', "")))
+        edit_latitude_entry.grid(row=2, column=1, sticky='w', pady=5, padx=(0, 20))
+        
+        tk.Label(form_fields, text="Longitude:", font=('Segoe UI', 10, 'bold'),
+                bg='white').grid(row=2, column=2, sticky='w', pady=5, padx=(0, 10))
+        edit_longitude_entry = ttk.Entry(form_fields, font=('Segoe UI', 10), width=20)
+        edit_longitude_entry.insert(0, str(mineral_data.get('Longitude', "")))
+        edit_longitude_entry.grid(row=2, column=3, sticky='w', pady=5, padx=(0, 20))
+        
         def save_edit():
-            new_name = edit_name_entry.get().strip()
-            location = edit_location_entry.get().strip()
-            production = edit_production_entry.get().strip()
-            color = edit_color_entry.get().strip()
-            
-            if not all([new_name, location, production]):
-                messagebox.showerror("Error", "Please fill in all fields")
-                return
-                
+            new_name = edit_name_entry.get().strip()
             try:
-                production_val = int(production)
-            except ValueError:
-                messagebox.showerror("Error", "Production must be a number")
+                new_name, location, production, color, latitude, longitude = self.data_manager.validate_mineral(
+                    new_name, edit_location_entry.get(), edit_production_entry.get(),
+                    edit_color_entry.get(), edit_latitude_entry.get(), edit_longitude_entry.get(),
+                    check_exists=new_name != mineral_name)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
                 return
                 
             # Use data manager to update mineral
-            self.data_manager.update_mineral(mineral_name, new_name, location, production_val, color)
+            self.data_manager.update_mineral(mineral_name, new_name, location, production, color,
+                                             latitude, longitude)
             
-            messagebox.showinfo("Success", f"Mineral updated successfully!")
+            messagebox.showinfo("Success", "Mineral updated successfully!")
             edit_frame.destroy()
-            self.refresh_minerals_display()
         
         # Buttons
         button_frame = tk.Frame(edit_frame, bg='white')
@@ -742,25 +4067,20 @@ class ModernApp:
                 messagebox.showinfo("Success", f"Mineral '{mineral_name}' removed successfully!")
                 if parent:
                     parent.destroy()
-                self.refresh_minerals_display()
     def show_country_profiles(self):
-        self.clear_frame()
+        self.show_screen('countries', self.build_countries_screen)
+
+    def build_countries_screen(self):
         self.create_navigation("Country Profiles")
         
-        # Create scrollable content
-        scrollable_frame, _ = self.create_scrollable_frame(self.root)
-        
         # Header with management buttons for admins
-        header_frame = tk.Frame(scrollable_frame, bg='white', relief='raised', bd=1)
-        header_frame.pack(fill='x', pady=(0, 20))
-        
-        total_countries = len(self.data_manager.CountryProfiles)
-        total_production = sum(data['Production'] for data in self.data_manager.CountryProfiles.values())
-        total_gdp = sum(data['GDP'] for data in self.data_manager.CountryProfiles.values())
+        header_frame = tk.Frame(self.screen, bg='white', relief='raised', bd=1)
+        header_frame.pack(fill='x', padx=20, pady=(20, 0))
         
-        stats_text = f"🌍 Regional Overview: {total_countries} Countries | Total Production: {total_production:,} tons | Combined GDP: R{total_gdp:,}M"
-        tk.Label(header_frame, text=stats_text, font=('Segoe UI', 12, 'bold'),
-                bg='white', fg=self.colors['primary'], pady=15).pack()
+        self.countries_stats_label = tk.Label(header_frame, font=('Segoe UI', 12, 'bold'),
+                                              bg='white', fg=self.colors['primary'], pady=15)
+        self.countries_stats_label.pack()
+        self.update_countries_stats()
         
         # Management buttons for administrators
         if self.current_user_role == "Administrator":
@@ -770,17 +4090,53 @@ class ModernApp:
             ttk.Button(manage_frame, text="➕ Add Country", 
                       style='Primary.TButton',
                       command=self.show_add_country_form).pack(side='left', padx=5)
-        
-        # Countries display frame
-        self.countries_frame = tk.Frame(scrollable_frame, bg=self.colors['background'])
-        self.countries_frame.pack(fill='both', expand=True)
-        
+            
+            ttk.Button(manage_frame, text="📥 Import File", 
+                      style='Secondary.TButton',
+                      command=lambda: self.import_records('country', header_frame)).pack(side='left', padx=5)
+        
+        search_frame = tk.Frame(header_frame, bg='white')
+        search_frame.pack(pady=(0, 10))
+        self.country_search, self.country_search_status = self.create_search_entry(
+            search_frame, "Search countries:", self.refresh_countries_display)
+        self.data_manager.prepare_search('CountryProfiles')
+        
+        # Inline add and edit forms
+        self.countries_frame = tk.Frame(self.screen, bg=self.colors['background'])
+        self.countries_frame.pack(fill='x', padx=20)
+        
+        # Country cards; only the ones in view are built
+        self.country_list = self.card_list = VirtualCardList(
+            self.screen, 170, self.create_country_card, self.update_country_card, self.colors['background'])
         self.refresh_countries_display()
+        self.subscribe_view(self.on_country_change, 'country')
+
+    def update_countries_stats(self):
+        """Update the country profiles overview header"""
+        total_countries = len(self.data_manager.CountryProfiles)
+        total_production = int(self.data_manager.CountryProfiles.column('Production').sum())
+        total_gdp = int(self.data_manager.CountryProfiles.column('GDP').sum())
+        
+        stats_text = f"🌍 Regional Overview: {total_countries} Countries | Total Production: {total_production:,} tons | Combined GDP: R{total_gdp:,}M"
+        self.countries_stats_label.config(text=stats_text)
+
+    def on_country_change(self, event):
+        """Patch the single country card affected by a change"""
+        if event.action == 'reloaded' or self.country_search.get().strip():
+            # Search results are cheap to recompute and may gain or lose the record
+            self.refresh_countries_display()
+        elif event.action == 'deleted':
+            self.country_list.remove(event.key)
+        elif event.action == 'added':
+            self.country_list.add(event.key)
+        else:
+            self.country_list.update(event.key)
+        self.update_countries_stats()
 
     def show_add_country_form(self):
         """Show the add country form inline"""
         if hasattr(self, 'add_country_frame'):
-            self.add_country_frame.pack_forget()
+            self.add_country_frame.destroy()
         
         self.add_country_frame = tk.Frame(self.countries_frame, bg='white', relief='raised', bd=1)
         self.add_country_frame.pack(fill='x', padx=20, pady=10, ipadx=10, ipady=10)
@@ -836,81 +4192,75 @@ class ModernApp:
 
     def save_country(self):
         """Save new country from inline form"""
-        name = self.country_name_entry.get().strip()
-        production = self.country_production_entry.get().strip()
-        gdp = self.country_gdp_entry.get().strip()
-        projects = self.country_projects_entry.get().strip()
-        color = self.country_color_entry.get().strip()
-        
-        if not all([name, production, gdp, projects]):
-            messagebox.showerror("Error", "Please fill in all fields")
-            return
-            
         try:
-            production_val = int(production)
-            gdp_val = int(gdp)
-            projects_val = int(projects)
-        except ValueError:
-            messagebox.showerror("Error", "Production, GDP, and Projects must be numbers")
-            return
-            
-        if name in self.data_manager.CountryProfiles:
-            messagebox.showerror("Error", "Country already exists")
+            name, production, gdp, projects, color = self.data_manager.validate_country(
+                self.country_name_entry.get(), self.country_production_entry.get(),
+                self.country_gdp_entry.get(), self.country_projects_entry.get(),
+                self.country_color_entry.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
             
         # Use data manager to save country
-        self.data_manager.add_country(name, production_val, gdp_val, projects_val, color)
+        self.data_manager.add_country(name, production, gdp, projects, color)
         
         messagebox.showinfo("Success", f"Country '{name}' added successfully!")
         
-        # Clear form and refresh display
+        # Clear form; the new card is added by on_country_change
         self.cancel_add_country()
-        self.refresh_countries_display()
 
     def cancel_add_country(self):
-        """Cancel adding country and hide form"""
+        """Cancel adding country and destroy the form"""
         if hasattr(self, 'add_country_frame'):
-            self.add_country_frame.pack_forget()
+            self.add_country_frame.destroy()
 
     def refresh_countries_display(self):
-        """Refresh the countries display"""
-        # Clear existing countries display
-        for widget in self.countries_frame.winfo_children():
-            widget.pack_forget()
-        
-        # Show countries
-        for country, profile in self.data_manager.CountryProfiles.items():
-            card = tk.Frame(self.countries_frame, bg='white', relief='raised', bd=1)
-            card.pack(fill='x', padx=20, pady=10, ipadx=10, ipady=10)
-            
-            # Header with country name and actions
-            header = tk.Frame(card, bg='white')
-            header.pack(fill='x', pady=(0, 10))
-            
-            tk.Label(header, text=f"🇿🇦 {country}", font=('Segoe UI', 12, 'bold'),
-                    bg='white', fg=profile['Color']).pack(side='left')
+        """Refresh the countries display, showing only search matches while searching"""
+        keys = self.data_manager.search('CountryProfiles', self.country_search.get(), self.search_limit)
+        self.country_list.set_rows(self.data_manager.CountryProfiles, keys)
+        self.update_search_status(self.country_search_status, keys)
+
+    def create_country_card(self, parent):
+        """Create an empty country card and return its updatable widgets"""
+        card = tk.Frame(parent, bg='white', relief='raised', bd=1, padx=10, pady=10)
+        widgets = {'frame': card}
+        
+        # Header with country name and actions
+        header = tk.Frame(card, bg='white')
+        header.pack(fill='x', pady=(0, 10))
+        
+        title = tk.Label(header, font=('Segoe UI', 12, 'bold'), bg='white')
+        title.pack(side='left')
+        
+        # Action buttons for admins
+        if self.current_user_role == "Administrator":
+            action_frame = tk.Frame(header, bg='white')
+            action_frame.pack(side='right')
             
-            # Action buttons for admins
-            if self.current_user_role == "Administrator":
-                action_frame = tk.Frame(header, bg='white')
-                action_frame.pack(side='right')
-                
-                ttk.Button(action_frame, text="✏️ Edit", 
-                          command=lambda c=country: self.edit_country(c),
-                          style='Secondary.TButton').pack(side='left', padx=2)
-                
-                ttk.Button(action_frame, text="🗑️ Remove", 
-                          command=lambda c=country: self.remove_country(c),
-                          style='Secondary.TButton').pack(side='left', padx=2)
+            # Cards are reused for other records, so read the key at click time
+            ttk.Button(action_frame, text="✏️ Edit", 
+                      command=lambda: self.edit_country(widgets['key']),
+                      style='Secondary.TButton').pack(side='left', padx=2)
             
-            # Country info
-            info = f"""⚡ Production: {profile['Production']:,} tons
+            ttk.Button(action_frame, text="🗑️ Remove", 
+                      command=lambda: self.remove_country(widgets['key']),
+                      style='Secondary.TButton').pack(side='left', padx=2)
+        
+        # Country info
+        info = tk.Label(card, font=('Segoe UI', 10),
+                        bg='white', fg=self.colors['dark'], justify='left')
+        info.pack(anchor='w')
+        
+        widgets.update(title=title, info=info)
+        return widgets
+
+    def update_country_card(self, card, country, profile):
+        """Update an existing country card's labels in place"""
+        card['title'].config(text=f"🇿🇦 {country}", fg=profile['Color'])
+        card['info'].config(text=f"""⚡ Production: {profile['Production']:,} tons
 💰 GDP: R{profile['GDP']:,} Million
 🏗️ Active Projects: {profile['Projects']}
-📊 Economic Rating: {'★★★★☆' if profile['GDP'] > 30000 else '★★★☆☆'}"""
-            
-            tk.Label(card, text=info, font=('Segoe UI', 10),
-                   bg='white', fg=self.colors['dark'], justify='left').pack(anchor='w')
+📊 Economic Rating: {'★★★★☆' if profile['GDP'] > 30000 else '★★★☆☆'}""")
 
     def edit_country(self, country_name):
         """Edit country inline"""
@@ -965,29 +4315,20 @@ class ModernApp:
         
         def save_edit():
             new_name = edit_name_entry.get().strip()
-            production = edit_production_entry.get().strip()
-            gdp = edit_gdp_entry.get().strip()
-            projects = edit_projects_entry.get().strip()
-            color = edit_color_entry.get().strip()
-            
-            if not all([new_name, production, gdp, projects]):
-                messagebox.showerror("Error", "Please fill in all fields")
-                return
-                
             try:
-                production_val = int(production)
-                gdp_val = int(gdp)
-                projects_val = int(projects)
-            except ValueError:
-                messagebox.showerror("Error", "Production, GDP, and Projects must be numbers")
+                new_name, production, gdp, projects, color = self.data_manager.validate_country(
+                    new_name, edit_production_entry.get(), edit_gdp_entry.get(),
+                    edit_projects_entry.get(), edit_color_entry.get(),
+                    check_exists=new_name != country_name)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
                 return
                 
             # Use data manager to update country
-            self.data_manager.update_country(country_name, new_name, production_val, gdp_val, projects_val, color)
+            self.data_manager.update_country(country_name, new_name, production, gdp, projects, color)
             
-            messagebox.showinfo("Success", f"Country updated successfully!")
+            messagebox.showinfo("Success", "Country updated successfully!")
             edit_frame.destroy()
-            self.refresh_countries_display()
         
         # Buttons
         button_frame = tk.Frame(edit_frame, bg='white')
@@ -1012,15 +4353,125 @@ class ModernApp:
                 messagebox.showinfo("Success", f"Country '{country_name}' removed successfully!")
                 if parent:
                     parent.destroy()
-                self.refresh_countries_display()
+
+    def import_records(self, entity, parent):
+        """Pick a CSV/Excel file and import it on a worker with a progress bar"""
+        if self.importer is not None:
+            messagebox.showwarning("Import", "An import is already running")
+            return
+        path = filedialog.askopenfilename(
+            title=f"Import {'Minerals' if entity == 'mineral' else 'Countries'}",
+            filetypes=[("Data files", "*.csv *.xlsx *.xls"), ("CSV files", "*.csv"),
+                       ("Excel files", "*.xlsx *.xls")])
+        if not path:
+            return
+        
+        progress_frame = tk.Frame(parent, bg='white')
+        progress_frame.pack(fill='x', padx=20, pady=(0, 10))
+        status_label = tk.Label(progress_frame, text="Reading file...", font=('Segoe UI', 9),
+                                bg='white', fg=self.colors['dark'])
+        status_label.pack(side='left')
+        progress_bar = ttk.Progressbar(progress_frame, mode='determinate', maximum=100, length=300)
+        progress_bar.pack(side='left', padx=10)
+        ttk.Button(progress_frame, text="❌ Cancel", style='Secondary.TButton',
+                  command=lambda: self.finish_import(progress_frame, cancelled=True)).pack(side='left')
+        
+        self.importer = RecordImporter(self.data_manager, entity, path)
+        self.importer.start()
+        self.poll_import(self.importer, progress_frame, status_label, progress_bar)
+
+    def poll_import(self, importer, progress_frame, status_label, progress_bar):
+        """Update the progress bar until the import worker finishes"""
+        if importer is not self.importer:
+            return
+        if not progress_frame.winfo_exists():
+            if not importer.committing:
+                # Its screen was dropped from the screen cache before the rows were confirmed
+                importer.cancel()
+                self.importer = None
+                return
+            # A commit still runs to the end, so its changes are published
+        else:
+            progress_bar['value'] = importer.progress * 100
+            if importer.committing and importer.cancelled.is_set():
+                status_label.config(text="Cancelling...")
+            elif importer.committing:
+                status_label.config(text=f"Saved {importer.committed:,} of {len(importer.rows):,} rows")
+            else:
+                status_label.config(text=f"Checked {importer.row_count:,} rows, {importer.error_count:,} errors")
+        if not importer.done:
+            self.root.after(100, self.poll_import, importer, progress_frame, status_label, progress_bar)
+        elif importer.committing or importer.failure is not None:
+            self.finish_import(progress_frame)
+        elif self.confirm_import(importer):
+            # The valid rows are written on the importer's thread, with the same progress bar
+            importer.start_commit()
+            self.root.after(100, self.poll_import, importer, progress_frame, status_label, progress_bar)
+        else:
+            self.finish_import(progress_frame, cancelled=True)
+
+    def confirm_import(self, importer):
+        """Report the rows that failed validation; True to go on and save the valid ones"""
+        if importer.error_count:
+            report = "\n".join(f"Row {number}: {message}" for number, message in importer.errors[:10])
+            if importer.error_count > 10:
+                report += f"\n... and {importer.error_count - 10:,} more"
+            if not importer.rows:
+                messagebox.showerror("Error", f"No valid rows to import:\n{report}")
+                return False
+            return messagebox.askyesno("Import", f"{importer.error_count:,} rows have errors:\n{report}\n\n"
+                                                 f"Import the {len(importer.rows):,} valid rows?")
+        if not importer.rows:
+            messagebox.showinfo("Import", "The file has no rows to import")
+            return False
+        return True
+
+    def finish_import(self, progress_frame, cancelled=False):
+        """Report the finished import and publish its changes to the screens"""
+        importer = self.importer
+        if cancelled and importer is not None and importer.committing and not importer.done:
+            # The worker stops after its current chunk and undoes the chunks it
+            # wrote; poll_import comes back here once it has
+            importer.cancel()
+            return
+        self.importer = None
+        progress_frame.destroy()
+        if importer is None:
+            return
+        if not importer.committing:
+            if cancelled:
+                importer.cancel()
+            elif importer.failure is not None:
+                messagebox.showerror("Error", f"Import failed: {importer.failure}")
+            return
+        
+        # Held back by the worker, since screens may only be updated from this
+        # thread; an undone commit publishes its undo as well
+        self.data_manager.publish_events(importer.events)
+        if importer.failure is not None:
+            messagebox.showerror("Error", f"Import failed: {importer.failure}")
+            return
+        if importer.rolled_back:
+            return
+        if importer.conflicts:
+            report = "\n".join(f"Row {number}: {message}" for number, message in importer.conflicts[:10])
+            if len(importer.conflicts) > 10:
+                report += f"\n... and {len(importer.conflicts) - 10:,} more"
+            messagebox.showwarning("Import", f"Imported {importer.committed:,} records. "
+                                             f"{len(importer.conflicts):,} rows were skipped because "
+                                             f"they were added while importing:\n{report}")
+            return
+        messagebox.showinfo("Success", f"Imported {importer.committed:,} records successfully!")
 
     def show_map(self):
         """Show map inside the app"""
-        self.clear_frame()
+        self.show_screen('map', self.build_map_screen)
+
+    def build_map_screen(self):
         self.create_navigation("Interactive Map")
         
         # Create main content area
-        content_frame = tk.Frame(self.root, bg=self.colors['background'])
+        content_frame = tk.Frame(self.screen, bg=self.colors['background'])
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Map controls
@@ -1047,18 +4498,29 @@ class ModernApp:
             ttk.Radiobutton(map_type_frame, text=text, value=value,
                            variable=self.map_type_var, command=self.update_embedded_map).pack(side='left', padx=10)
         
+        # Drawn or removed on the next viewport check
+        self.map_heat_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(map_type_frame, text="Production Heatmap",
+                        variable=self.map_heat_var).pack(side='left', padx=10)
+        
         # Map display area
         map_display_frame = tk.Frame(content_frame, bg='white', relief='raised', bd=1)
         map_display_frame.pack(fill='both', expand=True, pady=10)
         
         # Create embedded map
         self.create_embedded_map(map_display_frame)
+        
+        # Sites are re-read on the next zoom check after any mineral change
+        self.subscribe_view(lambda event: self.invalidate_map_sites(), 'mineral')
 
     def create_embedded_map(self, parent):
         """Create embedded map using TkinterMapView"""
         try:
-            # Create map widget
-            self.map_widget = TkinterMapView(parent, width=800, height=600, corner_radius=0)
+            # Create map widget, reading tiles through the offline cache
+            if self.tile_store is None:
+                self.tile_store = TileStore(max_bytes=self.tile_cache_bytes)
+            self.map_widget = CachedMapView(parent, width=800, height=600, corner_radius=0,
+                                            tile_store=self.tile_store)
             self.map_widget.pack(fill='both', expand=True, padx=10, pady=10)
             
             # Set initial position (Africa)
@@ -1068,24 +4530,17 @@ class ModernApp:
             # Set initial tile server based on selection
             self.update_embedded_map()
             
-            # Add markers for mineral locations
-            locations = [
-                {"name": "Cobalt (DRC)", "lat": -4.0, "lon": 15.0, "type": "Cobalt", "production": 1200},
-                {"name": "Lithium (Zimbabwe)", "lat": -20.0, "lon": 30.0, "type": "Lithium", "production": 950},
-                {"name": "Gold (South Africa)", "lat": -30.0, "lon": 25.0, "type": "Gold", "production": 2500},
-                {"name": "Graphite (Mozambique)", "lat": -18.0, "lon": 35.0, "type": "Graphite", "production": 800},
-                {"name": "Manganese (South Africa)", "lat": -28.0, "lon": 24.0, "type": "Manganese", "production": 1500}
-            ]
+            # Markers come from the mineral data, clustered for the current zoom level
+            self.map_clusters = None
+            self.map_view = None
+            self.map_moving = None
+            self.map_markers = {}
+            # Heatmap of the current sites, the view it was drawn for and its marker
+            self.map_heat = None
+            self.map_heat_view = None
+            self.map_heat_marker = None
+            self.watch_map(self.map_widget)
             
-            # Add markers to map
-            for loc in locations:
-                marker = self.map_widget.set_marker(
-                    loc["lat"], 
-                    loc["lon"],
-                    text=loc["name"],
-                    command=lambda l=loc: self.show_marker_info(l)
-                )
-                
         except Exception as e:
             # Fallback to HTML map if embedded fails
             tk.Label(parent, text=f"Map loading failed: {str(e)}", 
@@ -1095,60 +4550,144 @@ class ModernApp:
     def update_embedded_map(self):
         """Update embedded map based on tile selection"""
         if hasattr(self, 'map_widget'):
-            map_type = self.map_type_var.get()
+            self.map_widget.set_tile_server(TILE_SERVERS[self.map_type_var.get()], max_zoom=22)
+
+    def invalidate_map_sites(self):
+        self.map_clusters = None
+
+    def watch_map(self, map_widget):
+        """Update the markers when the viewport or the sites change
+        
+        TkinterMapView has no pan or zoom event, so the viewport is polled.
+        Markers are only updated once it stays the same for one check, which
+        debounces drags and wheel zooming. The heatmap follows the markers
+        once its background build is done.
+        """
+        if map_widget is not self.map_widget or not map_widget.winfo_exists():
+            return
+        if map_widget.winfo_ismapped():
+            if self.map_clusters is None:
+                self.map_clusters = MarkerClusters(*self.data_manager.mineral_sites())
+                self.map_heat = None
+                self.map_view = None
+                self.remove_map_markers(list(self.map_markers))
+            view = (round(map_widget.zoom),) + self.map_clusters.cell_bounds(
+                map_widget.upper_left_tile_pos, map_widget.lower_right_tile_pos)
+            if view == self.map_view:
+                self.map_moving = None
+            elif view == self.map_moving:
+                self.draw_map_markers(view)
+            else:
+                self.map_moving = view
             
-            if map_type == "satellite":
-                self.map_widget.set_tile_server("https://mt0.google.com/vt/lyrs=s&hl=en&x={x}&y={y}&z={z}&s=Ga", max_zoom=22)
-            elif map_type == "terrain":
-                self.map_widget.set_tile_server("https://mt0.google.com/vt/lyrs=p&hl=en&x={x}&y={y}&z={z}&s=Ga", max_zoom=22)
-            else:  # roadmap
-                self.map_widget.set_tile_server("https://a.tile.openstreetmap.org/{z}/{x}/{y}.png", max_zoom=22)
-
-    def show_marker_info(self, location):
+            if self.map_heat_var.get() and self.map_heat is None:
+                clusters = self.map_clusters
+                self.map_heat = ProductionHeatmap(clusters.x, clusters.y, clusters.production)
+                threading.Thread(target=self.map_heat.build, daemon=True).start()
+            # The heatmap is part of the key since rebuilding it changes the image, not the view
+            heat_view = None
+            if self.map_heat_var.get() and self.map_heat.ready.is_set():
+                heat_view = (self.map_heat, self.map_view)
+            if heat_view != self.map_heat_view:
+                self.draw_map_heat(heat_view)
+        self.root.after(150, self.watch_map, map_widget)
+
+    def draw_map_heat(self, heat_view):
+        """Replace the heatmap marker with one rendered for the viewport
+        
+        heat_view is (heatmap, marker view), or None to just remove it.
+        """
+        self.map_heat_view = heat_view
+        if self.map_heat_marker is not None:
+            self.map_heat_marker.delete()
+            self.map_heat_marker = None
+        if heat_view is None:
+            return
+        heatmap, view = heat_view
+        rendered = heatmap.render(view[0], self.map_widget.upper_left_tile_pos,
+                                  self.map_widget.lower_right_tile_pos)
+        if rendered is None:
+            return
+        image, latitude, longitude = rendered
+        self.map_heat_image = ImageTk.PhotoImage(image)
+        self.map_heat_marker = self.map_widget.set_marker(latitude, longitude, icon=self.map_heat_image)
+        # Keep the site markers clickable above it
+        if self.map_heat_marker.canvas_icon is not None:
+            self.map_widget.canvas.tag_lower(self.map_heat_marker.canvas_icon, 'marker')
+
+    def draw_map_markers(self, view):
+        """Show the site clusters inside a viewport, changing only the markers that differ"""
+        self.map_view = view
+        zoom = view[0]
+        clusters = self.map_clusters
+        latitudes, longitudes, counts, production, first, cells = clusters.at_zoom(zoom)
+        shown = clusters.visible(*view, limit=self.max_map_markers)
+        
+        # Markers are keyed by zoom level and cell, so a pan keeps the ones still in view
+        wanted = {(zoom, cell): index for cell, index in zip(cells[shown].tolist(), shown.tolist())}
+        self.remove_map_markers([key for key in self.map_markers if key not in wanted])
+        
+        for key, index in wanted.items():
+            if key in self.map_markers:
+                continue
+            latitude, longitude = float(latitudes[index]), float(longitudes[index])
+            count = int(counts[index])
+            if count == 1:
+                name = clusters.names[int(first[index])]
+                marker = self.map_widget.set_marker(
+                    latitude, longitude, text=name,
+                    command=lambda marker, name=name: self.show_marker_info(name))
+            else:
+                # Clicking a cluster zooms in on it
+                marker = self.map_widget.set_marker(
+                    latitude, longitude, text=f"{count:,} sites",
+                    marker_color_circle='white', marker_color_outside=self.colors['secondary'],
+                    command=lambda marker: self.zoom_to_cluster(marker.position))
+            self.map_markers[key] = marker
+
+    def remove_map_markers(self, keys):
+        for key in keys:
+            self.map_markers.pop(key).delete()
+
+    def zoom_to_cluster(self, position):
+        zoom = round(self.map_widget.zoom) + 2
+        self.map_widget.set_position(*position)
+        self.map_widget.set_zoom(zoom)
+
+    def show_marker_info(self, mineral):
         """Show information when marker is clicked"""
+        if mineral not in self.data_manager.MineralData:
+            return
+        data = self.data_manager.MineralData[mineral]
         info_text = f"""
-{location['name']}
-Mineral: {location['type']}
-Production: {location['production']} tonnes/day
+{mineral}
+Location: {data['Location']}
+Production: {data['Production']:,} tonnes/day
 Status: Active mining operations
 """
         messagebox.showinfo("Mineral Location", info_text)
 
     def create_folium_map_fallback(self, parent):
         """Fallback to HTML map if embedded fails"""
-        # Create folium map
-        locations = [
-            {"name": "Cobalt (DRC)", "lat": -4, "lon": 15, "type": "Cobalt", "production": 1200},
-            {"name": "Lithium (Zimbabwe)", "lat": -20, "lon": 30, "type": "Lithium", "production": 950},
-            {"name": "Gold (South Africa)", "lat": -30, "lon": 25, "type": "Gold", "production": 2500},
-        ]
-        
-        m = folium.Map(location=[-15, 25], zoom_start=4)
-        
-        for loc in locations:
-            folium.Marker(
-                [loc["lat"], loc["lon"]],
-                popup=f"{loc['name']}<br>Production: {loc['production']} tonnes/day",
-                tooltip=loc["name"]
-            ).add_to(m)
-        
-        # Save and open in browser
-        map_file = "mineral_map.html"
-        m.save(map_file)
+        # The map file is only rewritten when the sites changed
+        map_file = site_map_file(*self.data_manager.mineral_sites())
         
         info_label = tk.Label(parent, 
-                            text="Map opened in web browser.\nFile: mineral_map.html",
+                            text=f"Map opened in web browser.\nFile: {map_file}",
                             font=('Segoe UI', 12), bg='white')
         info_label.pack(expand=True)
         
         webbrowser.open('file://' + os.path.realpath(map_file))
 
     def show_charts(self):
-        self.clear_frame()
+        # Stale charts only need the current chart redrawn
+        self.show_screen('charts', self.build_charts_screen, refresh=self.generate_selected_chart)
+
+    def build_charts_screen(self):
         self.create_navigation("Analytics & Charts")
         
         # Create scrollable content
-        scrollable_frame, _ = self.create_scrollable_frame(self.root)
+        scrollable_frame, _ = self.create_scrollable_frame(self.screen)
         
         # Chart selection controls
         controls_frame = tk.Frame(scrollable_frame, bg='white', relief='raised', bd=1)
@@ -1172,26 +4711,63 @@ Status: Active mining operations
             ("Projects Distribution", "projects_pie"),
             ("Country Production", "country_production"),
             ("Head-to-Head Comparison", "comparison"),
-            ("All Countries Overview", "all_countries")
+            ("All Countries Overview", "all_countries"),
+            ("Production History", "production_history")
         ]
         
         for text, value in chart_types:
             ttk.Radiobutton(chart_type_frame, text=text, value=value,
                            variable=self.chart_type_var, command=self.on_chart_type_change).pack(side='left', padx=10)
         
+        # Top-N limit, served by the DataManager sorted indexes
+        limit_frame = tk.Frame(controls_frame, bg='white')
+        limit_frame.pack(pady=(0, 10))
+        
+        tk.Label(limit_frame, text="Show:", font=('Segoe UI', 10, 'bold'),
+                bg='white').pack(side='left', padx=(0, 10))
+        self.chart_limit = ttk.Combobox(limit_frame, values=["All", "Top 10", "Top 25", "Top 50"],
+                                        state="readonly", width=10)
+        self.chart_limit.set("All")
+        self.chart_limit.pack(side='left')
+        
         # Comparison controls (initially hidden)
         self.comparison_frame = tk.Frame(controls_frame, bg='white')
         
         # All countries controls (initially hidden)
         self.all_countries_frame = tk.Frame(controls_frame, bg='white')
         
+        # Production history controls (initially hidden)
+        self.history_frame = tk.Frame(controls_frame, bg='white')
+        
         # Generate chart button
         ttk.Button(controls_frame, text="🔄 Generate Chart", style='Primary.TButton',
                   command=self.generate_selected_chart).pack(pady=10)
         
-        # Chart display area
+        # Live feed controls, for the production charts
+        live_frame = tk.Frame(controls_frame, bg='white')
+        live_frame.pack(pady=(0, 10))
+        
+        tk.Label(live_frame, text="Live source:", font=('Segoe UI', 10, 'bold'),
+                bg='white').pack(side='left', padx=(0, 10))
+        self.live_source = ttk.Combobox(live_frame, values=["Simulator", "File"],
+                                        state="readonly", width=12)
+        self.live_source.set("Simulator")
+        self.live_source.pack(side='left')
+        self.live_button = ttk.Button(live_frame, text="📡 Start Live Feed", style='Secondary.TButton',
+                                      command=self.toggle_live_feed)
+        self.live_button.pack(side='left', padx=10)
+        
+        # Chart display area; the labels are reused for every chart shown
         self.chart_frame = tk.Frame(scrollable_frame, bg='white', relief='raised', bd=1)
         self.chart_frame.pack(fill='both', expand=True, pady=10)
+        self.chart_message = tk.Label(self.chart_frame, font=('Segoe UI', 11),
+                                      bg='white', fg=self.colors['dark'])
+        self.chart_display = tk.Frame(self.chart_frame, bg='white')
+        self.chart_title = tk.Label(self.chart_display, font=('Segoe UI', 12, 'bold'),
+                                    bg='white', fg=self.colors['primary'])
+        self.chart_title.pack(pady=10)
+        self.chart_image = tk.Label(self.chart_display, bg='white')
+        self.chart_image.pack(fill='both', expand=True)
         
         # Generate default chart
         self.generate_selected_chart()
@@ -1200,15 +4776,25 @@ Status: Active mining operations
         """Handle chart type change"""
         chart_type = self.chart_type_var.get()
         
+        self.stop_live_feed()
+        # A chart still rendering is for the old type, so drop it
+        if self.chart_generation is not None:
+            self.chart_renderer.cancel()
+            self.chart_generation = None
+            self.show_chart_message("Press Generate Chart to draw the selected chart")
+        
         # Hide all control frames first
         self.comparison_frame.pack_forget()
         self.all_countries_frame.pack_forget()
+        self.history_frame.pack_forget()
         
         # Show appropriate controls
         if chart_type == "comparison":
             self.show_comparison_controls()
         elif chart_type == "all_countries":
             self.show_all_countries_controls()
+        elif chart_type == "production_history":
+            self.show_history_controls()
 
     def show_comparison_controls(self):
         """Show controls for head-to-head comparison"""
@@ -1272,120 +4858,249 @@ Status: Active mining operations
                                                state="readonly", width=15)
         self.all_countries_metric.set("All Metrics")
         self.all_countries_metric.grid(row=0, column=1, padx=5)
-    def generate_selected_chart(self):
-        """Generate the selected chart type"""
-        chart_type = self.chart_type_var.get()
+    def show_history_controls(self):
+        """Show controls for production history"""
+        self.history_frame.pack(fill='x', pady=10)
         
-        # Clear previous chart
-        for widget in self.chart_frame.winfo_children():
+        # Clear previous controls
+        for widget in self.history_frame.winfo_children():
             widget.destroy()
         
-        # Generate the selected chart
+        tk.Label(self.history_frame, text="Production History Options:", 
+                font=('Segoe UI', 10, 'bold'), bg='white').pack(anchor='w')
+        
+        options_frame = tk.Frame(self.history_frame, bg='white')
+        options_frame.pack(fill='x', pady=5)
+        
+        tk.Label(options_frame, text="Type:", font=('Segoe UI', 9),
+                bg='white').grid(row=0, column=0, padx=5)
+        self.history_entity = ttk.Combobox(options_frame, values=["Mineral", "Country"],
+                                           state="readonly", width=12)
+        self.history_entity.set("Mineral")
+        self.history_entity.grid(row=0, column=1, padx=5)
+        
+        tk.Label(options_frame, text="Name:", font=('Segoe UI', 9),
+                bg='white').grid(row=0, column=2, padx=5)
+        self.history_name = ttk.Combobox(options_frame, state="readonly", width=18)
+        self.history_name.grid(row=0, column=3, padx=5)
+        
+        tk.Label(options_frame, text="Resolution:", font=('Segoe UI', 9),
+                bg='white').grid(row=1, column=0, padx=5, pady=5)
+        self.history_resolution = ttk.Combobox(options_frame,
+                                               values=["Auto", "Raw", "Day", "Week", "Month"],
+                                               state="readonly", width=12)
+        self.history_resolution.set("Auto")
+        self.history_resolution.grid(row=1, column=1, padx=5, pady=5)
+        
+        def update_names(event=None):
+            entity = self.history_entity.get().lower()
+            names = self.data_manager.production_series.names(entity)
+            self.history_name.configure(values=names)
+            self.history_name.set(names[0] if names else "")
+        
+        self.history_entity.bind('<<ComboboxSelected>>', update_names)
+        update_names()
+
+    def generate_selected_chart(self):
+        """Generate the selected chart type on the render worker"""
+        chart_type = self.chart_type_var.get()
+        self.stop_live_feed()
+        
+        key = self.chart_key(chart_type)
+        cached = self.chart_cache.get(key)
+        if cached is not None:
+            if self.chart_generation is not None:
+                self.chart_renderer.cancel()
+                self.chart_generation = None
+            self.embed_chart(*cached)
+            return
+        
+        # Gather the data here; the worker only builds and draws the figure
         if chart_type == "mineral_production":
-            self.generate_mineral_production_chart()
+            request = self.generate_mineral_production_chart()
         elif chart_type == "country_gdp":
-            self.generate_country_gdp_chart()
+            request = self.generate_country_gdp_chart()
         elif chart_type == "projects_pie":
-            self.generate_projects_pie_chart()
+            request = self.generate_projects_pie_chart()
         elif chart_type == "country_production":
-            self.generate_country_production_chart()
+            request = self.generate_country_production_chart()
         elif chart_type == "comparison":
-            self.generate_comparison_chart()
+            request = self.generate_comparison_chart()
         elif chart_type == "all_countries":
-            self.generate_all_countries_chart()
-
-    def generate_mineral_production_chart(self):
-        """Generate mineral production bar chart"""
-        minerals = list(self.data_manager.MineralData.keys())
-        production = [data['Production'] for data in self.data_manager.MineralData.values()]
-        colors = [data['Color'] for data in self.data_manager.MineralData.values()]
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(minerals, production, color=colors, alpha=0.8, edgecolor='black')
+            request = self.generate_all_countries_chart()
+        elif chart_type == "production_history":
+            request = self.generate_production_history_chart()
+        if request is None:
+            return
         
-        ax.set_title('Mineral Production (tonnes/day)', fontsize=14, fontweight='bold', pad=20)
-        ax.set_ylabel('Production (tonnes/day)')
-        ax.tick_params(axis='x', rotation=45)
+        build, options, title = request
+        self.show_chart_message("⏳ Rendering chart...")
+        self.submit_chart(chart_type, build, options, title, key)
+
+    def submit_chart(self, chart_type, build, options, title, key=None):
+        """Hand a chart to the render worker and show it when done; cached under key if given"""
+        self.chart_generation = self.chart_renderer.submit(chart_type, build, options)
+        self.poll_chart(self.chart_generation, self.chart_frame, title, key)
+
+    def chart_key(self, chart_type):
+        """Cache key of a chart: its type, the control values it reads and the data version"""
+        limit = self.chart_limit.get() if hasattr(self, 'chart_limit') else "All"
+        version = self.data_manager.data_version
+        if chart_type == "comparison":
+            params = ((self.comp_country1.get(), self.comp_country2.get(), self.comp_metric.get())
+                      if hasattr(self, 'comp_country1') else None)
+        elif chart_type == "all_countries":
+            params = (self.all_countries_metric.get() if hasattr(self, 'all_countries_metric')
+                      else "All Metrics", limit)
+        elif chart_type == "production_history":
+            params = ((self.history_entity.get(), self.history_name.get(), self.history_resolution.get())
+                      if hasattr(self, 'history_name') else None)
+            # History is not part of the record data, so it has its own version
+            version = self.data_manager.production_series.version
+        else:
+            params = limit
+        return chart_type, params, version
+
+    def poll_chart(self, generation, chart_frame, title, key):
+        """Wait for a chart render and show it, unless a newer request replaced it"""
+        if generation != self.chart_generation or not chart_frame.winfo_exists():
+            return
+        result = self.chart_renderer.result(generation)
+        if result is None:
+            self.root.after(50, self.poll_chart, generation, chart_frame, title, key)
+            return
+        self.chart_generation = None
+        image, error = result
+        if error is not None:
+            self.show_chart_message("Chart could not be rendered")
+            messagebox.showerror("Error", f"Failed to render chart: {error}")
+            return
+        if key is not None:
+            self.chart_cache.put(key, image, title)
+        self.embed_chart(image, title)
+
+    def toggle_live_feed(self):
+        """Start or stop streaming production readings into the production chart"""
+        if self.live_feed is not None:
+            self.stop_live_feed()
+            return
         
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 50,
-                   f'{height:,}', ha='center', va='bottom', fontweight='bold')
+        chart_type = self.chart_type_var.get()
+        if chart_type == "mineral_production":
+            entity, request = 'mineral', self.generate_mineral_production_chart()
+        elif chart_type == "country_production":
+            entity, request = 'country', self.generate_country_production_chart()
+        else:
+            messagebox.showwarning("Live Feed", "Live mode is available for the Mineral Production "
+                                                "and Country Production charts")
+            return
         
-        plt.tight_layout()
+        # The chart as generated now is the live view's starting state
+        build, options, title = request
+        buffer = ReadingBuffer()
+        if self.live_source.get() == "File":
+            path = filedialog.askopenfilename(
+                title="Follow Readings File (entity,name,value per line)",
+                filetypes=[("Text files", "*.csv *.txt *.log"), ("All files", "*.*")])
+            if not path:
+                return
+            feed = FileTailFeed(buffer, path)
+        else:
+            feed = SimulatedFeed(buffer, entity, dict(zip(options['names'], options['values'].tolist())),
+                                 rate=self.live_rate)
+        
+        self.live_feed = {
+            'feed': feed, 'buffer': buffer, 'entity': entity, 'chart_type': chart_type,
+            'build': build, 'options': options, 'title': f"{title} (live)",
+            'positions': {name: position for position, name in enumerate(options['names'])},
+            'values': np.array(options['values'], dtype=np.int64), 'changed': True,
+            'chart_frame': self.chart_frame, 'button': self.live_button,
+            'recorder': ProductionRecorder(self.data_manager.production_series),
+        }
+        feed.start()
+        self.live_button.config(text="⏹ Stop Live Feed")
+        self.live_tick(self.live_feed)
+
+    def live_tick(self, live):
+        """Fold buffered readings into the live chart and redraw it, at most live_fps times a second"""
+        if live is not self.live_feed:
+            return
+        if not live['chart_frame'].winfo_exists():
+            self.stop_live_feed()
+            return
+        if live['feed'].failure is not None:
+            self.stop_live_feed()
+            messagebox.showerror("Error", f"Live feed stopped: {live['feed'].failure}")
+            return
         
-        # Embed in tkinter
-        self.embed_chart(fig, "Mineral Production Analysis")
+        # Only the latest reading per name matters for the chart
+        values, positions = live['values'], live['positions']
+        readings = live['buffer'].drain()
+        # Every reading also goes into the production history
+        if readings:
+            live['recorder'].add(readings)
+        for entity, name, value in readings:
+            position = positions.get(name)
+            if entity == live['entity'] and position is not None:
+                values[position] = round(value)
+                live['changed'] = True
+        
+        # Keep one frame in flight; readings arriving meanwhile go into the next one
+        if live['changed'] and self.chart_generation is None and live['chart_frame'].winfo_ismapped():
+            live['changed'] = False
+            self.submit_chart(live['chart_type'], live['build'],
+                              dict(live['options'], values=values.copy()), live['title'])
+        self.root.after(int(1000 / self.live_fps), self.live_tick, live)
+
+    def stop_live_feed(self):
+        live, self.live_feed = self.live_feed, None
+        if live is None:
+            return
+        live['feed'].stop()
+        live['recorder'].stop()
+        if live['button'].winfo_exists():
+            live['button'].config(text="📡 Start Live Feed")
+
+    def show_chart_message(self, text):
+        """Replace the chart area with a line of text"""
+        self.chart_display.pack_forget()
+        self.chart_message.config(text=text)
+        self.chart_message.pack(pady=40)
+
+    def chart_series(self, entity, metric):
+        """Return (names, values, colors) for a chart, limited to the selected top N"""
+        limit = self.chart_limit.get() if hasattr(self, 'chart_limit') else "All"
+        if limit == "All":
+            records = self.data_manager.MineralData if entity == 'mineral' else self.data_manager.CountryProfiles
+            # Copied, since the worker reads them while the table may change
+            return list(records), np.array(records.column(metric)), list(records.column('Color'))
+        
+        find = self.data_manager.find_minerals if entity == 'mineral' else self.data_manager.find_countries
+        rows = find(order_by=metric, descending=True, limit=int(limit.split()[-1]))
+        return ([name for name, _ in rows],
+                np.array([record[metric] for _, record in rows]),
+                [record['Color'] for _, record in rows])
+
+    def generate_mineral_production_chart(self):
+        """Describe the mineral production bar chart"""
+        return series_chart('mineral_production', *self.chart_series('mineral', 'Production'))
 
     def generate_country_gdp_chart(self):
-        """Generate country GDP bar chart"""
-        countries = list(self.data_manager.CountryProfiles.keys())
-        gdp = [data['GDP'] for data in self.data_manager.CountryProfiles.values()]
-        colors = [data['Color'] for data in self.data_manager.CountryProfiles.values()]
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(countries, gdp, color=colors, alpha=0.8, edgecolor='black')
-        
-        ax.set_title('Country GDP (R Millions)', fontsize=14, fontweight='bold', pad=20)
-        ax.set_ylabel('GDP (R Millions)')
-        ax.tick_params(axis='x', rotation=45)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 500,
-                   f'R{height:,}M', ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
-        self.embed_chart(fig, "Country GDP Analysis")
+        """Describe the country GDP bar chart"""
+        return series_chart('country_gdp', *self.chart_series('country', 'GDP'))
 
     def generate_projects_pie_chart(self):
-        """Generate projects distribution pie chart"""
-        countries = list(self.data_manager.CountryProfiles.keys())
-        projects = [data['Projects'] for data in self.data_manager.CountryProfiles.values()]
-        colors = [data['Color'] for data in self.data_manager.CountryProfiles.values()]
-        
-        fig, ax = plt.subplots(figsize=(8, 8))
-        wedges, texts, autotexts = ax.pie(projects, labels=countries, autopct='%1.1f%%', 
-                                         colors=colors, startangle=90)
-        
-        ax.set_title('Mining Projects Distribution', fontsize=14, fontweight='bold', pad=20)
-        
-        # Style the autotexts
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-        
-        plt.tight_layout()
-        self.embed_chart(fig, "Projects Distribution")
+        """Describe the projects distribution pie chart"""
+        return series_chart('projects_pie', *self.chart_series('country', 'Projects'))
 
     def generate_country_production_chart(self):
-        """Generate country production chart"""
-        countries = list(self.data_manager.CountryProfiles.keys())
-        production = [data['Production'] for data in self.data_manager.CountryProfiles.values()]
-        colors = [data['Color'] for data in self.data_manager.CountryProfiles.values()]
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(countries, production, color=colors, alpha=0.8, edgecolor='black')
-        
-        ax.set_title('Country Mineral Production (tons)', fontsize=14, fontweight='bold', pad=20)
-        ax.set_ylabel('Production (tons)')
-        ax.tick_params(axis='x', rotation=45)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 50,
-                   f'{height:,}', ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
-        self.embed_chart(fig, "Country Production Analysis")
+        """Describe the country production bar chart"""
+        return series_chart('country_production', *self.chart_series('country', 'Production'))
 
     def generate_comparison_chart(self):
-        """Generate head-to-head comparison chart"""
+        """Describe the head-to-head comparison chart"""
         if not hasattr(self, 'comp_country1') or not self.comp_country1.get():
-            return
+            return None
             
         country1 = self.comp_country1.get()
         country2 = self.comp_country2.get()
@@ -1393,128 +5108,59 @@ Status: Active mining operations
         
         if country1 == country2:
             messagebox.showwarning("Selection Error", "Please select two different countries for comparison")
-            return
+            return None
         
         # Get data for comparison
         data1 = self.data_manager.CountryProfiles[country1]
         data2 = self.data_manager.CountryProfiles[country2]
         
         metrics_map = {"Production": "Production", "GDP": "GDP", "Projects": "Projects"}
-        metric_key = metrics_map[metric]
-        
-        values = [data1[metric_key], data2[metric_key]]
-        colors = [data1['Color'], data2['Color']]
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar([country1, country2], values, color=colors, alpha=0.8, edgecolor='black', width=0.6)
-        
-        ax.set_title(f'{country1} vs {country2} - {metric} Comparison', 
-                    fontsize=14, fontweight='bold', pad=20)
-        ax.set_ylabel(metric)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + max(values)*0.05,
-                   f'{height:,}', ha='center', va='bottom', fontweight='bold', fontsize=12)
-        
-        plt.tight_layout()
-        self.embed_chart(fig, f"Head-to-Head: {country1} vs {country2}")
+        return comparison_chart(country1, data1, country2, data2, metrics_map[metric])
 
     def generate_all_countries_chart(self):
-        """Generate chart showing all countries with selected metrics"""
-        countries = list(self.data_manager.CountryProfiles.keys())
-        metric = getattr(self, 'all_countries_metric', ttk.Combobox()).get() if hasattr(self, 'all_countries_metric') else "All Metrics"
+        """Describe the chart showing all countries with selected metrics"""
+        metric = self.all_countries_metric.get() if hasattr(self, 'all_countries_metric') else "All Metrics"
         
         if metric == "All Metrics":
-            # Create subplots for all metrics
-            fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-            fig.suptitle('All Countries - Comprehensive Overview', fontsize=16, fontweight='bold', y=0.95)
-            
-            # Production
-            production = [data['Production'] for data in self.data_manager.CountryProfiles.values()]
-            colors = [data['Color'] for data in self.data_manager.CountryProfiles.values()]
-            bars1 = ax1.bar(countries, production, color=colors, alpha=0.8)
-            ax1.set_title('Production (tons)', fontweight='bold')
-            ax1.tick_params(axis='x', rotation=45)
-            for bar in bars1:
-                height = bar.get_height()
-                ax1.text(bar.get_x() + bar.get_width()/2., height + 50,
-                        f'{height:,}', ha='center', va='bottom', fontweight='bold', fontsize=8)
-            
-            # GDP
-            gdp = [data['GDP'] for data in self.data_manager.CountryProfiles.values()]
-            bars2 = ax2.bar(countries, gdp, color=colors, alpha=0.8)
-            ax2.set_title('GDP (R Millions)', fontweight='bold')
-            ax2.tick_params(axis='x', rotation=45)
-            for bar in bars2:
-                height = bar.get_height()
-                ax2.text(bar.get_x() + bar.get_width()/2., height + 500,
-                        f'R{height:,}M', ha='center', va='bottom', fontweight='bold', fontsize=8)
-            
-            # Projects
-            projects = [data['Projects'] for data in self.data_manager.CountryProfiles.values()]
-            bars3 = ax3.bar(countries, projects, color=colors, alpha=0.8)
-            ax3.set_title('Projects Count', fontweight='bold')
-            ax3.tick_params(axis='x', rotation=45)
-            for bar in bars3:
-                height = bar.get_height()
-                ax3.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                        f'{height}', ha='center', va='bottom', fontweight='bold', fontsize=8)
-            
-            # Pie chart for projects distribution
-            ax4.pie(projects, labels=countries, autopct='%1.1f%%', colors=colors, startangle=90)
-            ax4.set_title('Projects Distribution', fontweight='bold')
-            
-            plt.tight_layout()
-            self.embed_chart(fig, "All Countries Comprehensive Overview")
-            
-        else:
-            # Single metric chart
-            metrics_map = {"Production": "Production", "GDP": "GDP", "Projects": "Projects"}
-            metric_key = metrics_map[metric]
-            
-            values = [data[metric_key] for data in self.data_manager.CountryProfiles.values()]
-            colors = [data['Color'] for data in self.data_manager.CountryProfiles.values()]
-            
-            fig, ax = plt.subplots(figsize=(12, 8))
-            bars = ax.bar(countries, values, color=colors, alpha=0.8, edgecolor='black')
-            
-            ax.set_title(f'All Countries - {metric} Overview', fontsize=14, fontweight='bold', pad=20)
-            ax.set_ylabel(metric)
-            ax.tick_params(axis='x', rotation=45)
-            
-            # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + max(values)*0.01,
-                       f'{height:,}', ha='center', va='bottom', fontweight='bold', fontsize=10)
-            
-            plt.tight_layout()
-            self.embed_chart(fig, f"All Countries - {metric}")
-
-    def embed_chart(self, fig, title):
-        """Embed matplotlib chart in tkinter frame"""
-        # Create a frame for the chart
-        chart_display_frame = tk.Frame(self.chart_frame, bg='white')
-        chart_display_frame.pack(fill='both', expand=True, padx=10, pady=10)
+            return overview_chart(self.data_manager.CountryProfiles)
         
-        # Add title
-        tk.Label(chart_display_frame, text=title, font=('Segoe UI', 12, 'bold'),
-                bg='white', fg=self.colors['primary']).pack(pady=10)
-        
-        # Embed the chart
-        canvas = FigureCanvasTkAgg(fig, chart_display_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+        # Single metric chart
+        metrics_map = {"Production": "Production", "GDP": "GDP", "Projects": "Projects"}
+        return metric_overview_chart(metric, *self.chart_series('country', metrics_map[metric]))
+
+    def generate_production_history_chart(self):
+        """Describe a production time-series chart from the history store"""
+        if not hasattr(self, 'history_name') or not self.history_name.get():
+            self.show_chart_message("No production history recorded yet")
+            return None
+        
+        entity = self.history_entity.get().lower()
+        name = self.history_name.get()
+        resolution = self.history_resolution.get().lower()
+        timestamps, values, resolution = self.data_manager.production_history(
+            entity, name, resolution=None if resolution == "auto" else resolution)
+        return history_chart(name, resolution, timestamps, values, self.colors['secondary'])
+
+    def embed_chart(self, image, title):
+        """Show a rendered chart image in the chart frame"""
+        self.chart_message.pack_forget()
+        self.chart_title.config(text=title)
+        
+        # Keep a reference on the label so Tk does not lose the image
+        photo = ImageTk.PhotoImage(Image.open(io.BytesIO(image)))
+        self.chart_image.config(image=photo)
+        self.chart_image.image = photo
+        self.chart_display.pack(fill='both', expand=True, padx=10, pady=10)
 
     def show_data_tables(self):
         """Show data in table format"""
-        self.clear_frame()
+        self.show_screen('data_tables', self.build_data_tables_screen)
+
+    def build_data_tables_screen(self):
         self.create_navigation("Data Tables")
         
         # Create scrollable content
-        scrollable_frame, _ = self.create_scrollable_frame(self.root)
+        scrollable_frame, _ = self.create_scrollable_frame(self.screen)
         
         # Create notebook for tabs
         notebook = ttk.Notebook(scrollable_frame)
@@ -1524,6 +5170,22 @@ Status: Active mining operations
         minerals_frame = ttk.Frame(notebook)
         notebook.add(minerals_frame, text="📊 Minerals Data")
         
+        # Minerals filter bar
+        minerals_filter = tk.Frame(minerals_frame, bg='white')
+        minerals_filter.pack(fill='x', padx=10, pady=(10, 0))
+        
+        tk.Label(minerals_filter, text="Country:", font=('Segoe UI', 9),
+                bg='white').pack(side='left', padx=5)
+        mineral_country = ttk.Combobox(minerals_filter, state="readonly", width=15,
+                                       values=["All"] + self.data_manager.mineral_countries())
+        mineral_country.set("All")
+        mineral_country.pack(side='left', padx=5)
+        mineral_production_min, mineral_production_max = self.create_range_entries(
+            minerals_filter, "Production:")
+        mineral_search, mineral_search_status = self.create_search_entry(
+            minerals_filter, "Search:", lambda: reload_minerals())
+        self.data_manager.prepare_search('MineralData')
+        
         # Create minerals table
         minerals_columns = ('Mineral', 'Location', 'Production', 'Color')
         minerals_tree = ttk.Treeview(minerals_frame, columns=minerals_columns, show='headings', height=8)
@@ -1532,10 +5194,65 @@ Status: Active mining operations
             minerals_tree.heading(col, text=col)
             minerals_tree.column(col, width=150)
         
-        for mineral, data in self.data_manager.MineralData.items():
-            minerals_tree.insert('', 'end', values=(
-                mineral, data['Location'], data['Production'], data['Color']
-            ))
+        def mineral_row(mineral, data):
+            return (mineral, data['Location'], data['Production'], data['Color'])
+        
+        minerals_table = PagedTable(minerals_frame, minerals_tree, self.data_manager.MineralData,
+                                    ('name', 'Location', 'Production', 'Color'), mineral_row)
+        mineral_filter = {}
+        
+        def mineral_matches(data):
+            country = mineral_filter.get('country')
+            low, high = mineral_filter.get('production_range') or (None, None)
+            return ((country is None or location_country(data['Location']) == country) and
+                    (low is None or data['Production'] >= low) and
+                    (high is None or data['Production'] <= high))
+        
+        def apply_mineral_filter():
+            production_range = self.parse_range(mineral_production_min, mineral_production_max)
+            if production_range is False:
+                return
+            country = mineral_country.get()
+            mineral_filter['country'] = None if country == "All" else country
+            mineral_filter['production_range'] = production_range
+            reload_minerals()
+        
+        def reload_minerals():
+            keys = self.data_manager.search('MineralData', mineral_search.get(), self.search_limit)
+            self.update_search_status(mineral_search_status, keys)
+            if keys is not None:
+                if any(mineral_filter.values()):
+                    records = self.data_manager.MineralData
+                    keys = [key for key in keys if mineral_matches(records[key])]
+            elif any(mineral_filter.values()):
+                keys = [name for name, _ in self.data_manager.find_minerals(**mineral_filter)]
+            else:
+                keys = self.data_manager.MineralData
+            minerals_table.set_keys(keys)
+        
+        ttk.Button(minerals_filter, text="🔍 Apply Filter", style='Secondary.TButton',
+                  command=apply_mineral_filter).pack(side='left', padx=10)
+        
+        reload_minerals()
+        
+        def refresh_mineral_countries():
+            countries = self.data_manager.mineral_countries()
+            mineral_country['values'] = ["All"] + countries
+            if mineral_country.get() not in countries:
+                mineral_country.set("All")
+        
+        def on_mineral_change(event):
+            # The screen stays cached, so keep the country choices current
+            if (event.action in ('reloaded', 'deleted') or event.old is None or
+                    location_country(event.old['Location']) != location_country(event.new['Location'])):
+                refresh_mineral_countries()
+            if mineral_search.get().strip():
+                # Search results are cheap to recompute and may gain or lose the record
+                reload_minerals()
+            else:
+                minerals_table.patch(event, mineral_matches, reload_minerals)
+        
+        self.subscribe_view(on_mineral_change, 'mineral')
         
         minerals_tree.pack(side='left', fill='both', expand=True, padx=10, pady=10)
         
@@ -1548,6 +5265,17 @@ Status: Active mining operations
         countries_frame = ttk.Frame(notebook)
         notebook.add(countries_frame, text="🌍 Countries Data")
         
+        # Countries filter bar
+        countries_filter = tk.Frame(countries_frame, bg='white')
+        countries_filter.pack(fill='x', padx=10, pady=(10, 0))
+        
+        country_gdp_min, country_gdp_max = self.create_range_entries(countries_filter, "GDP:")
+        country_production_min, country_production_max = self.create_range_entries(
+            countries_filter, "Production:")
+        country_search, country_search_status = self.create_search_entry(
+            countries_filter, "Search:", lambda: reload_countries())
+        self.data_manager.prepare_search('CountryProfiles')
+        
         # Create countries table
         countries_columns = ('Country', 'Production', 'GDP', 'Projects', 'Color')
         countries_tree = ttk.Treeview(countries_frame, columns=countries_columns, show='headings', height=8)
@@ -1556,10 +5284,53 @@ Status: Active mining operations
             countries_tree.heading(col, text=col)
             countries_tree.column(col, width=120)
         
-        for country, data in self.data_manager.CountryProfiles.items():
-            countries_tree.insert('', 'end', values=(
-                country, data['Production'], data['GDP'], data['Projects'], data['Color']
-            ))
+        def country_row(country, data):
+            return (country, data['Production'], data['GDP'], data['Projects'], data['Color'])
+        
+        countries_table = PagedTable(countries_frame, countries_tree, self.data_manager.CountryProfiles,
+                                     ('name', 'Production', 'GDP', 'Projects', 'Color'), country_row)
+        country_filter = {}
+        
+        def country_matches(data):
+            for field, key in (('GDP', 'gdp_range'), ('Production', 'production_range')):
+                low, high = country_filter.get(key) or (None, None)
+                if (low is not None and data[field] < low) or (high is not None and data[field] > high):
+                    return False
+            return True
+        
+        def apply_country_filter():
+            gdp_range = self.parse_range(country_gdp_min, country_gdp_max)
+            production_range = self.parse_range(country_production_min, country_production_max)
+            if gdp_range is False or production_range is False:
+                return
+            country_filter['gdp_range'] = gdp_range
+            country_filter['production_range'] = production_range
+            reload_countries()
+        
+        def reload_countries():
+            keys = self.data_manager.search('CountryProfiles', country_search.get(), self.search_limit)
+            self.update_search_status(country_search_status, keys)
+            if keys is not None:
+                if any(country_filter.values()):
+                    records = self.data_manager.CountryProfiles
+                    keys = [key for key in keys if country_matches(records[key])]
+            elif any(country_filter.values()):
+                keys = [name for name, _ in self.data_manager.find_countries(**country_filter)]
+            else:
+                keys = self.data_manager.CountryProfiles
+            countries_table.set_keys(keys)
+        
+        ttk.Button(countries_filter, text="🔍 Apply Filter", style='Secondary.TButton',
+                  command=apply_country_filter).pack(side='left', padx=10)
+        
+        reload_countries()
+        def on_country_change(event):
+            if country_search.get().strip():
+                reload_countries()
+            else:
+                countries_table.patch(event, country_matches, reload_countries)
+        
+        self.subscribe_view(on_country_change, 'country')
         
         countries_tree.pack(side='left', fill='both', expand=True, padx=10, pady=10)
         
@@ -1568,12 +5339,74 @@ Status: Active mining operations
         countries_tree.configure(yscrollcommand=countries_scrollbar.set)
         countries_scrollbar.pack(side='right', fill='y')
 
+    def create_search_entry(self, parent, label, on_change):
+        """Create a search box calling on_change on every keystroke; returns (var, status label)"""
+        tk.Label(parent, text=f"🔍 {label}", font=('Segoe UI', 9),
+                bg='white').pack(side='left', padx=5)
+        search_var = tk.StringVar()
+        ttk.Entry(parent, textvariable=search_var, font=('Segoe UI', 9), width=25).pack(side='left')
+        status = tk.Label(parent, font=('Segoe UI', 9), bg='white', fg=self.colors['dark'])
+        status.pack(side='left', padx=5)
+        search_var.trace_add('write', lambda *args: on_change())
+        return search_var, status
+
+    def update_search_status(self, label, keys):
+        if keys is None:
+            label.config(text="")
+        elif len(keys) >= self.search_limit:
+            label.config(text=f"first {len(keys):,} matches")
+        else:
+            label.config(text=f"{len(keys):,} matches")
+
+    def create_range_entries(self, parent, label):
+        """Create a 'label min – max' pair of entries and return them"""
+        tk.Label(parent, text=label, font=('Segoe UI', 9),
+                bg='white').pack(side='left', padx=(10, 5))
+        low_entry = ttk.Entry(parent, font=('Segoe UI', 9), width=8)
+        low_entry.pack(side='left')
+        tk.Label(parent, text="–", font=('Segoe UI', 9), bg='white').pack(side='left', padx=2)
+        high_entry = ttk.Entry(parent, font=('Segoe UI', 9), width=8)
+        high_entry.pack(side='left')
+        return low_entry, high_entry
+
+    def parse_range(self, low_entry, high_entry):
+        """Read a numeric range from two entries; None if both empty, False on error"""
+        low, high = low_entry.get().strip(), high_entry.get().strip()
+        if not low and not high:
+            return None
+        try:
+            return (int(low) if low else None, int(high) if high else None)
+        except ValueError:
+            messagebox.showerror("Error", "Filter values must be numbers")
+            return False
+
+    def fill_tree(self, tree, rows, row_values):
+        """Replace the rows of a Treeview keyed by record name"""
+        tree.delete(*tree.get_children())
+        for key, data in rows:
+            tree.insert('', 'end', iid=key, values=row_values(key, data))
+
+    def patch_tree_row(self, tree, event, row_values, matches=None, reload=None):
+        """Apply a change event to the Treeview row whose iid is the record key"""
+        if event.action == 'reloaded':
+            if reload is not None:
+                reload()
+        elif event.action == 'deleted' or (matches is not None and not matches(event.new)):
+            if tree.exists(event.key):
+                tree.delete(event.key)
+        elif tree.exists(event.key):
+            tree.item(event.key, values=row_values(event.key, event.new))
+        else:
+            tree.insert('', 'end', iid=event.key, values=row_values(event.key, event.new))
+
     def manage_users(self):
-        self.clear_frame()
+        self.show_screen('users', self.build_users_screen)
+
+    def build_users_screen(self):
         self.create_navigation("User Management")
         
         # Create scrollable content
-        scrollable_frame, _ = self.create_scrollable_frame(self.root)
+        scrollable_frame, _ = self.create_scrollable_frame(self.screen)
         
         # Current users section
         users_card = tk.Frame(scrollable_frame, bg='white', relief='raised', bd=1)
@@ -1600,8 +5433,16 @@ Status: Active mining operations
         tree.column('Actions', width=100)
         
         # Add users to treeview
+        def user_row(username, info):
+            return (username, info['role'], 'Remove')
+        
         for username, info in self.data_manager.Users.items():
-            tree.insert('', 'end', values=(username, info['role'], 'Remove'))
+            tree.insert('', 'end', iid=username, values=user_row(username, info))
+        self.subscribe_view(
+            lambda event: self.patch_tree_row(
+                tree, event, user_row,
+                reload=lambda: self.fill_tree(tree, self.data_manager.Users.items(), user_row)),
+            'user')
         
         tree.pack(side='left', fill='both', expand=True)
         
@@ -1658,7 +5499,7 @@ Status: Active mining operations
 
     def create_navigation(self, title):
         """Create navigation header for sub-pages"""
-        nav_frame = tk.Frame(self.root, bg=self.colors['primary'], height=60)
+        nav_frame = tk.Frame(self.screen, bg=self.colors['primary'], height=60)
         nav_frame.pack(fill='x', side='top')
         nav_frame.pack_propagate(False)
         
@@ -1677,6 +5518,32 @@ Status: Active mining operations
                            font=('Segoe UI', 10),
                            bg=self.colors['primary'], fg=self.colors['light'])
         user_info.pack(side='right', padx=20, pady=10)
+        
+        if self.debug:
+            debug_label = tk.Label(nav_frame, font=('Segoe UI', 9),
+                                   bg=self.colors['primary'], fg=self.colors['warning'])
+            debug_label.pack(side='right', padx=10)
+            self.update_debug_counter(debug_label)
+
+    def count_widgets(self, widget):
+        """Count widget and all of its live descendants"""
+        return 1 + sum(self.count_widgets(child) for child in widget.winfo_children())
+
+    def update_debug_counter(self, label):
+        """Refresh the debug widget counter once a second while its screen is shown"""
+        if not label.winfo_exists():
+            return
+        if not label.winfo_viewable():
+            # Screen is cached but hidden
+            self.root.after(1000, self.update_debug_counter, label)
+            return
+        text = f"🧩 {self.count_widgets(self.root):,} widgets, {len(self.screens)} screens cached"
+        if self.card_list is not None:
+            cards = self.card_list
+            text += (f" | cards {len(cards.cards)} live, {cards.created} built, "
+                     f"{cards.destroyed} destroyed, {cards.filled} fills")
+        label.config(text=text)
+        self.root.after(1000, self.update_debug_counter, label)
 
     def add_user(self):
         username = self.new_username_entry.get()
@@ -1692,15 +5559,170 @@ Status: Active mining operations
             
         self.data_manager.add_user(username, password, role)
         messagebox.showinfo("Success", f"User '{username}' added successfully!")
-        self.manage_users()
+        self.new_username_entry.delete(0, 'end')
+        self.new_password_entry.delete(0, 'end')
 
     def remove_user(self, username):
         if self.data_manager.delete_user(username):
             messagebox.showinfo("Success", f"User '{username}' removed successfully!")
-            self.manage_users()
+
+def export_jobs(data_manager, directory, formats, metric='Production', pairs=True):
+    """List (path, builder, options, format) for every chart the charts screen can draw
+    
+    Data is read here, in the calling process; the jobs carry plain values
+    so they can be rendered anywhere.
+    """
+    def file_name(name):
+        return urllib.parse.quote(name, safe='')
+    
+    requests = []
+    for chart_type, (entity, field, _, _, _) in SERIES_CHARTS.items():
+        records = data_manager.MineralData if entity == 'mineral' else data_manager.CountryProfiles
+        requests.append((chart_type, series_chart(chart_type, list(records), np.array(records.column(field)),
+                                                  list(records.column('Color')))))
+    
+    countries = data_manager.CountryProfiles
+    requests.append(('all_countries', overview_chart(countries)))
+    for field in ('Production', 'GDP', 'Projects'):
+        requests.append((f'all_countries_{field.lower()}',
+                         metric_overview_chart(field, list(countries), np.array(countries.column(field)),
+                                               list(countries.column('Color')))))
+    
+    for entity in ('mineral', 'country'):
+        for name in data_manager.production_series.names(entity):
+            timestamps, values, resolution = data_manager.production_history(entity, name)
+            requests.append((os.path.join('history', entity, file_name(name)),
+                             history_chart(name, resolution, timestamps, values)))
+    
+    if pairs:
+        profiles = dict(countries.items())
+        for country1, country2 in itertools.combinations(profiles, 2):
+            requests.append((os.path.join('comparison', f"{file_name(country1)}__{file_name(country2)}"),
+                             comparison_chart(country1, profiles[country1], country2, profiles[country2], metric)))
+    
+    return [(os.path.join(directory, f"{stem}.{format}"), build, options, format)
+            for stem, (build, options, _) in requests for format in formats]
+
+
+def export_chart(job):
+    """Render one export job to its file; returns (path, error message or None)"""
+    path, build, options, format = job
+    try:
+        image = render_chart(build, options, format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(image)
+    except Exception as e:
+        return path, str(e)
+    return path, None
+
+
+def export_command(args):
+    data_manager = DataManager(backend=args.backend)
+    try:
+        jobs = export_jobs(data_manager, args.output, args.format, args.metric, not args.no_pairs)
+    finally:
+        data_manager.close()
+    
+    print(f"Rendering {len(jobs):,} charts to {args.output}...")
+    started = time.monotonic()
+    failures = []
+    # Workers render with Figure and the Agg canvas directly, so no GUI backend is loaded
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for done, (path, error) in enumerate(executor.map(export_chart, jobs, chunksize=16), 1):
+            if error is not None:
+                failures.append((path, error))
+            if done % 500 == 0:
+                print(f"  {done:,}/{len(jobs):,}")
+    
+    print(f"Wrote {len(jobs) - len(failures):,} charts in {time.monotonic() - started:.1f}s")
+    for path, error in failures[:10]:
+        print(f"  Failed {path}: {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def seed_tiles_command(args):
+    south, west, north, east = args.bounds or TILE_REGIONS[args.region]
+    server = TILE_SERVERS[args.view]
+    source = args.source or server
+    store = TileStore(args.cache, args.max_mb * 1024 * 1024)
+    tiles = [(zoom, x, y) for zoom in range(args.zoom[0], args.zoom[1] + 1)
+             for left, top, right, bottom in [tile_range(zoom, south, west, north, east)]
+             for x in range(left, right + 1) for y in range(top, bottom + 1)]
+    missing = [tile for tile in tiles if not store.contains(server, *tile)]
+    
+    def seed(tile):
+        # Downloaded from the source but cached under the map view's own server
+        try:
+            store.put(server, *tile, store.download(source, *tile))
+        except Exception as e:
+            return tile, str(e)
+        return tile, None
+    
+    print(f"Seeding {len(missing):,} of {len(tiles):,} tiles from {source}...")
+    started = time.monotonic()
+    failures = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            for done, (tile, error) in enumerate(executor.map(seed, missing), 1):
+                if error is not None:
+                    failures.append((tile, error))
+                if done % 1000 == 0:
+                    print(f"  {done:,}/{len(missing):,}")
+    finally:
+        store.close()
+    
+    print(f"Cached {len(missing) - len(failures):,} tiles in {time.monotonic() - started:.1f}s")
+    for (zoom, x, y), error in failures[:10]:
+        print(f"  Failed {zoom}/{x}/{y}: {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def main(argv):
+    """Headless command-line tools; the GUI runs when no command is given"""
+    parser = argparse.ArgumentParser(prog="app.py", description="GeoMineral Hub command-line tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    export = commands.add_parser('export', help="Render every chart to image files without the UI")
+    export.add_argument('output', help="Directory to write the charts to")
+    export.add_argument('--format', nargs='+', choices=['png', 'svg', 'pdf'], default=['png'],
+                        help="One or more output formats (default: png)")
+    export.add_argument('--workers', type=int, default=None,
+                        help="Number of rendering processes (default: one per CPU)")
+    export.add_argument('--backend', choices=['json', 'sqlite'],
+                        default=os.environ.get("MINERAL_APP_BACKEND", "json"))
+    export.add_argument('--metric', choices=['Production', 'GDP', 'Projects'], default='Production',
+                        help="Metric of the head-to-head comparisons")
+    export.add_argument('--no-pairs', action='store_true',
+                        help="Skip the head-to-head comparison of every country pair")
+    
+    seed = commands.add_parser('seed-tiles', help="Download the map tiles of a region into the offline tile cache")
+    seed.add_argument('--region', choices=sorted(TILE_REGIONS), default='southern-africa')
+    seed.add_argument('--bounds', nargs=4, type=float, metavar=('SOUTH', 'WEST', 'NORTH', 'EAST'),
+                      help="Box to seed instead of --region")
+    seed.add_argument('--zoom', nargs=2, type=int, default=[3, 10], metavar=('MIN', 'MAX'),
+                      help="Zoom levels to seed (default: 3 10)")
+    seed.add_argument('--view', choices=sorted(TILE_SERVERS), default='roadmap',
+                      help="Map view the tiles are cached for (default: roadmap)")
+    seed.add_argument('--source', help="Tile URL template with {z}, {x} and {y} to download from, "
+                                       "such as a local tile server (default: the view's own server)")
+    seed.add_argument('--cache', default="map_tiles.db", help="Tile cache file (default: map_tiles.db)")
+    seed.add_argument('--max-mb', type=int, default=ModernApp.tile_cache_bytes // (1024 * 1024),
+                      help="Size limit of the cache in MB")
+    seed.add_argument('--workers', type=int, default=8, help="Parallel downloads (default: 8)")
+    
+    args = parser.parse_args(argv)
+    if args.command == 'export':
+        return export_command(args)
+    if args.command == 'seed-tiles':
+        return seed_tiles_command(args)
+
 
 # Run the app
 if __name__ == "__main__":
+    # Commands never start with a dash, unlike the options a notebook kernel passes
+    if len(sys.argv) > 1 and not sys.argv[1].startswith('-'):
+        sys.exit(main(sys.argv[1:]))
     root = tk.Tk()
     app = ModernApp(root)
     root.mainloop()
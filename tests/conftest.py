@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def data_manager(request, tmp_path, monkeypatch):
+    """A DataManager on either backend, with its files in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    manager = app.DataManager(backend=request.param)
+    yield manager
+    manager.close()
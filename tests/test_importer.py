@@ -0,0 +1,112 @@
+import app
+
+
+def write_minerals(path, count):
+    with open(path, 'w') as f:
+        f.write('name,LOCATION,production\n')
+        for i in range(count):
+            f.write(f'M{i},"Africa, C{i % 5}",{i}\n')
+    return str(path)
+
+
+def validated(manager, entity, path, **options):
+    importer = app.RecordImporter(manager, entity, path, **options)
+    importer.start()
+    importer.thread.join()
+    assert importer.failure is None
+    return importer
+
+
+def commit(importer):
+    importer.start_commit()
+    importer.thread.join()
+
+
+def test_commit_stores_every_valid_row(data_manager, tmp_path):
+    before = len(data_manager.MineralData)
+    with open(tmp_path / 'm.csv', 'w') as f:
+        f.write('name,LOCATION,production\nM1,"Africa, Ghana",5\nBad,,1\nM2,"Asia, Laos",x\n')
+    importer = validated(data_manager, 'mineral', str(tmp_path / 'm.csv'))
+    assert importer.row_count == 3 and importer.error_count == 2
+    
+    commit(importer)
+    assert importer.failure is None and not importer.rolled_back
+    assert importer.committed == 1
+    assert len(data_manager.MineralData) == before + 1
+    assert data_manager.MineralData['M1']['Production'] == 5
+    assert [event.key for event in importer.events] == ['M1']
+
+
+def test_commit_in_chunks(data_manager, tmp_path):
+    before = len(data_manager.MineralData)
+    importer = validated(data_manager, 'mineral', write_minerals(tmp_path / 'm.csv', 250),
+                         chunk_size=100, commit_chunk_size=60)
+    commit(importer)
+    assert importer.failure is None and importer.committed == 250
+    assert len(data_manager.MineralData) == before + 250
+    assert len(data_manager.find_minerals(country='C3')) == 50
+
+
+def test_minerals_added_after_validation_are_conflicts(data_manager, tmp_path):
+    importer = validated(data_manager, 'mineral', write_minerals(tmp_path / 'm.csv', 10))
+    data_manager.add_mineral('M4', 'Europe, Spain', 1, '#123456')
+    commit(importer)
+    assert importer.failure is None
+    assert importer.conflicts == [(5, "Mineral already exists")]
+    assert importer.committed == 9
+    # The mineral added meanwhile is not overwritten
+    assert data_manager.MineralData['M4']['Location'] == 'Europe, Spain'
+
+
+def test_cancel_undoes_committed_chunks(data_manager, tmp_path):
+    before = dict(data_manager.MineralData.items())
+    importer = validated(data_manager, 'mineral', write_minerals(tmp_path / 'm.csv', 100),
+                         commit_chunk_size=10)
+    store = data_manager.store_minerals
+    
+    def store_then_cancel(rows):
+        store(rows)
+        if importer.committed >= 20:
+            importer.cancel()
+    
+    data_manager.store_minerals = store_then_cancel
+    commit(importer)
+    assert importer.failure is None
+    assert importer.rolled_back and importer.committed == 0
+    assert dict(data_manager.MineralData.items()) == before
+    assert data_manager.find_minerals(country='C1') == []
+
+
+def test_cancel_before_commit_writes_nothing(data_manager, tmp_path):
+    before = len(data_manager.MineralData)
+    importer = validated(data_manager, 'mineral', write_minerals(tmp_path / 'm.csv', 10))
+    importer.cancel()
+    commit(importer)
+    assert importer.failure is None and importer.events == []
+    assert len(data_manager.MineralData) == before
+
+
+def test_failed_commit_restores_replaced_countries(data_manager, tmp_path):
+    before = dict(data_manager.CountryProfiles.items())
+    existing = next(iter(before))
+    with open(tmp_path / 'c.csv', 'w') as f:
+        f.write('Name,Production,GDP,Projects\n')
+        for i in range(30):
+            f.write(f'K{i},1,2,3\n')
+        f.write(f'{existing},9,9,9\n')
+    importer = validated(data_manager, 'country', str(tmp_path / 'c.csv'), commit_chunk_size=10)
+    # A row the store cannot take, so the last chunk fails
+    importer.rows.append(('Broken',))
+    commit(importer)
+    assert importer.failure is not None
+    assert importer.rolled_back
+    assert dict(data_manager.CountryProfiles.items()) == before
+
+
+def test_undo_keeps_records_edited_since(data_manager, tmp_path):
+    importer = validated(data_manager, 'mineral', write_minerals(tmp_path / 'm.csv', 10))
+    commit(importer)
+    data_manager.set_record('MineralData', 'M2', dict(data_manager.MineralData['M2'], Production=77))
+    importer.undo()
+    assert 'M1' not in data_manager.MineralData
+    assert data_manager.MineralData['M2']['Production'] == 77
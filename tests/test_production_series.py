@@ -0,0 +1,65 @@
+import numpy as np
+
+import app
+
+DAY = 86400
+
+
+def test_empty_batch_changes_nothing(tmp_path):
+    store = app.ProductionSeriesStore(str(tmp_path))
+    store.append_many('mineral', 'Gold', [], [])
+    store.append_many('mineral', 'Gold', np.empty(0, dtype=np.int64), np.empty(0))
+    assert store.version == 0
+    assert store.names('mineral') == []
+    timestamps, values, _ = store.query('mineral', 'Gold', 0, DAY, 'raw')
+    assert len(timestamps) == 0 and len(values) == 0
+
+
+def test_batch_is_sorted_and_rolled_up(tmp_path):
+    store = app.ProductionSeriesStore(str(tmp_path))
+    store.append_many('mineral', 'Gold', [DAY + 5, 10, 20], [6.0, 2.0, 4.0])
+    timestamps, values, _ = store.query('mineral', 'Gold', 0, 2 * DAY, 'raw')
+    assert timestamps.tolist() == [10, 20, DAY + 5]
+    assert values.tolist() == [2.0, 4.0, 6.0]
+    timestamps, values, _ = store.query('mineral', 'Gold', 0, 2 * DAY, 'day')
+    assert timestamps.tolist() == [0, DAY]
+    assert values.tolist() == [3.0, 6.0]
+
+
+def test_late_readings_are_merged_in_order(tmp_path):
+    store = app.ProductionSeriesStore(str(tmp_path))
+    store.append_many('country', 'Ghana', [100, 300], [1.0, 3.0])
+    store.append_many('country', 'Ghana', [200, 400], [2.0, 4.0])
+    timestamps, values, _ = store.query('country', 'Ghana', 0, DAY, 'raw')
+    assert timestamps.tolist() == [100, 200, 300, 400]
+    assert values.tolist() == [1.0, 2.0, 3.0, 4.0]
+    _, values, _ = store.query('country', 'Ghana', 0, DAY, 'day')
+    assert values.tolist() == [2.5]
+
+
+def test_query_range_is_inclusive(tmp_path):
+    store = app.ProductionSeriesStore(str(tmp_path))
+    store.append_many('mineral', 'Gold', [10, 20, 30, 40], [1.0, 2.0, 3.0, 4.0])
+    timestamps, _, _ = store.query('mineral', 'Gold', 20, 30, 'raw')
+    assert timestamps.tolist() == [20, 30]
+
+
+def test_names_with_dots_do_not_collide_with_rollups(tmp_path):
+    store = app.ProductionSeriesStore(str(tmp_path))
+    store.append_many('mineral', 'Gold.day', [10], [1.0])
+    store.append_many('mineral', 'Gold', [10], [5.0])
+    assert store.names('mineral') == ['Gold', 'Gold.day']
+    _, values, _ = store.query('mineral', 'Gold.day', 0, DAY, 'raw')
+    assert values.tolist() == [1.0]
+
+
+def test_recorder_keeps_latest_reading_per_second(tmp_path):
+    store = app.ProductionSeriesStore(str(tmp_path))
+    recorder = app.ProductionRecorder(store, delay=0.01)
+    recorder.add([('mineral', 'Gold', 1.0), ('mineral', 'Gold', 2.0), ('other', 'X', 3.0)], timestamp=50)
+    recorder.add([('mineral', 'Gold', 4.0)], timestamp=51)
+    recorder.stop()
+    timestamps, values, _ = store.query('mineral', 'Gold', 0, DAY, 'raw')
+    assert timestamps.tolist() == [50, 51]
+    assert values.tolist() == [2.0, 4.0]
+    assert store.names('other') == []
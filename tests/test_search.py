@@ -0,0 +1,78 @@
+import random
+
+import app
+
+
+def brute_force(records, text):
+    terms = app.SearchIndex.words(text)
+    found = set()
+    for key, location in records.items():
+        words = app.SearchIndex.words(key) + app.SearchIndex.words(location)
+        if all(any(word.startswith(term) for word in words) for term in terms):
+            found.add(key)
+    return found
+
+
+def build(records):
+    index = app.SearchIndex(fields=('Location',))
+    keys = list(records)
+    index.build(keys, [[records[key] for key in keys]])
+    return index
+
+
+def test_prefix_and_multiple_terms():
+    index = build({'Gold': 'Africa, Ghana', 'Golden Sand': 'Asia, Laos', 'Iron': 'Africa, Gabon'})
+    assert set(index.search('gol')) == {'Gold', 'Golden Sand'}
+    assert set(index.search('ga')) == {'Iron'}
+    assert set(index.search('africa g')) == {'Gold', 'Iron'}
+    assert index.search('  ') is None
+    assert index.search('zinc') == []
+
+
+def test_limit_returns_distinct_keys():
+    index = build({f'Ore {i}': 'Africa, Ghana' for i in range(100)})
+    results = index.search('ore', limit=10)
+    assert len(results) == len(set(results)) == 10
+
+
+def test_update_many_matches_a_rebuild():
+    rng = random.Random(15)
+    places = ['Africa, Ghana', 'Africa, Mali', 'Asia, Laos', 'Europe, Spain']
+    records = {f'M{i} {rng.choice("abc")}x': rng.choice(places) for i in range(300)}
+    index = build(records)
+    # Large enough to take the merge path as well as the insort one
+    for count in (5, 200):
+        changes = []
+        for key in rng.sample(sorted(records), count):
+            if rng.random() < 0.5:
+                changes.append((key, {'Location': records.pop(key)}, None))
+            else:
+                old = {'Location': records[key]}
+                records[key] = f'{rng.choice(places)} W{rng.randrange(1000)}'
+                changes.append((key, old, {'Location': records[key]}))
+        key = f'New{count}'
+        records[key] = 'Oceania, Fiji'
+        changes.append((key, None, {'Location': records[key]}))
+        index.update_many(changes)
+        assert index.vocabulary == sorted(build(records).postings)
+        for text in ('m1', 'africa', 'w', 'fiji new', 'ax spain', 'laos m2'):
+            assert set(index.search(text)) == brute_force(records, text)
+
+
+def test_merge_sorted():
+    rng = random.Random(7)
+    for _ in range(50):
+        entries = sorted(rng.sample(range(1000), 100))
+        removed = set(rng.sample(entries, 20))
+        added = [value for value in rng.sample(range(1000, 2000), 30)]
+        expected = sorted(set(entries) - removed | set(added))
+        assert app.merge_sorted(entries, added, removed) == expected
+
+
+def test_data_manager_search_follows_changes(data_manager):
+    data_manager.add_mineral('Zirconite', 'Africa, Malawi', 10, '#123456')
+    assert data_manager.search('MineralData', 'zirc malawi') == ['Zirconite']
+    data_manager.set_record('MineralData', 'Zirconite',
+                            dict(data_manager.MineralData['Zirconite'], Location='Asia, Laos'))
+    assert data_manager.search('MineralData', 'zirc malawi') == []
+    assert data_manager.search('MineralData', 'zirc laos') == ['Zirconite']